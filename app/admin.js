@@ -127,7 +127,7 @@ function getStatusLine(matchup) {
   return parts.join(' · ');
 }
 
-async function loadVisits() {
+async function loadVisits(preloaded) {
   const realVisits = document.getElementById("visit-real");
   const allVisits = document.getElementById("visit-all");
   const visitsStatus = document.getElementById("visits-status");
@@ -139,7 +139,7 @@ async function loadVisits() {
   }
 
   try {
-    const data = await apiFetch('/admin/visits', {}, true);
+    const data = preloaded || await apiFetch('/admin/visits', {}, true);
     realVisits.textContent = formatCount(data.real || 0);
     allVisits.textContent = formatCount(data.all || 0);
     if (visitsStatus) {
@@ -240,12 +240,12 @@ if (createForm) {
 }
 
 // Load active matchups
-async function loadMatchups() {
+async function loadMatchups(preloaded) {
   const list = document.getElementById('matchups-list');
   list.innerHTML = '<div style="color: var(--muted); padding: 20px;">Loading...</div>';
   
   try {
-    const data = await apiFetch('/admin/matchups', {}, true);
+    const data = preloaded || await apiFetch('/admin/matchups', {}, true);
     
     if (!data.matchups || data.matchups.length === 0) {
       list.innerHTML = '<div style="color: var(--muted); padding: 20px;">No active matchups</div>';
@@ -454,6 +454,17 @@ function getSelectedMatchupIds() {
 }
 
 // Bulk operations
+function bulkSummary(verb, result) {
+  const results = result.results || {};
+  const ids = Object.keys(results);
+  const failed = ids.filter(id => results[id] !== 'updated');
+  let message = `${verb} ${result.count} of ${ids.length} matchup(s)`;
+  if (failed.length) {
+    message += '\n\nNot updated:\n' + failed.map(id => `${id}: ${results[id]}${result.errors?.[id] ? ` (${result.errors[id]})` : ''}`).join('\n');
+  }
+  return message;
+}
+
 const bulkActivateBtn = document.getElementById('bulk-activate-btn');
 if (bulkActivateBtn) {
   bulkActivateBtn.addEventListener('click', async () => {
@@ -461,13 +472,13 @@ if (bulkActivateBtn) {
     if (!ids.length) return;
     
     try {
-      await apiFetch('/admin/bulk-activate', {
+      const result = await apiFetch('/admin/bulk-activate', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ matchup_ids: ids })
       }, true);
       
-      alert(`Activated ${ids.length} matchup(s)`);
+      alert(bulkSummary('Activated', result));
       loadMatchups();
     } catch (err) {
       alert('Error: ' + err.message);
@@ -482,13 +493,13 @@ if (bulkDeactivateBtn) {
     if (!ids.length) return;
     
     try {
-      await apiFetch('/admin/bulk-deactivate', {
+      const result = await apiFetch('/admin/bulk-deactivate', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ matchup_ids: ids })
       }, true);
       
-      alert(`Deactivated ${ids.length} matchup(s)`);
+      alert(bulkSummary('Deactivated', result));
       loadMatchups();
     } catch (err) {
       alert('Error: ' + err.message);
@@ -506,7 +517,7 @@ if (archiveEndedBtn) {
         method: 'POST'
       }, true);
       
-      alert(`Archived ${result.archived} matchup(s)`);
+      alert(bulkSummary('Archived', result));
       loadMatchups();
     } catch (err) {
       alert('Error: ' + err.message);
@@ -522,20 +533,37 @@ if (clearSelectionBtn) {
   });
 }
 
-// Load submissions
-async function loadSubmissions() {
+// Load submissions, one status queue at a time; `more` appends the next page
+let submissionStatus = 'pending';
+let submissionCursor = null;
+
+async function loadSubmissions(more = false) {
   const list = document.getElementById('submissions-list');
-  list.innerHTML = '<div style="color: var(--muted); padding: 20px;">Loading...</div>';
+  if (!more) {
+    submissionCursor = null;
+    list.innerHTML = '<div style="color: var(--muted); padding: 20px;">Loading...</div>';
+  }
   
   try {
-    const data = await apiFetch('/admin/submissions', {}, true);
+    const params = new URLSearchParams({ status: submissionStatus });
+    if (more && submissionCursor) params.set('cursor', submissionCursor);
+    const data = await apiFetch(`/admin/submissions?${params}`, {}, true);
+    submissionCursor = data.next_cursor || null;
     
-    if (!data.submissions || data.submissions.length === 0) {
-      list.innerHTML = '<div style="color: var(--muted); padding: 20px;">No submissions yet</div>';
+    const filter = `
+      <div class="submission-filter" style="margin-bottom: 12px;">
+        ${['pending', 'approved', 'rejected'].map(status => `
+          <button class="btn ${status === submissionStatus ? 'primary' : 'ghost'}" data-status="${status}">${status}</button>
+        `).join('')}
+      </div>`;
+    
+    if (!more && (!data.submissions || data.submissions.length === 0)) {
+      list.innerHTML = filter + `<div style="color: var(--muted); padding: 20px;">No ${submissionStatus} submissions</div>`;
+      attachSubmissionFilter();
       return;
     }
     
-    list.innerHTML = data.submissions.map(s => `
+    const cards = data.submissions.map(s => `
       <div class="submission-card" data-timestamp="${s.timestamp}">
         <div class="card-header">
           <h4>${s.left_name} vs ${s.right_name}</h4>
@@ -543,6 +571,7 @@ async function loadSubmissions() {
         </div>
         <div class="card-body">
           <div><strong>Category:</strong> ${s.category}</div>
+          ${s.duplicate_count ? `<div><strong>Suggested:</strong> ${s.duplicate_count + 1} times (last ${new Date(s.last_submitted_at).toLocaleString()})</div>` : ''}
           ${s.email ? `<div><strong>Email:</strong> ${s.email}</div>` : ''}
           ${s.reason ? `<div style="margin-top: 8px; color: var(--muted);">${s.reason}</div>` : ''}
           ${s.rejection_reason ? `<div style="margin-top: 8px; color: var(--accent);"><strong>Rejection:</strong> ${s.rejection_reason}</div>` : ''}
@@ -565,6 +594,18 @@ async function loadSubmissions() {
       </div>
     `).join('');
     
+    list.querySelector('.btn-load-more')?.remove();
+    if (more) {
+      list.insertAdjacentHTML('beforeend', cards);
+    } else {
+      list.innerHTML = filter + cards;
+      attachSubmissionFilter();
+    }
+    if (submissionCursor) {
+      list.insertAdjacentHTML('beforeend', '<button class="btn ghost btn-load-more">Load more</button>');
+      list.querySelector('.btn-load-more').addEventListener('click', () => loadSubmissions(true));
+    }
+    
     attachSubmissionHandlers();
   } catch (err) {
     if (err.message.toLowerCase().includes('forbidden') || err.message.toLowerCase().includes('admin key')) {
@@ -576,8 +617,18 @@ async function loadSubmissions() {
   }
 }
 
+function attachSubmissionFilter() {
+  document.querySelectorAll('.submission-filter button').forEach(btn => {
+    btn.addEventListener('click', () => {
+      submissionStatus = btn.dataset.status;
+      loadSubmissions();
+    });
+  });
+}
+
 function attachSubmissionHandlers() {
-  document.querySelectorAll('.submission-card').forEach(card => {
+  document.querySelectorAll('.submission-card:not([data-bound])').forEach(card => {
+    card.dataset.bound = 'true';
     const timestamp = card.dataset.timestamp;
     const approveBtn = card.querySelector('.btn-approve');
     const rejectBtn = card.querySelector('.btn-reject');
@@ -672,8 +723,7 @@ if (loginForm) {
       saveAdminKey(value);
       if (input) input.value = '';
       setAuthState(true);
-      loadMatchups();
-      loadVisits();
+      loadDashboard();
     } catch (err) {
       saveAdminKey('');
       setAuthState(false, err.message || 'Login failed.');
@@ -701,6 +751,18 @@ if (refreshVisitsBtn) {
   });
 }
 
+// Matchups and visits in one request; a section that fails falls back to its own endpoint.
+async function loadDashboard() {
+  let data = {};
+  try {
+    data = await apiFetch('/admin/dashboard?sections=matchups,visits', {}, true);
+  } catch (err) {
+    console.warn('Dashboard request failed, loading sections separately:', err);
+  }
+  loadMatchups(data.matchups);
+  loadVisits(data.visits);
+}
+
 async function initAuth() {
   const savedKey = getAdminKey();
   if (!savedKey) {
@@ -710,8 +772,7 @@ async function initAuth() {
   try {
     await verifyAdminKey(savedKey);
     setAuthState(true);
-    loadMatchups();
-    loadVisits();
+    loadDashboard();
   } catch (err) {
     saveAdminKey('');
     setAuthState(false, 'Session expired. Please log in.');
@@ -118,26 +118,43 @@ async function shareMatchupCard(url, matchupData) {
   }
 }
 
+function newIdempotencyKey() {
+  if (window.crypto && typeof window.crypto.randomUUID === "function") {
+    return window.crypto.randomUUID();
+  }
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}${Math.random().toString(36).slice(2)}`;
+}
+
+// Seconds (or an HTTP date) from a Retry-After header, as milliseconds; null when absent
+function retryAfterMs(response) {
+  const value = response.headers.get("Retry-After");
+  if (!value) return null;
+  const seconds = Number(value);
+  const ms = Number.isFinite(seconds) ? seconds * 1000 : Date.parse(value) - Date.now();
+  return Number.isFinite(ms) ? Math.min(Math.max(ms, 0), 30000) : null;
+}
+
 async function fetchWithRetry(url, options = {}, maxRetries = 3) {
-  const controller = new AbortController();
-  const timeoutId = setTimeout(() => controller.abort(), 10000);
-  
-  const fetchOptions = {
-    ...options,
-    signal: controller.signal
-  };
+  const headers = { ...(options.headers || {}) };
+  if ((options.method || "GET").toUpperCase() === "POST") {
+    // One key for every attempt, so a retry replays the first response instead of writing again.
+    headers["Idempotency-Key"] = newIdempotencyKey();
+  }
   
   let lastError;
   for (let attempt = 0; attempt < maxRetries; attempt++) {
+    const controller = new AbortController();
+    const timeoutId = setTimeout(() => controller.abort(), 10000);
+    let waitMs = null;
     try {
-      const response = await fetch(url, fetchOptions);
+      const response = await fetch(url, { ...options, headers, signal: controller.signal });
       clearTimeout(timeoutId);
       
       if (response.ok) {
         const data = await response.json();
         // Handle both old and new response formats
         if (data.success === false) {
-          throw new Error(data.error || 'Request failed');
+          throw Object.assign(new Error(data.error || 'Request failed'), { final: true });
         }
         // New format: {success: true, data: {...}}
         // Old format: {matchups: [...]} or {history: [...]}
@@ -146,21 +163,25 @@ async function fetchWithRetry(url, options = {}, maxRetries = 3) {
       }
       
       if (response.status >= 400 && response.status < 500) {
-        const data = await response.json();
-        throw new Error(data.error || `HTTP ${response.status}`);
+        const data = await response.json().catch(() => ({}));
+        const error = new Error(data.error || `HTTP ${response.status}`);
+        // Rate limited, or our own earlier attempt is still running: wait as told, then retry with the same key.
+        if (response.status !== 429 && data.error_code !== "IDEMPOTENCY_IN_PROGRESS") {
+          error.final = true;
+          throw error;
+        }
+        lastError = error;
+        waitMs = retryAfterMs(response);
+      } else {
+        lastError = new Error(`HTTP ${response.status}`);
       }
-      
-      lastError = new Error(`HTTP ${response.status}`);
     } catch (err) {
       clearTimeout(timeoutId);
-      if (err.name === 'AbortError') {
-        lastError = new Error('Request timeout');
-      } else {
-        lastError = err;
-      }
+      if (err.final) throw err;
+      lastError = err.name === 'AbortError' ? new Error('Request timeout') : err;
     }
     if (attempt < maxRetries - 1) {
-      const delay = Math.min(1000 * Math.pow(2, attempt), 5000);
+      const delay = waitMs !== null ? waitMs : Math.min(1000 * Math.pow(2, attempt), 5000);
       await new Promise(resolve => setTimeout(resolve, delay));
     }
   }
@@ -551,6 +572,36 @@ function getEntryImage(entry) {
   return raw.replace('maxWidthPx=400', 'maxWidthPx=800');
 }
 
+const IMAGE_VARIANT_TYPES = { avif: "image/avif", webp: "image/webp", jpeg: "image/jpeg" };
+const IMAGE_VARIANT_ORDER = ["avif", "webp", "jpeg"];
+
+function getFighterImageWidth() {
+  // Fighters sit side by side, so each needs about half the viewport (capped) at device resolution
+  const viewport = Math.min(window.innerWidth || 800, 1200);
+  return Math.ceil((viewport / 2) * (window.devicePixelRatio || 1));
+}
+
+function getVariantBackground(entry, targetWidth) {
+  // Smallest variant width that covers the target, offered in every stored format
+  const variants = Array.isArray(entry?.image_variants) ? entry.image_variants : [];
+  if (!variants.length) return "";
+
+  const widths = [...new Set(variants.map((variant) => Number(variant.width)))].sort((a, b) => a - b);
+  const width = widths.find((w) => w >= targetWidth) || widths[widths.length - 1];
+  const chosen = variants
+    .filter((variant) => Number(variant.width) === width && IMAGE_VARIANT_TYPES[variant.format])
+    .sort((a, b) => IMAGE_VARIANT_ORDER.indexOf(a.format) - IMAGE_VARIANT_ORDER.indexOf(b.format));
+  if (!chosen.length) return "";
+
+  const imageSet = `image-set(${chosen
+    .map((variant) => `url("${variant.url}") type("${IMAGE_VARIANT_TYPES[variant.format]}")`)
+    .join(", ")})`;
+  if (window.CSS?.supports?.("background-image", imageSet)) return imageSet;
+
+  const fallback = chosen.find((variant) => variant.format === "jpeg") || chosen[chosen.length - 1];
+  return `url("${fallback.url}")`;
+}
+
 function createOptimizedImage(src, alt) {
   // Create picture element with WebP/AVIF fallbacks
   if (!src) return null;
@@ -683,8 +734,12 @@ function buildFighter(entry, side, matchupId, hasVoted, votedSide, count, pct) {
     fighter.classList.toggle("fighter--dim", votedSide !== side);
   }
 
-  const imageUrl = getEntryImage(entry);
-  if (imageUrl) {
+  const overrideKey = normalizeKey(entry?.id || entry?.name || "");
+  const variantBackground = IMAGE_OVERRIDES[overrideKey] ? "" : getVariantBackground(entry, getFighterImageWidth());
+  const imageUrl = variantBackground ? "" : getEntryImage(entry);
+  if (variantBackground) {
+    fighter.style.setProperty('--fighter-bg', variantBackground);
+  } else if (imageUrl) {
     fighter.style.setProperty('--fighter-bg', `url(${imageUrl})`);
   }
 
@@ -1497,16 +1552,28 @@ function updateCommentCount(matchupId, count) {
 async function loadCommentCounts() {
   if (!state.matchups) return;
   
+  // /matchup already carries comment_count; fall back to one summary call for older payloads.
+  const missing = [];
   for (const matchup of state.matchups) {
     const matchupId = matchup.matchup.id;
-    try {
-      const result = await fetchWithRetry(`${API_URL}/comments?matchup_id=${matchupId}`);
-      const count = result.data.comments?.length || 0;
-      updateCommentCount(matchupId, count);
-    } catch (err) {
-      // Ignore errors
+    if (typeof matchup.comment_count === "number") {
+      updateCommentCount(matchupId, matchup.comment_count);
+    } else {
+      missing.push(matchupId);
     }
   }
+  if (!missing.length) return;
+
+  try {
+    const ids = missing.map(encodeURIComponent).join(",");
+    const result = await fetchWithRetry(`${API_URL}/comments/summary?ids=${ids}&top=0`);
+    const summaries = result.data.summaries || {};
+    for (const matchupId of missing) {
+      updateCommentCount(matchupId, summaries[matchupId]?.count || 0);
+    }
+  } catch (err) {
+    // Ignore errors
+  }
 }
 
 async function submitComment(matchupId) {
@@ -1,14 +1,38 @@
+import base64
+import gzip
+import hashlib
 import json
 import os
+import re
+import threading
 import boto3
 import uuid
 import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 from decimal import Decimal
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['TABLE_NAME'])
-cloudwatch = boto3.client('cloudwatch')
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+import bulk
+import idempotency
+import leaderboard
+import newsletter
+import profiling
+import ratelimit
+import storage
+import submissions
+from storage import COMMENTS, DATA
+
+store = storage.from_env()
+# Local/self-hosted runs (e.g. STORAGE_BACKEND=sqlite) skip CloudWatch unless asked for.
+METRICS_ENABLED = os.environ.get(
+    'METRICS_ENABLED', 'false' if os.environ.get('STORAGE_BACKEND', 'dynamodb') == 'sqlite' else 'true'
+).strip().lower() in ('1', 'true', 'yes', 'on')
+cloudwatch = boto3.client('cloudwatch') if METRICS_ENABLED else None
 ADMIN_KEY = os.environ.get('ADMIN_KEY', '').strip()
 
 # Error codes
@@ -21,7 +45,13 @@ ERROR_CODES = {
     'MATCHUP_ENDED': 'Matchup has ended',
     'MISSING_FIELD': 'Missing required field',
     'UNAUTHORIZED': 'Unauthorized access',
-    'NOT_FOUND': 'Resource not found'
+    'NOT_FOUND': 'Resource not found',
+    'FIELDS_INVALID': 'Unknown field in fields selector',
+    'CURSOR_INVALID': 'Malformed pagination cursor',
+    'RATE_LIMITED': 'Too many requests',
+    'IDEMPOTENCY_KEY_INVALID': 'Malformed Idempotency-Key header',
+    'IDEMPOTENCY_KEY_REUSED': 'Idempotency-Key already used for a different request',
+    'IDEMPOTENCY_IN_PROGRESS': 'A request with this Idempotency-Key is still running'
 }
 
 def log(level, message, **kwargs):
@@ -36,6 +66,8 @@ def log(level, message, **kwargs):
 
 def put_metric(metric_name, value, unit='Count', dimensions=None):
     """Put custom CloudWatch metric"""
+    if cloudwatch is None:
+        return
     try:
         metric_data = {
             'MetricName': metric_name,
@@ -82,7 +114,191 @@ def json_response(status_code, headers, body, cache_seconds=0, error_code=None):
             'error_code': None
         }
     
-    return {'statusCode': status_code, 'headers': response_headers, 'body': json.dumps(standardized, default=decimal_default)}
+    started = time.perf_counter()
+    encoded = json.dumps(standardized, default=decimal_default)
+    count_response_stat('serializations', 1, serialize_ms=(time.perf_counter() - started) * 1000)
+    return {'statusCode': status_code, 'headers': response_headers, 'body': encoded}
+
+# Response cache: encoded bodies of public GET routes, keyed by route and data version
+RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'true').strip().lower() == 'true'
+RESPONSE_CACHE_ENTRIES = 128
+RESPONSE_CACHE_BYTES = 16 * 1024 * 1024
+# Data scopes each cacheable route reads; placeholders are filled from the query string.
+CACHED_ROUTES = {
+    '/matchup': ('matchups', 'entries', 'votes', 'comment_counts'),
+    '/history': ('matchups', 'entries', 'votes'),
+    '/future': ('matchups', 'entries'),
+    '/comments': ('comments#{matchup_id}',),
+    '/ratings': ('ratings',),
+    '/leaderboard': ('leaderboard',),
+    # Recaps are written by scripts/build_recap.py, so entries age out on max-age instead of a version bump
+    # (30s for /recap/latest, which moves when a new week is built; an hour for a given week).
+    '/recap/': ('recaps',),
+    '/comments/summary': lambda params: ('comment_counts', *(f'comments#{i}' for i in params['ids'].split(','))),
+}
+response_cache = OrderedDict()
+response_cache_size = 0
+response_cache_lock = threading.Lock()
+data_versions = {}
+response_stats = {'serializations': 0, 'serialize_ms': 0.0, 'cache_hits': 0, 'cache_misses': 0, 'not_modified': 0}
+
+def count_response_stat(name, value=1, **extra):
+    with response_cache_lock:
+        response_stats[name] += value
+        for key, amount in extra.items():
+            response_stats[key] += amount
+
+def bump_data_version(*scopes):
+    """Invalidate cached responses that read any of these scopes"""
+    with response_cache_lock:
+        for scope in scopes:
+            data_versions[scope] = data_versions.get(scope, 0) + 1
+
+def response_cache_key(event, path):
+    """(key, versions) for a cacheable request, or (None, None)"""
+    scopes = CACHED_ROUTES.get(path, CACHED_ROUTES.get(path.rsplit('/', 1)[0] + '/'))
+    if not RESPONSE_CACHE_ENABLED or scopes is None:
+        return None, None
+    params = event.get('queryStringParameters') or {}
+    try:
+        scopes = scopes(params) if callable(scopes) else tuple(scope.format(**params) for scope in scopes)
+    except KeyError:
+        return None, None
+    with response_cache_lock:
+        versions = tuple(data_versions.get(scope, 0) for scope in scopes)
+    return (path, tuple(sorted(params.items()))), versions
+
+def cache_get(key, versions):
+    with response_cache_lock:
+        entry = response_cache.get(key)
+        if entry is None or entry['versions'] != versions or entry['expires'] <= time.monotonic():
+            return None
+        response_cache.move_to_end(key)
+        return entry
+
+def cache_put(key, versions, response):
+    """Remember a public 200 response for its max-age; returns the cache entry"""
+    global response_cache_size
+    cache_control = response['headers'].get('Cache-Control', '')
+    if response['statusCode'] != 200 or not cache_control.startswith('public'):
+        return None
+    max_age = int(cache_control.split('max-age=')[1].split(',')[0])
+    body = response['body']
+    entry = {
+        'key': key,
+        'versions': versions,
+        'expires': time.monotonic() + max_age,
+        'headers': {k: v for k, v in response['headers'].items() if k != 'X-Correlation-ID'},
+        'body': body,
+        'etag': 'W/"%s"' % hashlib.sha1(body.encode('utf-8')).hexdigest()[:20],
+        'variants': {},
+        'size': len(body),
+    }
+    with response_cache_lock:
+        previous = response_cache.pop(key, None)
+        if previous:
+            response_cache_size -= previous['size']
+        response_cache[key] = entry
+        response_cache_size += entry['size']
+        evict_responses()
+    return entry
+
+def cache_variant(entry, encoding, data):
+    """Keep a compressed copy of a cached body"""
+    global response_cache_size
+    with response_cache_lock:
+        if encoding in entry['variants']:
+            return
+        entry['variants'][encoding] = data
+        entry['size'] += len(data)
+        if response_cache.get(entry['key']) is entry:
+            response_cache_size += len(data)
+            evict_responses()
+
+def evict_responses():
+    global response_cache_size
+    while len(response_cache) > RESPONSE_CACHE_ENTRIES or response_cache_size > RESPONSE_CACHE_BYTES:
+        _, evicted = response_cache.popitem(last=False)
+        response_cache_size -= evicted['size']
+
+def cached_response(event, entry, headers):
+    """Response for a cache entry, or 304 when the client already has it"""
+    response_headers = {**entry['headers'], 'X-Correlation-ID': headers['X-Correlation-ID'], 'ETag': entry['etag']}
+    if_none_match = get_header(event, 'if-none-match') or ''
+    if entry['etag'] in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+        count_response_stat('not_modified')
+        response_headers['Vary'] = 'Accept-Encoding'
+        return {'statusCode': 304, 'headers': response_headers, 'body': ''}
+    return compress_response(event, {'statusCode': 200, 'headers': response_headers, 'body': entry['body']}, entry)
+
+# Response compression
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+
+def parse_accept_encoding(value):
+    """Map of coding -> q-value from an Accept-Encoding header"""
+    codings = {}
+    for part in (value or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, val = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(val)
+                except ValueError:
+                    q = 0.0
+        codings[name] = q
+    return codings
+
+def choose_encoding(accept_encoding):
+    codings = parse_accept_encoding(accept_encoding)
+    wildcard = codings.get('*', 0.0)
+    candidates = ['br', 'gzip'] if brotli else ['gzip']
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = codings.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+COMPRESSIBLE_TYPES = ('application/json', *newsletter.CONTENT_TYPES.values())
+
+def compress_body(body, encoding, best=False):
+    """Compressed bytes for body; cached responses are compressed once, so they get the slower levels"""
+    raw = body.encode('utf-8')
+    if encoding == 'br':
+        return brotli.compress(raw, quality=9 if best else 4)
+    return gzip.compress(raw, compresslevel=9 if best else 5, mtime=0)
+
+def compress_response(event, response, entry=None):
+    """Apply Accept-Encoding negotiation to a JSON response (variants of a cache entry are reused)"""
+    headers = response.get('headers') or {}
+    if not headers.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+        return response
+    headers['Vary'] = 'Accept-Encoding'
+    body = response.get('body') or ''
+    if response.get('isBase64Encoded') or len(body) < COMPRESSION_MIN_BYTES:
+        return response
+    encoding = choose_encoding(get_header(event, 'accept-encoding'))
+    if not encoding:
+        return response
+
+    if entry is None:
+        data = compress_body(body, encoding)
+    else:
+        data = entry['variants'].get(encoding)
+        if data is None:
+            data = compress_body(body, encoding, best=True)
+            cache_variant(entry, encoding, data)
+    if len(data) >= len(body) * 0.9:
+        return response
+    headers['Content-Encoding'] = encoding
+    response['body'] = base64.b64encode(data).decode('ascii')
+    response['isBase64Encoded'] = True
+    return response
 
 def parse_iso8601(value):
     if not value:
@@ -127,290 +343,468 @@ def is_synthetic(event):
     value = value.strip().lower()
     return value not in ('0', 'false', 'no', 'off')
 
-def require_admin(event, headers):
-    if not ADMIN_KEY:
-        return False, json_response(500, headers, {'error': 'Admin key not configured'})
-
+def has_admin_key(event):
     provided = get_header(event, 'x-admin-key') or get_header(event, 'authorization')
     if provided and provided.lower().startswith('bearer '):
         provided = provided[7:].strip()
+    return bool(ADMIN_KEY) and provided == ADMIN_KEY
 
-    if not provided or provided != ADMIN_KEY:
+def require_admin(event, headers):
+    if not ADMIN_KEY:
+        return False, json_response(500, headers, {'error': 'Admin key not configured'})
+
+    if not has_admin_key(event):
         return False, json_response(403, headers, {'error': 'Forbidden'})
 
     return True, None
 
+# Off unless PROFILE_SAMPLE_RATE > 0 or an admin sends X-Profile; see backend/profiling.py.
+profiler = profiling.Profiler.from_env(
+    on_report=lambda path, request_id, top, dumped, fields: log(
+        'INFO', 'Request profile', correlation_id=request_id, path=path, dump=dumped, top=top, **fields),
+    busy=lambda: request_gauge.active > 1 or fanout_pool.in_flight > 0)
+request_gauge = profiling.RequestGauge()
+
+limiter = ratelimit.RateLimiter(
+    store, ratelimit.parse_limits(os.environ.get('RATE_LIMITS')),
+    enabled=os.environ.get('RATE_LIMITS_ENABLED', 'true').strip().lower() == 'true',
+    on_error=lambda path, e: log('WARN', 'Rate limit counter failed', path=path, error=str(e)))
+
+def check_rate_limit(event, path, headers):
+    """429 response for a client over its limit on this route, else None"""
+    if not limiter.enabled or path not in limiter.limits:
+        return None
+    source_ip = event.get('requestContext', {}).get('http', {}).get('sourceIp')
+    body = parse_body(event)
+    fingerprint = body.get('fingerprint') if isinstance(body, dict) else None
+    retry_after = limiter.check(path, [('ip', source_ip), ('fp', str(fingerprint) if fingerprint else None)])
+    if not retry_after:
+        return None
+    put_metric('RateLimited', 1, dimensions={'Path': path})
+    return json_response(429, {**headers, 'Retry-After': str(retry_after)},
+                         {'error': 'Too many requests, slow down'}, error_code='RATE_LIMITED')
+
+# Public write routes that honor an Idempotency-Key header
+IDEMPOTENT_ROUTES = {'/vote', '/submit', '/comment', '/comment/vote', '/matchup/rate', '/newsletter'}
+idempotency_store = idempotency.IdempotencyStore(store)
+
+def idempotency_failure(error, headers):
+    if isinstance(error, idempotency.KeyInvalid):
+        return json_response(400, headers, {'error': 'Invalid Idempotency-Key'}, error_code='IDEMPOTENCY_KEY_INVALID')
+    if isinstance(error, idempotency.KeyReused):
+        return json_response(422, headers, {'error': 'Idempotency-Key was used for a different request'},
+                             error_code='IDEMPOTENCY_KEY_REUSED')
+    return json_response(409, {**headers, 'Retry-After': '1'}, {'error': 'Request still in progress'},
+                         error_code='IDEMPOTENCY_IN_PROGRESS')
+
+def replayed(path, stored, headers):
+    put_metric('IdempotentReplay', 1, dimensions={'Path': path})
+    return {**stored, 'headers': {**headers, **stored['headers'], 'Idempotent-Replayed': 'true'}}
+
+def replay_idempotent(event, path, key, headers):
+    """The stored response (or an error) for a repeated Idempotency-Key, else None"""
+    try:
+        stored = idempotency_store.lookup(path, key, event.get('body'))
+    except (idempotency.KeyInvalid, idempotency.KeyReused, idempotency.InProgress) as e:
+        return idempotency_failure(e, headers)
+    return replayed(path, stored, headers) if stored is not None else None
+
+def dispatch_idempotent(event, path, key, headers, correlation_id):
+    """Run a write once per Idempotency-Key and remember its response for retries"""
+    try:
+        stored = idempotency_store.claim(path, key, event.get('body'))
+    except (idempotency.KeyReused, idempotency.InProgress) as e:
+        return idempotency_failure(e, headers)
+    if stored is not None:
+        return replayed(path, stored, headers)
+
+    try:
+        response = dispatch(event, path, 'POST', headers, correlation_id)
+    except Exception:
+        idempotency_store.release(path, key)
+        raise
+    # Server errors are worth retrying for real, so they are not remembered.
+    if response['statusCode'] >= 500:
+        idempotency_store.release(path, key)
+    else:
+        idempotency_store.finish(path, key, response)
+    return response
+
 def handler(event, context):
+    if event.get('source') == 'aws.events':
+        # EventBridge schedule: archive ended matchups and fold them into the leaderboard
+        return archive_ended_matchups({})
     correlation_id = str(uuid.uuid4())
     path = event.get('rawPath', '/')
     method = event.get('requestContext', {}).get('http', {}).get('method', 'GET')
     start_time = time.time()
     
-    log('INFO', 'Request received', correlation_id=correlation_id, path=path, method=method)
+    log('INFO', 'Request received', correlation_id=correlation_id, path=path, method=method,
+        query=event.get('rawQueryString', ''))
     
     headers = {
         'Content-Type': 'application/json',
         'Access-Control-Allow-Origin': '*',
         'Access-Control-Allow-Methods': 'GET,POST,PATCH,DELETE,OPTIONS',
         'Access-Control-Allow-Headers': '*',
+        # Lets browser clients honor Retry-After on 429 and 409 IDEMPOTENCY_IN_PROGRESS
+        'Access-Control-Expose-Headers': 'Retry-After',
         'X-Correlation-ID': correlation_id
     }
     
     if method == 'OPTIONS':
         return {'statusCode': 200, 'headers': headers, 'body': ''}
     
+    request_gauge.enter()
+    started = request_gauge.started
+    profile = profiler.start(path, forced=get_header(event, 'x-profile') is not None and has_admin_key(event))
     try:
-        if path == '/matchup' and method == 'GET':
-            return get_active_matchup(headers)
-        elif path == '/history' and method == 'GET':
-            return get_history(headers)
-        elif path == '/future' and method == 'GET':
-            return get_future_matchups(headers)
-        elif path == '/vote' and method == 'POST':
-            body = parse_body(event)
-            valid, error = validate_request(method, body, ['matchup_id', 'side'])
-            if not valid:
-                return json_response(400, headers, {'error': error})
-            return cast_vote(body, headers, is_synthetic(event))
-        elif path == '/admin/login' and method == 'POST':
-            allowed, failure = require_admin(event, headers)
-            if not allowed:
-                return failure
-            return json_response(200, headers, {'ok': True})
-        elif path == '/admin/matchups' and method == 'GET':
-            allowed, failure = require_admin(event, headers)
-            if not allowed:
-                return failure
-            return get_admin_matchups(headers)
-        elif path == '/admin/activate' and method == 'POST':
-            allowed, failure = require_admin(event, headers)
-            if not allowed:
-                return failure
-            body = parse_body(event)
-            return activate_matchup(body, headers)
-        elif path == '/admin/matchup' and method == 'POST':
-            allowed, failure = require_admin(event, headers)
-            if not allowed:
-                return failure
-            body = parse_body(event)
-            valid, error = validate_request(method, body, [])
-            if not valid:
-                return json_response(400, headers, {'error': error})
-            return create_matchup(body, headers)
-        elif path == '/submit' and method == 'POST':
-            body = parse_body(event)
-            valid, error = validate_request(method, body, ['left_name', 'right_name', 'category'])
-            if not valid:
-                return json_response(400, headers, {'error': error})
-            return submit_matchup(body, headers)
-        elif path == '/newsletter' and method == 'POST':
-            body = parse_body(event)
-            valid, error = validate_request(method, body, ['email'])
-            if not valid:
-                return json_response(400, headers, {'error': error})
-            return subscribe_newsletter(body, headers)
-        elif path == '/visit' and method == 'POST':
-            body = parse_body(event)
-            return record_visit(body, headers, is_synthetic(event))
-        elif path == '/admin/submissions' and method == 'GET':
-            allowed, failure = require_admin(event, headers)
-            if not allowed:
-                return failure
-            return get_submissions(headers)
-        elif path == '/admin/visits' and method == 'GET':
-            allowed, failure = require_admin(event, headers)
-            if not allowed:
-                return failure
-            return get_visits(headers)
-        elif path == '/admin/entries' and method == 'GET':
-            allowed, failure = require_admin(event, headers)
-            if not allowed:
-                return failure
-            return get_entries(headers)
-        elif path.startswith('/admin/matchup/') and method == 'PATCH':
-            allowed, failure = require_admin(event, headers)
-            if not allowed:
-                return failure
-            matchup_id = path.split('/')[-1]
-            body = parse_body(event)
-            return update_matchup(matchup_id, body, headers)
-        elif path.startswith('/admin/matchup/') and method == 'DELETE':
-            allowed, failure = require_admin(event, headers)
-            if not allowed:
-                return failure
-            matchup_id = path.split('/')[-1]
-            return delete_matchup(matchup_id, headers)
-        elif path.startswith('/admin/matchup/') and path.endswith('/reset-votes') and method == 'POST':
-            allowed, failure = require_admin(event, headers)
-            if not allowed:
-                return failure
-            matchup_id = path.split('/')[-2]
-            return reset_votes(matchup_id, headers)
-        elif path.startswith('/admin/matchup/') and path.endswith('/clone') and method == 'POST':
-            allowed, failure = require_admin(event, headers)
-            if not allowed:
-                return failure
-            matchup_id = path.split('/')[-2]
-            return clone_matchup(matchup_id, headers)
-        elif path.startswith('/admin/submission/') and method == 'PATCH':
-            allowed, failure = require_admin(event, headers)
-            if not allowed:
-                return failure
-            timestamp = path.split('/')[-1]
-            body = parse_body(event)
-            return update_submission(timestamp, body, headers)
-        elif path == '/admin/bulk-activate' and method == 'POST':
-            allowed, failure = require_admin(event, headers)
-            if not allowed:
-                return failure
-            body = parse_body(event)
-            return bulk_activate(body, headers)
-        elif path == '/admin/bulk-deactivate' and method == 'POST':
-            allowed, failure = require_admin(event, headers)
-            if not allowed:
-                return failure
-            body = parse_body(event)
-            return bulk_deactivate(body, headers)
-        elif path == '/admin/archive-ended' and method == 'POST':
-            allowed, failure = require_admin(event, headers)
-            if not allowed:
-                return failure
-            return archive_ended_matchups(headers)
-        elif path == '/comments' and method == 'GET':
-            matchup_id = event.get('queryStringParameters', {}).get('matchup_id')
-            if not matchup_id:
-                return json_response(400, headers, {'error': 'matchup_id required'})
-            return get_comments(matchup_id, headers)
-        elif path == '/comment' and method == 'POST':
-            body = parse_body(event)
-            valid, error = validate_request(method, body, ['matchup_id', 'author_name', 'comment_text'])
-            if not valid:
-                return json_response(400, headers, {'error': error})
-            return post_comment(body, headers)
-        elif path == '/comment/vote' and method == 'POST':
-            body = parse_body(event)
-            return vote_comment(body, headers)
-        elif path == '/matchup/rate' and method == 'POST':
-            body = parse_body(event)
-            valid, error = validate_request(method, body, ['matchup_id', 'rating'])
-            if not valid:
-                return json_response(400, headers, {'error': error})
-            return rate_matchup(body, headers)
-        elif path.startswith('/comment/') and method == 'DELETE':
-            allowed, failure = require_admin(event, headers)
-            if not allowed:
-                return failure
-            parts = path.split('/')
-            matchup_id = parts[2]
-            timestamp = parts[3]
-            return delete_comment(matchup_id, timestamp, headers)
-        else:
-            log('WARN', 'Route not found', correlation_id=correlation_id, path=path, method=method)
-            put_metric('RouteNotFound', 1)
-            return json_response(404, headers, {'error': 'Not found'})
+        if method == 'POST':
+            idempotency_key = get_header(event, 'idempotency-key') if path in IDEMPOTENT_ROUTES else None
+            if idempotency_key is not None:
+                idempotency_key = idempotency_key.strip()
+            # Replays are answered before the rate limiter so retries don't spend the client's allowance.
+            early = replay_idempotent(event, path, idempotency_key, headers) if idempotency_key is not None else None
+            if early is None:
+                early = check_rate_limit(event, path, headers)
+            if early is not None:
+                return compress_response(event, early)
+            if idempotency_key is not None:
+                return compress_response(event, dispatch_idempotent(event, path, idempotency_key, headers,
+                                                                    correlation_id))
+        cache_key, versions = response_cache_key(event, path) if method == 'GET' else (None, None)
+        if cache_key is not None:
+            entry = cache_get(cache_key, versions)
+            if entry is not None:
+                count_response_stat('cache_hits')
+                return cached_response(event, entry, headers)
+            count_response_stat('cache_misses')
+        response = dispatch(event, path, method, headers, correlation_id)
+        if cache_key is not None:
+            entry = cache_put(cache_key, versions, response)
+            if entry is not None:
+                return cached_response(event, entry, headers)
+        return compress_response(event, response)
     except Exception as e:
         log('ERROR', 'Request failed', correlation_id=correlation_id, error=str(e), path=path, method=method)
         put_metric('RequestError', 1, dimensions={'Path': path})
         return json_response(500, headers, {'error': str(e)})
     finally:
         latency = (time.time() - start_time) * 1000
+        request_gauge.exit()
+        if profile is not None:
+            profiler.finish(profile, path, correlation_id, method=method, latency_ms=latency,
+                            overlapped=request_gauge.started != started)
         put_metric('RequestLatency', latency, unit='Milliseconds', dimensions={'Path': path})
         log('INFO', 'Request completed', correlation_id=correlation_id, latency_ms=latency)
 
-def build_matchup_payload(matchup, entries_cache=None, votes_cache=None):
+def dispatch(event, path, method, headers, correlation_id):
+    """Route a request to its endpoint handler"""
+    if path == '/matchup' and method == 'GET':
+        return get_active_matchup(headers, event.get('queryStringParameters') or {})
+    elif path == '/history' and method == 'GET':
+        return get_history(headers)
+    elif path == '/future' and method == 'GET':
+        return get_future_matchups(headers)
+    elif path == '/vote' and method == 'POST':
+        body = parse_body(event)
+        valid, error = validate_request(method, body, ['matchup_id', 'side'])
+        if not valid:
+            return json_response(400, headers, {'error': error})
+        return cast_vote(body, headers, is_synthetic(event))
+    elif path == '/admin/login' and method == 'POST':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        return json_response(200, headers, {'ok': True})
+    elif path == '/admin/matchups' and method == 'GET':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        return get_admin_matchups(headers)
+    elif path == '/admin/activate' and method == 'POST':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        body = parse_body(event)
+        return activate_matchup(body, headers)
+    elif path == '/admin/matchup' and method == 'POST':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        body = parse_body(event)
+        valid, error = validate_request(method, body, [])
+        if not valid:
+            return json_response(400, headers, {'error': error})
+        return create_matchup(body, headers)
+    elif path == '/submit' and method == 'POST':
+        body = parse_body(event)
+        valid, error = validate_request(method, body, ['left_name', 'right_name', 'category'])
+        if not valid:
+            return json_response(400, headers, {'error': error})
+        return submit_matchup(body, headers)
+    elif path == '/newsletter' and method == 'POST':
+        body = parse_body(event)
+        valid, error = validate_request(method, body, ['email'])
+        if not valid:
+            return json_response(400, headers, {'error': error})
+        return subscribe_newsletter(body, headers)
+    elif path == '/visit' and method == 'POST':
+        body = parse_body(event)
+        return record_visit(body, headers, is_synthetic(event))
+    elif path == '/admin/submissions' and method == 'GET':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        return get_submissions(headers, event.get('queryStringParameters') or {})
+    elif path == '/admin/newsletter/export' and method == 'GET':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        return export_newsletter(headers, event.get('queryStringParameters') or {})
+    elif path == '/admin/dashboard' and method == 'GET':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        return get_admin_dashboard(headers, event.get('queryStringParameters') or {})
+    elif path == '/admin/visits' and method == 'GET':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        return get_visits(headers)
+    elif path == '/admin/entries' and method == 'GET':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        return get_entries(headers)
+    elif path.startswith('/admin/matchup/') and method == 'PATCH':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        matchup_id = path.split('/')[-1]
+        body = parse_body(event)
+        return update_matchup(matchup_id, body, headers)
+    elif path.startswith('/admin/matchup/') and method == 'DELETE':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        matchup_id = path.split('/')[-1]
+        return delete_matchup(matchup_id, headers)
+    elif path.startswith('/admin/matchup/') and path.endswith('/reset-votes') and method == 'POST':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        matchup_id = path.split('/')[-2]
+        return reset_votes(matchup_id, headers)
+    elif path.startswith('/admin/matchup/') and path.endswith('/clone') and method == 'POST':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        matchup_id = path.split('/')[-2]
+        return clone_matchup(matchup_id, headers)
+    elif path.startswith('/admin/submission/') and method == 'PATCH':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        timestamp = path.split('/')[-1]
+        body = parse_body(event)
+        return update_submission(timestamp, body, headers)
+    elif path == '/admin/bulk-activate' and method == 'POST':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        body = parse_body(event)
+        return bulk_activate(body, headers)
+    elif path == '/admin/bulk-deactivate' and method == 'POST':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        body = parse_body(event)
+        return bulk_deactivate(body, headers)
+    elif path == '/admin/archive-ended' and method == 'POST':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        return archive_ended_matchups(headers)
+    elif path == '/comments' and method == 'GET':
+        matchup_id = event.get('queryStringParameters', {}).get('matchup_id')
+        if not matchup_id:
+            return json_response(400, headers, {'error': 'matchup_id required'})
+        return get_comments(matchup_id, headers, event.get('queryStringParameters') or {})
+    elif path == '/comments/summary' and method == 'GET':
+        return get_comment_summaries(headers, event.get('queryStringParameters') or {})
+    elif path == '/leaderboard' and method == 'GET':
+        return get_leaderboard(headers, event.get('queryStringParameters') or {})
+    elif path.startswith('/recap/') and method == 'GET':
+        return get_recap(path.split('/')[2], headers)
+    elif path == '/ratings' and method == 'GET':
+        return get_ratings(headers, event.get('queryStringParameters') or {})
+    elif path == '/comment' and method == 'POST':
+        body = parse_body(event)
+        valid, error = validate_request(method, body, ['matchup_id', 'author_name', 'comment_text'])
+        if not valid:
+            return json_response(400, headers, {'error': error})
+        return post_comment(body, headers)
+    elif path == '/comment/vote' and method == 'POST':
+        body = parse_body(event)
+        return vote_comment(body, headers)
+    elif path == '/matchup/rate' and method == 'POST':
+        body = parse_body(event)
+        valid, error = validate_request(method, body, ['matchup_id', 'rating'])
+        if not valid:
+            return json_response(400, headers, {'error': error})
+        return rate_matchup(body, headers)
+    elif path.startswith('/comment/') and method == 'DELETE':
+        allowed, failure = require_admin(event, headers)
+        if not allowed:
+            return failure
+        parts = path.split('/')
+        matchup_id = parts[2]
+        timestamp = parts[3]
+        return delete_comment(matchup_id, timestamp, headers)
+    else:
+        log('WARN', 'Route not found', correlation_id=correlation_id, path=path, method=method)
+        put_metric('RouteNotFound', 1)
+        return json_response(404, headers, {'error': 'Not found'})
+
+# Matchup payload fields (defaults apply when the item lacks the attribute)
+MATCHUP_FIELDS = {'id': None, 'title': None, 'category': None, 'active': False, 'cadence': '', 'starts_at': '',
+                  'ends_at': '', 'message': ''}
+ENTRY_FIELDS = {'id': None, 'name': None, 'blurb': '', 'neighborhood': '', 'tag': 'Local', 'url': '',
+                'image_url': '', 'image_variants': [], 'address': ''}
+# Attributes get_matchups needs for time windows and de-duplication
+MATCHUP_KEY_ATTRS = ('id', 'active', 'starts_at', 'ends_at', 'left_entry_id', 'right_entry_id')
+# Short keys for ?compact=1
+COMPACT_KEYS = {'id': 'i', 'title': 't', 'category': 'c', 'active': 'a', 'cadence': 'cd', 'starts_at': 's',
+                'ends_at': 'e', 'message': 'msg', 'name': 'n', 'blurb': 'b', 'neighborhood': 'nh', 'tag': 'tg',
+                'url': 'u', 'image_url': 'img', 'image_variants': 'iv', 'address': 'ad'}
+
+def parse_fields(value):
+    """(matchup fields, entry fields, include votes) for a ?fields= selector.
+
+    Accepts `matchup`, `entry` and `votes` sections or single fields such as
+    `matchup.title` and `entry.name`; ids are always included.
+    """
+    if not value:
+        return list(MATCHUP_FIELDS), list(ENTRY_FIELDS), True
+    matchup_fields, entry_fields, include_votes = ['id'], ['id'], False
+    for token in value.split(','):
+        token = token.strip()
+        section, _, field = token.partition('.')
+        if token == 'votes':
+            include_votes = True
+        elif section == 'matchup' and (not field or field in MATCHUP_FIELDS):
+            matchup_fields.extend([field] if field else MATCHUP_FIELDS)
+        elif section == 'entry' and (not field or field in ENTRY_FIELDS):
+            entry_fields.extend([field] if field else ENTRY_FIELDS)
+        elif token:
+            raise ValueError(f'Unknown field: {token}')
+    return list(dict.fromkeys(matchup_fields)), list(dict.fromkeys(entry_fields)), include_votes
+
+def pick(item, fields, defaults):
+    return {field: item.get(field, defaults[field]) for field in fields}
+
+def build_matchup_payload(matchup, entries_cache=None, votes_cache=None, fields=None):
     """Build matchup payload with optional caching for batch operations"""
+    matchup_fields, entry_fields, include_votes = fields or parse_fields(None)
     if entries_cache:
         left = entries_cache.get(matchup['left_entry_id'])
         right = entries_cache.get(matchup['right_entry_id'])
     else:
-        left = table.get_item(Key={'pk': 'ENTRY', 'sk': matchup['left_entry_id']})['Item']
-        right = table.get_item(Key={'pk': 'ENTRY', 'sk': matchup['right_entry_id']})['Item']
+        left = store.get(DATA, 'ENTRY', matchup['left_entry_id'])
+        right = store.get(DATA, 'ENTRY', matchup['right_entry_id'])
 
-    if votes_cache and matchup['id'] in votes_cache:
-        votes = votes_cache[matchup['id']]
-    else:
-        vote_resp = table.get_item(Key={'pk': f"VOTES#{matchup['id']}", 'sk': 'TOTAL'})
-        votes = vote_resp.get('Item', {'left': 0, 'right': 0})
-
-    base_boost = 0
+    payload = {
+        'matchup': pick(matchup, matchup_fields, MATCHUP_FIELDS),
+        'left': pick(left, entry_fields, ENTRY_FIELDS),
+        'right': pick(right, entry_fields, ENTRY_FIELDS)
+    }
+    if 'active' in payload['matchup']:
+        payload['matchup']['active'] = bool(payload['matchup']['active'])
 
-    return {
-        'matchup': {
-            'id': matchup['id'],
-            'title': matchup['title'],
-            'category': matchup['category'],
-            'active': bool(matchup.get('active', False)),
-            'cadence': matchup.get('cadence', ''),
-            'starts_at': matchup.get('starts_at', ''),
-            'ends_at': matchup.get('ends_at', ''),
-            'message': matchup.get('message', '')
-        },
-        'left': {
-            'id': left['id'],
-            'name': left['name'],
-            'blurb': left.get('blurb', ''),
-            'neighborhood': left.get('neighborhood', ''),
-            'tag': left.get('tag', 'Local'),
-            'url': left.get('url', ''),
-            'image_url': left.get('image_url', ''),
-            'address': left.get('address', '')
-        },
-        'right': {
-            'id': right['id'],
-            'name': right['name'],
-            'blurb': right.get('blurb', ''),
-            'neighborhood': right.get('neighborhood', ''),
-            'tag': right.get('tag', 'Local'),
-            'url': right.get('url', ''),
-            'image_url': right.get('image_url', ''),
-            'address': right.get('address', '')
-        },
-        'votes': {
+    if include_votes:
+        if votes_cache and matchup['id'] in votes_cache:
+            votes = votes_cache[matchup['id']]
+        else:
+            votes = store.get(DATA, f"VOTES#{matchup['id']}", 'TOTAL') or {'left': 0, 'right': 0}
+        base_boost = 0
+        payload['votes'] = {
             'left': int(votes.get('left', 0)) + base_boost,
             'right': int(votes.get('right', 0)) + base_boost
         }
-    }
+        # Kept on the same VOTES#<id>/TOTAL item, so the count costs nothing extra.
+        payload['comment_count'] = max(0, int(votes.get('comment_count', 0)))
+    return payload
 
-def batch_get_items(keys):
-    """Batch get items from DynamoDB"""
+def batch_get_items(keys, attributes=None):
+    """Batch get items from the data table, keyed by (pk, sk)"""
     if not keys:
         return {}
-    
-    client = boto3.client('dynamodb')
-    table_name = os.environ['TABLE_NAME']
-    
-    # DynamoDB batch_get_item limit is 100 items
-    results = {}
-    for i in range(0, len(keys), 100):
-        batch = keys[i:i+100]
-        response = client.batch_get_item(
-            RequestItems={
-                table_name: {
-                    'Keys': [{'pk': {'S': k['pk']}, 'sk': {'S': k['sk']}} for k in batch]
-                }
-            }
-        )
-        
-        for item in response.get('Responses', {}).get(table_name, []):
-            # Deserialize DynamoDB item
-            from boto3.dynamodb.types import TypeDeserializer
-            deserializer = TypeDeserializer()
-            deserialized = {k: deserializer.deserialize(v) for k, v in item.items()}
-            key = (deserialized['pk'], deserialized['sk'])
-            results[key] = deserialized
-    
-    return results
+    return store.batch_get(DATA, [(k['pk'], k['sk']) for k in keys], attributes=attributes)
 
-def get_matchups(headers, apply_time_window=True):
-    resp = table.query(
-        KeyConditionExpression='pk = :pk',
-        FilterExpression='active = :active',
-        ExpressionAttributeValues={':pk': 'MATCHUP', ':active': True}
-    )
+def hydrate_matchups(matchups, entry_attrs=None, include_votes=True):
+    """(entries by id, vote totals by matchup id) for a list of matchups in two batch reads.
+
+    entry_attrs limits which entry attributes are loaded; ids alone need no read.
+    """
+    entries = {}
+    entry_ids = dict.fromkeys(entry_id for m in matchups for entry_id in (m['left_entry_id'], m['right_entry_id']))
+    if entry_attrs is None or set(entry_attrs) - {'id'}:
+        found = batch_get_items([{'pk': 'ENTRY', 'sk': entry_id} for entry_id in entry_ids], attributes=entry_attrs)
+        entries = {sk: item for (_, sk), item in found.items()}
+    for entry_id in entry_ids:
+        entries.setdefault(entry_id, {'id': entry_id})
+
+    votes = {}
+    if include_votes:
+        found = batch_get_items([{'pk': f"VOTES#{m['id']}", 'sk': 'TOTAL'} for m in matchups],
+                                attributes=['left', 'right', 'comment_count'])
+        for matchup in matchups:
+            votes[matchup['id']] = found.get((f"VOTES#{matchup['id']}", 'TOTAL')) or {'left': 0, 'right': 0}
+    return entries, votes
+
+def compact_matchups(payloads, entries):
+    """Short keys; entries are listed once and matchups refer to them by id"""
+    def shorten(item):
+        return {COMPACT_KEYS[key]: value for key, value in item.items()}
+
+    matchups = []
+    used = {}
+    for payload in payloads:
+        compact = shorten(payload['matchup'])
+        compact['l'] = payload['left']['id']
+        compact['r'] = payload['right']['id']
+        used[payload['left']['id']] = payload['left']
+        used[payload['right']['id']] = payload['right']
+        if 'votes' in payload:
+            compact['v'] = [payload['votes']['left'], payload['votes']['right']]
+            compact['cc'] = payload['comment_count']
+        matchups.append(compact)
+    return {'m': matchups, 'e': {entry_id: shorten(entry) for entry_id, entry in used.items()}}
+
+def get_matchups(headers, apply_time_window=True, params=None):
+    params = params or {}
+    try:
+        fields = parse_fields(params.get('fields'))
+    except ValueError as e:
+        return json_response(400, headers, {'error': str(e)}, error_code='FIELDS_INVALID')
+    compact = params.get('compact', '').lower() in ('1', 'true')
+    body = matchups_body(apply_time_window, fields, compact, selective=bool(params.get('fields')))
+    log('INFO', 'Matchups retrieved', count=len(body.get('matchups', body.get('m', []))),
+        apply_time_window=apply_time_window, fields=params.get('fields', ''), compact=compact)
+    cache_seconds = 60 if apply_time_window else 0
+    return json_response(200, headers, body, cache_seconds=cache_seconds)
+
+def matchups_body(apply_time_window, fields, compact=False, selective=False):
+    """Active matchups with their entries and votes; `selective` loads only the requested fields"""
+    matchup_fields, entry_fields, include_votes = fields
+    attributes = list(dict.fromkeys([*MATCHUP_KEY_ATTRS, *matchup_fields])) if selective else None
+
+    items, _ = store.query(DATA, 'MATCHUP', filters={'active': True}, attributes=attributes)
 
     now = datetime.now(timezone.utc)
     filtered_matchups = []
-    for matchup in resp.get('Items', []):
+    for matchup in items:
         if matchup['sk'] == 'ACTIVE':
             continue
         if apply_time_window:
@@ -437,30 +831,20 @@ def get_matchups(headers, apply_time_window=True):
         if not existing or dedupe_rank(matchup) >= dedupe_rank(existing):
             deduped[pair_key] = matchup
 
-    matchups = [build_matchup_payload(m) for m in deduped.values()]
+    selected = list(deduped.values())
+    entries, votes = hydrate_matchups(selected, entry_fields if selective else None, include_votes)
+    matchups = [build_matchup_payload(m, entries, votes, fields) for m in selected]
+    return compact_matchups(matchups, entries) if compact else {'matchups': matchups}
 
-    log('INFO', 'Matchups retrieved', count=len(matchups), apply_time_window=apply_time_window)
-    cache_seconds = 60 if apply_time_window else 0
-    return json_response(200, headers, {'matchups': matchups}, cache_seconds=cache_seconds)
-
-def get_active_matchup(headers):
-    return get_matchups(headers, apply_time_window=True)
+def get_active_matchup(headers, params=None):
+    return get_matchups(headers, apply_time_window=True, params=params)
 
 def get_admin_matchups(headers):
     return get_matchups(headers, apply_time_window=False)
 
 def has_recent_vote(matchup_id, fingerprint, within_seconds=86400):
     vote_prefix = f"V#{fingerprint}#"
-    resp = table.query(
-        KeyConditionExpression='pk = :pk AND begins_with(sk, :prefix)',
-        ExpressionAttributeValues={
-            ':pk': f"VOTES#{matchup_id}",
-            ':prefix': vote_prefix
-        },
-        ScanIndexForward=False,
-        Limit=1
-    )
-    items = resp.get('Items', [])
+    items, _ = store.query(DATA, f"VOTES#{matchup_id}", prefix=vote_prefix, forward=False, limit=1)
     if not items:
         return False
 
@@ -482,7 +866,7 @@ def cast_vote(body, headers, synthetic=False):
     if not matchup_id or side not in ['left', 'right']:
         return json_response(400, headers, {'error': 'Invalid vote'}, error_code='VOTE_INVALID')
 
-    matchup = table.get_item(Key={'pk': 'MATCHUP', 'sk': matchup_id}).get('Item')
+    matchup = store.get(DATA, 'MATCHUP', matchup_id)
     if not matchup:
         return json_response(404, headers, {'error': 'Matchup not found'}, error_code='MATCHUP_NOT_FOUND')
     if not matchup.get('active', False):
@@ -497,27 +881,23 @@ def cast_vote(body, headers, synthetic=False):
         return json_response(400, headers, {'error': 'Matchup ended'}, error_code='MATCHUP_ENDED')
     
     vote_prefix = "VOTES_SYNTH" if synthetic else "VOTES"
-    vote_key = {'pk': f"{vote_prefix}#{matchup_id}", 'sk': 'TOTAL'}
 
     if not synthetic and has_recent_vote(matchup_id, fingerprint):
         return json_response(409, headers, {'error': 'Vote already cast for this matchup in the last 24 hours'}, error_code='VOTE_ALREADY_CAST')
 
     try:
-        table.update_item(
-            Key=vote_key,
-            UpdateExpression='ADD #side :inc',
-            ExpressionAttributeNames={'#side': side},
-            ExpressionAttributeValues={':inc': 1}
-        )
+        store.update(DATA, f"{vote_prefix}#{matchup_id}", 'TOTAL', add={side: 1})
         
         if not synthetic:
-            table.put_item(Item={
+            store.put(DATA, {
                 'pk': f"VOTES#{matchup_id}",
                 'sk': f"V#{fingerprint}#{datetime.utcnow().isoformat()}",
                 'side': side,
                 'ts': datetime.utcnow().isoformat()
             })
         
+        if not synthetic:
+            bump_data_version('votes')
         log('INFO', 'Vote cast', matchup_id=matchup_id, side=side, synthetic=synthetic)
         put_metric('VoteCast', 1, dimensions={'MatchupId': matchup_id, 'Side': side})
         return json_response(200, headers, {'voted': True})
@@ -527,23 +907,16 @@ def cast_vote(body, headers, synthetic=False):
         return json_response(500, headers, {'error': str(e)})
 
 def get_history(headers):
-    resp = table.query(
-        KeyConditionExpression='pk = :pk',
-        ExpressionAttributeValues={':pk': 'MATCHUP'},
-        ScanIndexForward=False
-    )
+    items, _ = store.query(DATA, 'MATCHUP', forward=False)
+    items = [item for item in items if item['sk'] != 'ACTIVE']
+    entries, votes_by_id = hydrate_matchups(items, entry_attrs=['name', 'neighborhood'])
     
     history = []
-    for item in resp.get('Items', []):
-        if item['sk'] == 'ACTIVE':
-            continue
-        
+    for item in items:
         matchup_id = item['id']
-        vote_resp = table.get_item(Key={'pk': f"VOTES#{matchup_id}", 'sk': 'TOTAL'})
-        votes = vote_resp.get('Item', {'left': 0, 'right': 0})
-        
-        left = table.get_item(Key={'pk': 'ENTRY', 'sk': item['left_entry_id']})['Item']
-        right = table.get_item(Key={'pk': 'ENTRY', 'sk': item['right_entry_id']})['Item']
+        votes = votes_by_id[matchup_id]
+        left = entries[item['left_entry_id']]
+        right = entries[item['right_entry_id']]
         
         history.append({
             'id': matchup_id,
@@ -559,25 +932,26 @@ def get_history(headers):
 
 def get_future_matchups(headers):
     """Get upcoming scheduled matchups (public endpoint)"""
-    resp = table.query(
-        KeyConditionExpression='pk = :pk',
-        FilterExpression='active = :active',
-        ExpressionAttributeValues={':pk': 'MATCHUP', ':active': True}
-    )
+    items, _ = store.query(DATA, 'MATCHUP', filters={'active': True})
     
     now = datetime.now(timezone.utc)
-    future = []
-    
-    for matchup in resp.get('Items', []):
+    upcoming = []
+    for matchup in items:
         if matchup['sk'] == 'ACTIVE':
             continue
-        
         starts_at = parse_iso8601(matchup.get('starts_at', ''))
-        if not starts_at or starts_at <= now:
-            continue
-        
-        left = table.get_item(Key={'pk': 'ENTRY', 'sk': matchup['left_entry_id']})['Item']
-        right = table.get_item(Key={'pk': 'ENTRY', 'sk': matchup['right_entry_id']})['Item']
+        if starts_at and starts_at > now:
+            upcoming.append(matchup)
+    
+    # Sort by start time, limit to 5
+    upcoming.sort(key=lambda m: m.get('starts_at', ''))
+    upcoming = upcoming[:5]
+    entries, _ = hydrate_matchups(upcoming, entry_attrs=['name'], include_votes=False)
+    
+    future = []
+    for matchup in upcoming:
+        left = entries[matchup['left_entry_id']]
+        right = entries[matchup['right_entry_id']]
         
         future.append({
             'matchup': {
@@ -591,17 +965,12 @@ def get_future_matchups(headers):
             'right': {'name': right.get('name', '')}
         })
     
-    # Sort by start time, limit to 5
-    future.sort(key=lambda x: x['matchup']['starts_at'])
-    future = future[:5]
-    
     return json_response(200, headers, {'matchups': future}, cache_seconds=300)
 
 def get_entry(entry_id):
     if not entry_id:
         return None
-    resp = table.get_item(Key={'pk': 'ENTRY', 'sk': entry_id})
-    return resp.get('Item')
+    return store.get(DATA, 'ENTRY', entry_id)
 
 def upsert_entry(entry, category):
     entry_id = entry.get('id')
@@ -619,7 +988,7 @@ def upsert_entry(entry, category):
         'category': entry.get('category', category),
         'tag': entry.get('tag', 'Local')
     }
-    table.put_item(Item=item)
+    store.put(DATA, item)
     return True, None
 
 def activate_matchup(body, headers):
@@ -633,29 +1002,22 @@ def activate_matchup(body, headers):
     if not matchup_id:
         return json_response(400, headers, {'error': 'matchup_id is required'})
 
-    target = table.get_item(Key={'pk': 'MATCHUP', 'sk': matchup_id}).get('Item')
+    target = store.get(DATA, 'MATCHUP', matchup_id)
     if not target:
         return json_response(404, headers, {'error': 'Matchup not found'})
 
     # Check for duplicate active matchups with same entries
-    resp = table.query(
-        KeyConditionExpression='pk = :pk',
-        FilterExpression='active = :active',
-        ExpressionAttributeValues={':pk': 'MATCHUP', ':active': True}
-    )
+    items, _ = store.query(DATA, 'MATCHUP', filters={'active': True})
 
-    for item in resp.get('Items', []):
+    for item in items:
         if item['sk'] == 'ACTIVE' or item['id'] == matchup_id:
             continue
         if ((item['left_entry_id'] == target['left_entry_id'] and item['right_entry_id'] == target['right_entry_id']) or
             (item['left_entry_id'] == target['right_entry_id'] and item['right_entry_id'] == target['left_entry_id'])):
             return json_response(400, headers, {'error': f"Duplicate matchup already active: {item['id']}"})
 
-    table.update_item(
-        Key={'pk': 'MATCHUP', 'sk': matchup_id},
-        UpdateExpression='SET active = :active',
-        ExpressionAttributeValues={':active': True}
-    )
+    store.update(DATA, 'MATCHUP', matchup_id, set={'active': True})
+    bump_data_version('matchups')
 
     return json_response(200, headers, {'ok': True, 'active': matchup_id})
 
@@ -697,7 +1059,7 @@ def create_matchup(body, headers):
     elif not get_entry(right_entry_id):
         return json_response(404, headers, {'error': f'Entry not found: {right_entry_id}'})
 
-    table.put_item(Item={
+    store.put(DATA, {
         'pk': 'MATCHUP',
         'sk': matchup_id,
         'id': matchup_id,
@@ -712,16 +1074,17 @@ def create_matchup(body, headers):
         'message': message
     })
 
-    vote_key = {'pk': f"VOTES#{matchup_id}", 'sk': 'TOTAL'}
-    existing_votes = table.get_item(Key=vote_key).get('Item')
+    existing_votes = store.get(DATA, f"VOTES#{matchup_id}", 'TOTAL')
     if not existing_votes:
-        table.put_item(Item={
+        store.put(DATA, {
             'pk': f"VOTES#{matchup_id}",
             'sk': 'TOTAL',
             'left': 0,
             'right': 0
         })
 
+    bump_data_version('matchups', 'entries', 'votes')
+
     # NOTE: `active` means "enabled/eligible for display".
     # Do NOT auto-switch a global "ACTIVE" pointer here; the site can have multiple active matchups.
     return json_response(200, headers, {'ok': True, 'matchup_id': matchup_id})
@@ -736,24 +1099,22 @@ def submit_matchup(body, headers):
     if not left_name or not right_name or not category:
         return json_response(400, headers, {'error': 'Missing required fields'})
     
-    timestamp = datetime.utcnow().isoformat()
-    
-    table.put_item(Item={
-        'pk': 'SUBMISSION',
-        'sk': timestamp,
-        'left_name': left_name,
-        'right_name': right_name,
-        'category': category,
-        'email': email,
-        'reason': reason,
-        'status': 'pending',
-        'created_at': timestamp,
-        'reviewed_by': '',
-        'reviewed_at': '',
-        'rejection_reason': ''
-    })
+    try:
+        _, duplicate = submissions.submit(store, {
+            'left_name': left_name,
+            'right_name': right_name,
+            'category': category,
+            'email': email,
+            'reason': reason,
+            'reviewed_by': '',
+            'reviewed_at': '',
+            'rejection_reason': ''
+        })
+    except storage.ConditionFailed as e:
+        log('WARN', 'Submission kept conflicting', error=str(e))
+        return json_response(409, headers, {'error': 'Submission conflicted, please retry'})
     
-    return json_response(200, headers, {'ok': True})
+    return json_response(200, headers, {'ok': True, 'duplicate': duplicate})
 
 
 def subscribe_newsletter(body, headers):
@@ -764,7 +1125,7 @@ def subscribe_newsletter(body, headers):
         return json_response(400, headers, {'error': 'Valid email required'})
 
     now = datetime.utcnow().isoformat()
-    table.put_item(Item={
+    store.put(DATA, {
         'pk': 'NEWSLETTER',
         'sk': email,
         'email': email,
@@ -777,18 +1138,44 @@ def subscribe_newsletter(body, headers):
     log('INFO', 'Newsletter subscription', email=email, source=source)
     return json_response(200, headers, {'ok': True})
 
+NEWSLETTER_EXPORT_MAX = 5000
+
+def export_newsletter(headers, params):
+    """One chunk of the subscriber list as CSV or JSONL; X-Next-Cursor points at the next chunk"""
+    fmt = params.get('format', 'csv')
+    if fmt not in newsletter.CONTENT_TYPES:
+        return json_response(400, headers, {'error': 'format must be csv or jsonl'})
+    try:
+        limit = min(max(int(params.get('limit', newsletter.PAGE_SIZE)), 1), NEWSLETTER_EXPORT_MAX)
+        since, until = newsletter.parse_bound(params.get('since')), newsletter.parse_bound(params.get('until'))
+    except ValueError:
+        return json_response(400, headers, {'error': 'limit must be a number and since/until ISO dates'})
+    try:
+        start_key = decode_cursor(params['cursor'], newsletter.PK) if params.get('cursor') else None
+    except ValueError as e:
+        return json_response(400, headers, {'error': str(e)}, error_code='CURSOR_INVALID')
+
+    subscribers, last_key = next(newsletter.pages(store, params.get('status'), params.get('source'), since, until,
+                                                  page_size=limit, start_key=start_key))
+    response_headers = {
+        **headers,
+        'Content-Type': newsletter.CONTENT_TYPES[fmt],
+        'Content-Disposition': f'attachment; filename="newsletter.{fmt}"',
+        'Cache-Control': 'no-cache, no-store, must-revalidate',
+        'Access-Control-Expose-Headers': 'X-Next-Cursor, X-Row-Count, Retry-After',
+        'X-Row-Count': str(len(subscribers))
+    }
+    if last_key:
+        response_headers['X-Next-Cursor'] = encode_cursor(last_key)
+    return {'statusCode': 200, 'headers': response_headers,
+            'body': newsletter.encode(subscribers, fmt, header=start_key is None)}
+
 def update_visit_count(sk, now):
-    resp = table.update_item(
-        Key={'pk': 'VISIT', 'sk': sk},
-        UpdateExpression='ADD #count :inc SET #updated_at = :now',
-        ExpressionAttributeNames={'#count': 'count', '#updated_at': 'updated_at'},
-        ExpressionAttributeValues={':inc': 1, ':now': now.isoformat()},
-        ReturnValues='UPDATED_NEW'
-    )
-    return resp.get('Attributes', {}).get('count', 0)
+    item = store.update(DATA, 'VISIT', sk, set={'updated_at': now.isoformat()}, add={'count': 1}, return_new=True)
+    return item.get('count', 0)
 
 def get_visit_count(sk):
-    item = table.get_item(Key={'pk': 'VISIT', 'sk': sk}).get('Item', {})
+    item = store.get(DATA, 'VISIT', sk) or {}
     return item.get('count', 0)
 
 def record_visit(body, headers, synthetic=False):
@@ -808,24 +1195,27 @@ def record_visit(body, headers, synthetic=False):
     })
 
 def get_visits(headers):
-    all_item = table.get_item(Key={'pk': 'VISIT', 'sk': 'ALL'}).get('Item', {})
-    real_item = table.get_item(Key={'pk': 'VISIT', 'sk': 'REAL'}).get('Item', {})
+    return json_response(200, headers, visits_body())
 
-    return json_response(200, headers, {
+def visits_body():
+    found = store.batch_get(DATA, [('VISIT', 'ALL'), ('VISIT', 'REAL')])
+    all_item = found.get(('VISIT', 'ALL')) or {}
+    real_item = found.get(('VISIT', 'REAL')) or {}
+    return {
         'all': all_item.get('count', 0),
         'real': real_item.get('count', 0),
         'updated_at': all_item.get('updated_at', '')
-    })
+    }
 
 def get_entries(headers):
     """Get all entries grouped by category"""
-    resp = table.query(
-        KeyConditionExpression='pk = :pk',
-        ExpressionAttributeValues={':pk': 'ENTRY'}
-    )
+    return json_response(200, headers, entries_body(), cache_seconds=300)
+
+def entries_body():
+    items, _ = store.query(DATA, 'ENTRY')
     
     entries_by_category = {}
-    for item in resp.get('Items', []):
+    for item in items:
         category = item.get('category', 'Other')
         if category not in entries_by_category:
             entries_by_category[category] = []
@@ -840,55 +1230,56 @@ def get_entries(headers):
     for category in entries_by_category:
         entries_by_category[category].sort(key=lambda x: x['name'])
     
-    return json_response(200, headers, {'entries': entries_by_category}, cache_seconds=300)
-
-def get_submissions(headers):
-    resp = table.query(
-        KeyConditionExpression='pk = :pk',
-        ExpressionAttributeValues={':pk': 'SUBMISSION'},
-        ScanIndexForward=False,
-        Limit=50
-    )
-    
-    submissions = []
-    for item in resp.get('Items', []):
-        submissions.append({
-            'timestamp': item['sk'],
-            'left_name': item.get('left_name', ''),
-            'right_name': item.get('right_name', ''),
-            'category': item.get('category', ''),
-            'email': item.get('email', ''),
-            'reason': item.get('reason', ''),
-            'status': item.get('status', 'pending'),
-            'reviewed_by': item.get('reviewed_by', ''),
-            'reviewed_at': item.get('reviewed_at', ''),
-            'rejection_reason': item.get('rejection_reason', '')
-        })
-    
-    return json_response(200, headers, {'submissions': submissions})
+    return {'entries': entries_by_category}
+
+SUBMISSIONS_PAGE_SIZE = 50
+SUBMISSIONS_MAX = 200
+
+def get_submissions(headers, params=None):
+    """One status queue, oldest first for pending and newest first otherwise, with a cursor"""
+    params = params or {}
+    status = params.get('status', 'pending')
+    if status not in submissions.STATUSES:
+        return json_response(400, headers, {'error': 'Invalid status'})
+    try:
+        limit = min(max(int(params.get('limit', SUBMISSIONS_PAGE_SIZE)), 1), SUBMISSIONS_MAX)
+    except ValueError:
+        return json_response(400, headers, {'error': 'limit must be a number'})
+    pk = submissions.status_pk(status)
+    try:
+        start_key = decode_cursor(params['cursor'], pk) if params.get('cursor') else None
+    except ValueError as e:
+        return json_response(400, headers, {'error': str(e)}, error_code='CURSOR_INVALID')
+
+    return json_response(200, headers, submissions_body(status, limit, start_key))
+
+def submissions_body(status='pending', limit=SUBMISSIONS_PAGE_SIZE, start_key=None):
+    items, last_key = store.query(DATA, submissions.status_pk(status), forward=status == 'pending', limit=limit,
+                                  start_key=start_key)
+    return {
+        'status': status,
+        'submissions': [submissions.submission_payload(item) for item in items],
+        'next_cursor': encode_cursor(last_key)
+    }
 
 def update_submission(timestamp, body, headers):
     """Update submission status (approve/reject)"""
     status = body.get('status')
     rejection_reason = body.get('rejection_reason', '')
     
-    if status not in ['pending', 'approved', 'rejected']:
+    if status not in submissions.STATUSES:
         return json_response(400, headers, {'error': 'Invalid status'})
     
-    update_expr = 'SET #status = :status, reviewed_at = :now'
-    expr_values = {':status': status, ':now': datetime.utcnow().isoformat()}
-    expr_names = {'#status': 'status'}
-    
+    updates = {'reviewed_at': datetime.utcnow().isoformat()}
     if rejection_reason:
-        update_expr += ', rejection_reason = :reason'
-        expr_values[':reason'] = rejection_reason
+        updates['rejection_reason'] = rejection_reason
     
-    table.update_item(
-        Key={'pk': 'SUBMISSION', 'sk': timestamp},
-        UpdateExpression=update_expr,
-        ExpressionAttributeValues=expr_values,
-        ExpressionAttributeNames=expr_names
-    )
+    try:
+        submissions.set_status(store, timestamp, status, updates)
+    except submissions.NotFound:
+        return json_response(404, headers, {'error': 'Submission not found'}, error_code='NOT_FOUND')
+    except storage.ConditionFailed:
+        return json_response(409, headers, {'error': 'Submission was changed by someone else, reload and retry'})
     
     return json_response(200, headers, {'ok': True})
 
@@ -896,45 +1287,16 @@ def update_matchup(matchup_id, body, headers):
     if not matchup_id:
         return json_response(400, headers, {'error': 'matchup_id required'})
     
-    update_expr = []
-    expr_values = {}
-    expr_names = {}
-    
-    if 'ends_at' in body:
-        update_expr.append('#ends_at = :ends_at')
-        expr_values[':ends_at'] = body['ends_at']
-        expr_names['#ends_at'] = 'ends_at'
-
-    if 'starts_at' in body:
-        update_expr.append('#starts_at = :starts_at')
-        expr_values[':starts_at'] = body['starts_at']
-        expr_names['#starts_at'] = 'starts_at'
-
-    if 'cadence' in body:
-        update_expr.append('#cadence = :cadence')
-        expr_values[':cadence'] = body['cadence']
-        expr_names['#cadence'] = 'cadence'
-    
-    if 'message' in body:
-        update_expr.append('#message = :message')
-        expr_values[':message'] = body['message']
-        expr_names['#message'] = 'message'
-    
+    updates = {field: body[field] for field in ('ends_at', 'starts_at', 'cadence', 'message') if field in body}
     if 'active' in body:
-        update_expr.append('#active = :active')
-        expr_values[':active'] = bool(body['active'])
-        expr_names['#active'] = 'active'
+        updates['active'] = bool(body['active'])
     
-    if not update_expr:
+    if not updates:
         return json_response(400, headers, {'error': 'No fields to update'})
     
     try:
-        table.update_item(
-            Key={'pk': 'MATCHUP', 'sk': matchup_id},
-            UpdateExpression='SET ' + ', '.join(update_expr),
-            ExpressionAttributeValues=expr_values,
-            ExpressionAttributeNames=expr_names
-        )
+        store.update(DATA, 'MATCHUP', matchup_id, set=updates)
+        bump_data_version('matchups')
         return json_response(200, headers, {'ok': True})
     except Exception as e:
         return json_response(500, headers, {'error': str(e)})
@@ -945,10 +1307,11 @@ def delete_matchup(matchup_id, headers):
 
     try:
         # Remove matchup definition
-        table.delete_item(Key={'pk': 'MATCHUP', 'sk': matchup_id})
+        store.delete(DATA, 'MATCHUP', matchup_id)
 
         # Remove vote counter row
-        table.delete_item(Key={'pk': f"VOTES#{matchup_id}", 'sk': 'TOTAL'})
+        store.delete(DATA, f"VOTES#{matchup_id}", 'TOTAL')
+        bump_data_version('matchups', 'votes')
 
         return json_response(200, headers, {'ok': True, 'deleted': matchup_id})
     except Exception as e:
@@ -960,25 +1323,22 @@ def reset_votes(matchup_id, headers):
         return json_response(400, headers, {'error': 'matchup_id required'})
     
     try:
-        table.put_item(Item={
-            'pk': f"VOTES#{matchup_id}",
-            'sk': 'TOTAL',
-            'left': 0,
-            'right': 0
-        })
+        # Update rather than overwrite so the comment counter survives.
+        store.update(DATA, f"VOTES#{matchup_id}", 'TOTAL', set={'left': 0, 'right': 0})
+        bump_data_version('votes')
         return json_response(200, headers, {'ok': True})
     except Exception as e:
         return json_response(500, headers, {'error': str(e)})
 
 def clone_matchup(matchup_id, headers):
     """Clone an existing matchup"""
-    matchup = table.get_item(Key={'pk': 'MATCHUP', 'sk': matchup_id}).get('Item')
+    matchup = store.get(DATA, 'MATCHUP', matchup_id)
     if not matchup:
         return json_response(404, headers, {'error': 'Matchup not found'})
     
     new_id = f"{matchup_id}-clone-{int(datetime.utcnow().timestamp())}"
     
-    table.put_item(Item={
+    store.put(DATA, {
         'pk': 'MATCHUP',
         'sk': new_id,
         'id': new_id,
@@ -993,98 +1353,261 @@ def clone_matchup(matchup_id, headers):
         'message': matchup.get('message', '')
     })
     
-    table.put_item(Item={
+    store.put(DATA, {
         'pk': f"VOTES#{new_id}",
         'sk': 'TOTAL',
         'left': 0,
         'right': 0
     })
     
+    bump_data_version('matchups')
+    
     return json_response(200, headers, {'ok': True, 'matchup_id': new_id})
 
-def bulk_activate(body, headers):
-    """Activate multiple matchups"""
+BULK_MAX_IDS = 500
+# WCU/s one bulk action may use, and seconds it may spend before leaving the rest as skipped
+BULK_WRITE_RATE = float(os.environ.get('BULK_WRITE_RATE', '100'))
+BULK_TIME_BUDGET = float(os.environ.get('BULK_TIME_BUDGET', '6'))
+
+def update_matchups(matchup_ids, updates, expected=None):
+    """Conditionally update matchups side by side; {matchup_id: (status, error)}"""
+    results = bulk.update_many(store, fanout_pool, DATA, [('MATCHUP', matchup_id) for matchup_id in matchup_ids],
+                               set=updates, expected=expected, write_rate=BULK_WRITE_RATE,
+                               time_budget=BULK_TIME_BUDGET)
+    return {sk: result for (_, sk), result in results.items()}
+
+def bulk_result_body(results):
+    updated = sum(status == bulk.UPDATED for status, _ in results.values())
+    return {
+        'ok': updated == len(results),
+        'count': updated,
+        'results': {matchup_id: status for matchup_id, (status, _) in results.items()},
+        'errors': {matchup_id: error for matchup_id, (_, error) in results.items() if error}
+    }
+
+def set_matchups_active(body, headers, active):
     matchup_ids = body.get('matchup_ids', [])
-    if not matchup_ids:
+    if not matchup_ids or not isinstance(matchup_ids, list):
         return json_response(400, headers, {'error': 'matchup_ids required'})
+    if len(matchup_ids) > BULK_MAX_IDS or not all(isinstance(i, str) and i for i in matchup_ids):
+        return json_response(400, headers, {'error': f'matchup_ids must be up to {BULK_MAX_IDS} ids'})
     
-    for matchup_id in matchup_ids:
-        table.update_item(
-            Key={'pk': 'MATCHUP', 'sk': matchup_id},
-            UpdateExpression='SET active = :active',
-            ExpressionAttributeValues={':active': True}
-        )
-    
-    return json_response(200, headers, {'ok': True, 'count': len(matchup_ids)})
+    results = update_matchups(matchup_ids, {'active': active})
+    body = bulk_result_body(results)
+    if body['count']:
+        bump_data_version('matchups')
+    log('INFO', 'Bulk matchup update', active=active, requested=len(results), updated=body['count'])
+    return json_response(200, headers, body)
+
+def bulk_activate(body, headers):
+    """Activate multiple matchups"""
+    return set_matchups_active(body, headers, True)
 
 def bulk_deactivate(body, headers):
     """Deactivate multiple matchups"""
-    matchup_ids = body.get('matchup_ids', [])
-    if not matchup_ids:
-        return json_response(400, headers, {'error': 'matchup_ids required'})
-    
-    for matchup_id in matchup_ids:
-        table.update_item(
-            Key={'pk': 'MATCHUP', 'sk': matchup_id},
-            UpdateExpression='SET active = :active',
-            ExpressionAttributeValues={':active': False}
-        )
-    
-    return json_response(200, headers, {'ok': True, 'count': len(matchup_ids)})
+    return set_matchups_active(body, headers, False)
 
 def archive_ended_matchups(headers):
     """Auto-archive matchups that have ended"""
-    resp = table.query(
-        KeyConditionExpression='pk = :pk',
-        FilterExpression='active = :active',
-        ExpressionAttributeValues={':pk': 'MATCHUP', ':active': True}
-    )
+    items, _ = store.query(DATA, 'MATCHUP', filters={'active': True})
     
     now = datetime.now(timezone.utc)
-    archived = 0
-    
-    for matchup in resp.get('Items', []):
+    ended = {}
+    for matchup in items:
         if matchup['sk'] == 'ACTIVE':
             continue
         
         ends_at = parse_iso8601(matchup.get('ends_at', ''))
         if ends_at and now > ends_at:
-            table.update_item(
-                Key={'pk': 'MATCHUP', 'sk': matchup['id']},
-                UpdateExpression='SET active = :inactive',
-                ExpressionAttributeValues={':inactive': False}
-            )
-            archived += 1
-    
-    log('INFO', 'Auto-archived ended matchups', count=archived)
-    return json_response(200, headers, {'ok': True, 'archived': archived})
+            ended[matchup['id']] = matchup
+    
+    # Only still-active matchups are archived; one re-activated meanwhile is left alone.
+    results = update_matchups(list(ended), {'active': False}, expected={'active': True})
+    body = bulk_result_body(results)
+    archived = [ended[matchup_id] for matchup_id, (status, _) in results.items() if status == bulk.UPDATED]
+    
+    ranked = record_results(archived)
+    if archived:
+        bump_data_version('matchups')
+    log('INFO', 'Auto-archived ended matchups', count=len(archived), ranked=ranked,
+        skipped=sum(status == bulk.SKIPPED for status, _ in results.values()), errors=len(body['errors']))
+    return json_response(200, headers, {**body, 'archived': len(archived), 'ranked': ranked})
+
+def record_results(matchups):
+    """Fold ended matchups into the leaderboard; returns how many changed it"""
+    if not matchups:
+        return 0
+    entries, votes = hydrate_matchups(matchups, entry_attrs=['name'])
+    names = {entry_id: entry.get('name', '') for entry_id, entry in entries.items()}
+    ranked = 0
+    for matchup in sorted(matchups, key=lambda m: m.get('ends_at', '')):
+        totals = votes[matchup['id']]
+        try:
+            ranked += leaderboard.apply_matchup(store, matchup, totals.get('left', 0), totals.get('right', 0), names)
+        except storage.ConditionFailed as e:
+            # Left for scripts/rebuild_leaderboard.py; archiving still goes ahead.
+            log('WARN', 'Leaderboard update failed', matchup_id=matchup['id'], error=str(e))
+    if ranked:
+        bump_data_version('leaderboard')
+    return ranked
+
+RECAP_WEEK = re.compile(r'^\d{4}-W\d{2}$')
+
+def get_recap(week, headers):
+    """Precomputed weekly recap (scripts/build_recap.py); 'latest' for the newest one"""
+    latest = week == 'latest'
+    if latest:
+        pointer = store.get(DATA, 'RECAP', 'LATEST')
+        week = pointer.get('week', '') if pointer else ''
+    if not RECAP_WEEK.match(week):
+        return json_response(404, headers, {'error': 'Recap not found'}, error_code='NOT_FOUND')
+    item = store.get(DATA, f'RECAP#{week}', 'SUMMARY')
+    if not item:
+        return json_response(404, headers, {'error': 'Recap not found'}, error_code='NOT_FOUND')
+    return json_response(200, headers, {'recap': json.loads(item['recap_json'])},
+                         cache_seconds=30 if latest else 3600)
+
+LEADERBOARD_PAGE_SIZE = 50
+LEADERBOARD_MAX = 500
+
+def get_leaderboard(headers, params):
+    """Entries ranked by rating, overall or within one category"""
+    category = (params.get('category') or '').strip() or leaderboard.ALL
+    try:
+        limit = min(max(int(params.get('limit', LEADERBOARD_PAGE_SIZE)), 1), LEADERBOARD_MAX)
+    except ValueError:
+        return json_response(400, headers, {'error': 'limit must be a number'})
+    # Highest elo first straight off pk-elo-index, so a read costs ``limit`` items, not the whole board.
+    items, _ = store.query(DATA, leaderboard.board_pk(category), forward=False, limit=limit, index='elo',
+                           attributes=['entry_id', 'name', 'elo', 'wins', 'losses', 'ties', 'matchups',
+                                       'votes_for', 'votes_against'])
+    standings = [{'rank': n, **leaderboard.standing_payload(item)} for n, item in enumerate(items, 1)]
+    return json_response(200, headers, {'category': category, 'standings': standings}, cache_seconds=300)
+
+# Comment ordering: rank = score * RANK_SCORE_WEIGHT + timestamp_ms, indexed by the comments
+# table's pk-rank-index GSI. Votes ADD +/-RANK_SCORE_WEIGHT, so the rank stays in step atomically.
+RANK_SCORE_WEIGHT = 10 ** 13
+COMMENTS_PAGE_SIZE = 100
+
+def comment_rank(upvotes, downvotes, timestamp):
+    return (int(upvotes) - int(downvotes)) * RANK_SCORE_WEIGHT + int(timestamp)
+
+def encode_cursor(last_key):
+    if not last_key:
+        return None
+    raw = json.dumps(last_key, default=decimal_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
 
-def get_comments(matchup_id, headers):
-    """Get all comments for a matchup"""
-    comments_table = dynamodb.Table('scrumble-comments')
-    
-    resp = comments_table.query(
-        KeyConditionExpression='pk = :pk',
-        ExpressionAttributeValues={':pk': f'COMMENT#{matchup_id}'},
-        ScanIndexForward=False,
-        Limit=100
-    )
-    
-    comments = []
-    for item in resp.get('Items', []):
-        comments.append({
-            'author_name': item.get('author_name', 'Anonymous'),
-            'comment_text': item.get('comment_text', ''),
-            'timestamp': item.get('sk', '').replace('TIMESTAMP#', ''),
-            'created_at': item.get('created_at', ''),
-            'upvotes': int(item.get('upvotes', 0)),
-            'downvotes': int(item.get('downvotes', 0))
-        })
-    
-    # Sort by score (upvotes - downvotes)
-    comments.sort(key=lambda c: c['upvotes'] - c['downvotes'], reverse=True)
-    
-    return json_response(200, headers, {'comments': comments}, cache_seconds=30)
+def decode_cursor(cursor, pk, index=None):
+    """ExclusiveStartKey from a cursor issued for the same partition (and index, if any)"""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor') from None
+    if not isinstance(key, dict) or key.get('pk') != pk or not isinstance(key.get('sk'), str):
+        raise ValueError('Invalid cursor')
+    # A cursor from another ordering (e.g. sort=new into sort=top) lacks the index attribute.
+    if index and (isinstance(key.get(index), bool) or not isinstance(key.get(index), (int, float))):
+        raise ValueError('Invalid cursor')
+    # ... and one going the other way carries it; ExclusiveStartKey must hold only the key schema.
+    return {name: key[name] for name in ('pk', 'sk', index) if name}
+
+SUMMARY_MAX_IDS = 25
+RATINGS_MAX_IDS = 100
+SUMMARY_TOP_DEFAULT = 3
+SUMMARY_TOP_MAX = 10
+# Shared worker threads for endpoints that issue independent reads side by side
+fanout_pool = profiling.TrackedPool(max_workers=8, thread_name_prefix='fanout')
+
+# Sections of /admin/dashboard, each the body of the matching /admin/<section> route
+DASHBOARD_SECTIONS = {
+    'matchups': lambda: matchups_body(False, parse_fields(None)),
+    'submissions': lambda: submissions_body('pending'),
+    'visits': visits_body,
+    'entries': entries_body,
+}
+
+def timed_section(name):
+    started = time.perf_counter()
+    try:
+        return DASHBOARD_SECTIONS[name](), None, (time.perf_counter() - started) * 1000
+    except Exception as e:
+        log('ERROR', 'Dashboard section failed', section=name, error=str(e))
+        return None, str(e), (time.perf_counter() - started) * 1000
+
+def get_admin_dashboard(headers, params):
+    """The admin sections in one call, read side by side; `sections` picks a subset"""
+    requested = [s.strip() for s in params.get('sections', '').split(',') if s.strip()] or list(DASHBOARD_SECTIONS)
+    unknown = [s for s in requested if s not in DASHBOARD_SECTIONS]
+    if unknown:
+        return json_response(400, headers, {'error': f'Unknown sections: {", ".join(unknown)}'})
+    requested = list(dict.fromkeys(requested))
+
+    started = time.perf_counter()
+    results = dict(zip(requested, fanout_pool.map(timed_section, requested)))
+    body = {name: result for name, (result, error, _) in results.items() if error is None}
+    body['errors'] = {name: error for name, (_, error, _) in results.items() if error is not None}
+    body['timings_ms'] = {name: round(ms, 1) for name, (_, _, ms) in results.items()}
+    body['timings_ms']['total'] = round((time.perf_counter() - started) * 1000, 1)
+    return json_response(200, headers, body)
+
+def comment_payload(item):
+    return {
+        'author_name': item.get('author_name', 'Anonymous'),
+        'comment_text': item.get('comment_text', ''),
+        'timestamp': item.get('sk', '').replace('TIMESTAMP#', ''),
+        'created_at': item.get('created_at', ''),
+        'upvotes': int(item.get('upvotes', 0)),
+        'downvotes': int(item.get('downvotes', 0))
+    }
+
+def get_comments(matchup_id, headers, params=None):
+    """A page of comments: `top` (by score, then newest) or `new`, with a cursor for the next page"""
+    params = params or {}
+    sort = params.get('sort', 'top')
+    if sort not in ('top', 'new'):
+        return json_response(400, headers, {'error': 'sort must be top or new'})
+    try:
+        limit = min(max(int(params.get('limit', COMMENTS_PAGE_SIZE)), 1), COMMENTS_PAGE_SIZE)
+    except ValueError:
+        return json_response(400, headers, {'error': 'limit must be a number'})
+    pk = f'COMMENT#{matchup_id}'
+    index = 'rank' if sort == 'top' else None
+    try:
+        start_key = decode_cursor(params['cursor'], pk, index) if params.get('cursor') else None
+    except ValueError as e:
+        return json_response(400, headers, {'error': str(e)}, error_code='CURSOR_INVALID')
+
+    items, last_key = store.query(COMMENTS, pk, forward=False, limit=limit, start_key=start_key, index=index)
+    
+    comments = [comment_payload(item) for item in items]
+    return json_response(200, headers, {'comments': comments, 'sort': sort, 'next_cursor': encode_cursor(last_key)},
+                         cache_seconds=30)
+
+def get_comment_summaries(headers, params):
+    """Comment counts and top comments for several matchups at once"""
+    ids = list(dict.fromkeys(i.strip() for i in params.get('ids', '').split(',') if i.strip()))
+    if not ids:
+        return json_response(400, headers, {'error': 'ids required'}, error_code='MISSING_FIELD')
+    if len(ids) > SUMMARY_MAX_IDS:
+        return json_response(400, headers, {'error': f'At most {SUMMARY_MAX_IDS} ids'})
+    try:
+        top = min(max(int(params.get('top', SUMMARY_TOP_DEFAULT)), 0), SUMMARY_TOP_MAX)
+    except ValueError:
+        return json_response(400, headers, {'error': 'top must be a number'})
+
+    totals = batch_get_items([{'pk': f'VOTES#{i}', 'sk': 'TOTAL'} for i in ids], attributes=['comment_count'])
+    counts = {i: max(0, int((totals.get((f'VOTES#{i}', 'TOTAL')) or {}).get('comment_count', 0))) for i in ids}
+
+    # One Limit=top index query per matchup that has comments, run side by side.
+    def top_comments(matchup_id):
+        items, _ = store.query(COMMENTS, f'COMMENT#{matchup_id}', forward=False, limit=top, index='rank')
+        return [comment_payload(item) for item in items]
+
+    with_comments = [i for i in ids if counts[i] and top]
+    previews = dict(zip(with_comments, fanout_pool.map(top_comments, with_comments)))
+    summaries = {i: {'count': counts[i], 'top': previews.get(i, [])} for i in ids}
+    return json_response(200, headers, {'summaries': summaries}, cache_seconds=30)
 
 def post_comment(body, headers):
     """Post a new comment"""
@@ -1102,20 +1625,37 @@ def post_comment(body, headers):
     if len(comment_text) > 500:
         return json_response(400, headers, {'error': 'Comment too long'})
     
-    comments_table = dynamodb.Table('scrumble-comments')
-    timestamp = str(int(time.time() * 1000))
+    if not store.get(DATA, 'MATCHUP', matchup_id):
+        return json_response(404, headers, {'error': 'Matchup not found'}, error_code='MATCHUP_NOT_FOUND')
     
-    comments_table.put_item(Item={
-        'pk': f'COMMENT#{matchup_id}',
-        'sk': f'TIMESTAMP#{timestamp}',
-        'author_name': author_name,
-        'comment_text': comment_text,
-        'fingerprint': fingerprint,
-        'created_at': datetime.utcnow().isoformat(),
-        'upvotes': 0,
-        'downvotes': 0
-    })
+    # The comment and the matchup's comment_count are written together; a comment
+    # landing on a taken millisecond moves just past the newest one.
+    timestamp = int(time.time() * 1000)
+    for attempt in range(5):
+        try:
+            store.transact([
+                storage.put_op(COMMENTS, {
+                    'pk': f'COMMENT#{matchup_id}',
+                    'sk': f'TIMESTAMP#{timestamp}',
+                    'author_name': author_name,
+                    'comment_text': comment_text,
+                    'fingerprint': fingerprint,
+                    'created_at': datetime.utcnow().isoformat(),
+                    'upvotes': 0,
+                    'downvotes': 0,
+                    'rank': comment_rank(0, 0, timestamp)
+                }, if_absent=True),
+                storage.update_op(DATA, f'VOTES#{matchup_id}', 'TOTAL', add={'comment_count': 1}),
+            ])
+            break
+        except storage.ConditionFailed:
+            newest, _ = store.query(COMMENTS, f'COMMENT#{matchup_id}', forward=False, limit=1)
+            newest_ms = int(newest[0]['sk'].replace('TIMESTAMP#', '')) if newest else timestamp
+            timestamp = max(timestamp, newest_ms) + 1
+    else:
+        return json_response(409, headers, {'error': 'Comment collided with another, please retry'})
     
+    bump_data_version(f'comments#{matchup_id}', 'comment_counts')
     log('INFO', 'Comment posted', matchup_id=matchup_id, author=author_name)
     return json_response(200, headers, {'ok': True})
 
@@ -1130,50 +1670,41 @@ def vote_comment(body, headers):
     if not matchup_id or not timestamp or vote_type not in ['up', 'down']:
         return json_response(400, headers, {'error': 'Invalid vote'})
     
-    comments_table = dynamodb.Table('scrumble-comments')
-    
-    # Check if already voted
-    vote_key = f'VOTE#{matchup_id}#{timestamp}#{fingerprint}'
-    existing = comments_table.get_item(
-        Key={'pk': 'COMMENT_VOTE', 'sk': vote_key}
-    ).get('Item')
-    
-    if existing:
-        return json_response(400, headers, {'error': 'Already voted'})
-    
-    # Record vote
-    comments_table.put_item(Item={
-        'pk': 'COMMENT_VOTE',
-        'sk': vote_key,
-        'vote_type': vote_type,
-        'created_at': datetime.utcnow().isoformat()
-    })
-    
-    # Update comment vote count
+    # The voter marker and the comment's counts and rank land together or not at all
     field = 'upvotes' if vote_type == 'up' else 'downvotes'
-    comments_table.update_item(
-        Key={'pk': f'COMMENT#{matchup_id}', 'sk': f'TIMESTAMP#{timestamp}'},
-        UpdateExpression=f'ADD {field} :inc',
-        ExpressionAttributeValues={':inc': 1}
-    )
+    delta = RANK_SCORE_WEIGHT if vote_type == 'up' else -RANK_SCORE_WEIGHT
+    try:
+        store.transact([
+            storage.update_op(COMMENTS, f'COMMENT#{matchup_id}', f'TIMESTAMP#{timestamp}',
+                              add={field: 1, 'rank': delta}, if_exists=True),
+            storage.put_op(COMMENTS, {
+                'pk': 'COMMENT_VOTE',
+                'sk': f'VOTE#{matchup_id}#{timestamp}#{fingerprint}',
+                'vote_type': vote_type,
+                'created_at': datetime.utcnow().isoformat()
+            }, if_absent=True),
+        ])
+    except storage.ConditionFailed as e:
+        if 0 in e.failed:
+            return json_response(404, headers, {'error': 'Comment not found'})
+        return json_response(400, headers, {'error': 'Already voted'})
     
+    bump_data_version(f'comments#{matchup_id}')
     log('INFO', 'Comment vote', matchup_id=matchup_id, timestamp=timestamp, vote_type=vote_type)
     return json_response(200, headers, {'ok': True})
 
-
 def delete_comment(matchup_id, timestamp, headers):
     """Delete a comment (admin only)"""
-    comments_table = dynamodb.Table('scrumble-comments')
-    
     try:
-        comments_table.delete_item(
-            Key={
-                'pk': f'COMMENT#{matchup_id}',
-                'sk': f'TIMESTAMP#{timestamp}'
-            }
-        )
+        store.transact([
+            storage.delete_op(COMMENTS, f'COMMENT#{matchup_id}', f'TIMESTAMP#{timestamp}', if_exists=True),
+            storage.update_op(DATA, f'VOTES#{matchup_id}', 'TOTAL', add={'comment_count': -1}),
+        ])
+        bump_data_version(f'comments#{matchup_id}', 'comment_counts')
         log('INFO', 'Comment deleted', matchup_id=matchup_id, timestamp=timestamp)
         return json_response(200, headers, {'ok': True})
+    except storage.ConditionFailed:
+        return json_response(404, headers, {'error': 'Comment not found'})
     except Exception as e:
         log('ERROR', 'Delete comment failed', error=str(e))
         return json_response(500, headers, {'error': str(e)})
@@ -1188,28 +1719,36 @@ def rate_matchup(body, headers):
     if rating not in ['good', 'bad']:
         return json_response(400, headers, {'error': 'Invalid rating'})
     
-    # Check if already rated
-    rate_key = {'pk': f'MATCHUP_RATING#{matchup_id}', 'sk': f'VOTE#{fingerprint}'}
-    existing = table.get_item(Key=rate_key).get('Item')
-    
-    if existing:
-        return json_response(400, headers, {'error': 'Already rated'})
-    
-    # Record rating
-    table.put_item(Item={
-        'pk': f'MATCHUP_RATING#{matchup_id}',
-        'sk': f'VOTE#{fingerprint}',
-        'rating': rating,
-        'created_at': datetime.utcnow().isoformat()
-    })
-    
-    # Update aggregate
+    # Record the rating and bump the aggregate together; a repeat rater fails the condition
     field = 'good_count' if rating == 'good' else 'bad_count'
-    table.update_item(
-        Key={'pk': f'MATCHUP_RATING#{matchup_id}', 'sk': 'AGGREGATE'},
-        UpdateExpression=f'ADD {field} :inc',
-        ExpressionAttributeValues={':inc': 1}
-    )
+    try:
+        store.transact([
+            storage.put_op(DATA, {
+                'pk': f'MATCHUP_RATING#{matchup_id}',
+                'sk': f'VOTE#{fingerprint}',
+                'rating': rating,
+                'created_at': datetime.utcnow().isoformat()
+            }, if_absent=True),
+            storage.update_op(DATA, f'MATCHUP_RATING#{matchup_id}', 'AGGREGATE', add={field: 1}),
+        ])
+    except storage.ConditionFailed:
+        return json_response(400, headers, {'error': 'Already rated'})
     
+    bump_data_version('ratings')
     log('INFO', 'Matchup rated', matchup_id=matchup_id, rating=rating)
     return json_response(200, headers, {'ok': True})
+
+def get_ratings(headers, params):
+    """Good/bad rating totals for several matchups in one batched read"""
+    ids = list(dict.fromkeys(i.strip() for i in params.get('ids', '').split(',') if i.strip()))
+    if not ids:
+        return json_response(400, headers, {'error': 'ids required'}, error_code='MISSING_FIELD')
+    if len(ids) > RATINGS_MAX_IDS:
+        return json_response(400, headers, {'error': f'At most {RATINGS_MAX_IDS} ids'})
+    aggregates = batch_get_items([{'pk': f'MATCHUP_RATING#{i}', 'sk': 'AGGREGATE'} for i in ids],
+                                 attributes=['good_count', 'bad_count'])
+    ratings = {}
+    for matchup_id in ids:
+        aggregate = aggregates.get((f'MATCHUP_RATING#{matchup_id}', 'AGGREGATE')) or {}
+        ratings[matchup_id] = {'good': int(aggregate.get('good_count', 0)), 'bad': int(aggregate.get('bad_count', 0))}
+    return json_response(200, headers, {'ratings': ratings}, cache_seconds=30)
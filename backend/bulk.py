@@ -0,0 +1,67 @@
+"""Bulk conditional updates for admin actions.
+
+Each key is updated on its own with ``attribute_exists``, so a missing item
+is reported rather than created, and one failure does not stop the rest.
+Updates run on a shared bounded thread pool, draw write capacity from a
+token bucket, and stop starting new work once the time budget is spent, so a
+large batch finishes inside the Lambda timeout. Keys that did not get a
+turn come back as ``skipped`` for the caller to retry.
+"""
+
+import threading
+import time
+
+import storage
+
+UPDATED = 'updated'
+CONDITION_FAILED = 'condition_failed'
+ERROR = 'error'
+SKIPPED = 'skipped'
+
+
+class WriteBudget:
+    """Token bucket over write capacity units, shared by one bulk run's workers"""
+
+    def __init__(self, rate):
+        self.rate = float(rate)
+        self.tokens = self.rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, units, deadline):
+        """Wait for ``units``; False if they cannot be had before ``deadline`` (monotonic)"""
+        if self.rate <= 0:
+            return True
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= units:
+                    self.tokens -= units
+                    return True
+                wait = (units - self.tokens) / self.rate
+            if now + wait >= deadline:
+                return False
+            time.sleep(wait)
+
+
+def update_many(store, executor, table, keys, set=None, expected=None, write_rate=0, time_budget=None):
+    """Update every (pk, sk) in ``keys``; returns {key: (status, error message or None)}"""
+    deadline = time.monotonic() + time_budget if time_budget else float('inf')
+    budget = WriteBudget(write_rate)
+
+    def update(key):
+        # Small items: one conditional update costs one WCU.
+        if time.monotonic() >= deadline or not budget.take(1, deadline):
+            return SKIPPED, None
+        try:
+            store.update(table, key[0], key[1], set=set, if_exists=True, expected=expected)
+            return UPDATED, None
+        except storage.ConditionFailed:
+            return CONDITION_FAILED, None
+        except Exception as e:
+            return ERROR, str(e)
+
+    keys = list(dict.fromkeys(keys))
+    return dict(zip(keys, executor.map(update, keys)))
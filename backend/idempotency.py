@@ -0,0 +1,106 @@
+"""Idempotency-Key support for the public write endpoints.
+
+The first request with a key claims it with a conditional put, runs, and
+stores its response on the claim. Retries with the same key and body get the
+stored response back from one GetItem, without re-running the route. Items
+live in the data table under IDEMPOTENCY#<key> and expire via the
+``expires_at`` TTL.
+"""
+
+import hashlib
+import time
+
+import storage
+from storage import DATA
+
+RESPONSE_TTL = 24 * 60 * 60
+# A claim older than this belongs to a request that died mid-flight (Lambda timeout is 10s)
+PENDING_TTL = 30
+MAX_KEY_LENGTH = 128
+
+
+class KeyInvalid(Exception):
+    """The Idempotency-Key header is malformed"""
+
+
+class KeyReused(Exception):
+    """The key was already used for a different request body"""
+
+
+class InProgress(Exception):
+    """Another request with this key has not finished yet"""
+
+
+def request_hash(body):
+    return hashlib.sha256((body or '').encode('utf-8')).hexdigest()
+
+
+class IdempotencyStore:
+    """Claims keys and remembers the responses they produced"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def _key(self, path, key):
+        if not key or len(key) > MAX_KEY_LENGTH or not key.isprintable():
+            raise KeyInvalid(key)
+        return f'IDEMPOTENCY#{key}', path
+
+    def _resolve(self, existing, key, body):
+        """Stored response, InProgress or KeyReused for an existing claim; None if it is stale"""
+        if existing.get('request_hash') != request_hash(body):
+            raise KeyReused(key)
+        if existing.get('status') == 'done':
+            return {'statusCode': int(existing['status_code']), 'headers': dict(existing.get('headers') or {}),
+                    'body': existing['body']}
+        if int(existing.get('expires_at', 0)) > time.time():
+            raise InProgress(key)
+        return None
+
+    def lookup(self, path, key, body):
+        """Stored response for a replay (one GetItem), or None if the request should run"""
+        pk, sk = self._key(path, key)
+        existing = self.store.get(DATA, pk, sk)
+        return self._resolve(existing, key, body) if existing else None
+
+    def claim(self, path, key, body):
+        """Claim the key for this request; returns the stored response if another request finished first"""
+        pk, sk = self._key(path, key)
+        expires_at = int(time.time()) + PENDING_TTL
+        try:
+            self.store.put(DATA, {'pk': pk, 'sk': sk, 'status': 'pending', 'request_hash': request_hash(body),
+                                  'expires_at': expires_at}, if_absent=True)
+            return None
+        except storage.ConditionFailed:
+            existing = self.store.get(DATA, pk, sk)
+        if existing is None:
+            # Expired and removed between the put and the read; let the client retry.
+            raise InProgress(key)
+        stored = self._resolve(existing, key, body)
+        if stored is not None:
+            return stored
+        # The earlier attempt never finished; take over its claim.
+        try:
+            self.store.update(DATA, pk, sk, set={'expires_at': expires_at},
+                              expected={'status': 'pending', 'expires_at': existing['expires_at']})
+        except storage.ConditionFailed:
+            raise InProgress(key)
+        return None
+
+    def finish(self, path, key, response):
+        """Store the response on the claim so retries replay it"""
+        pk, sk = self._key(path, key)
+        headers = {name: value for name, value in response.get('headers', {}).items()
+                   if name in ('Content-Type', 'Cache-Control')}
+        self.store.update(DATA, pk, sk, set={
+            'status': 'done',
+            'status_code': response['statusCode'],
+            'headers': headers,
+            'body': response.get('body', ''),
+            'expires_at': int(time.time()) + RESPONSE_TTL,
+        })
+
+    def release(self, path, key):
+        """Drop a claim whose request failed, so a retry runs it again"""
+        pk, sk = self._key(path, key)
+        self.store.delete(DATA, pk, sk)
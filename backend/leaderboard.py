@@ -0,0 +1,149 @@
+"""Entry standings and Elo ratings, kept current as matchups end.
+
+Standings are precomputed LEADERBOARD#<scope>/ENTRY#<id> items in the data
+table: one ALL board plus one board per category. The Elo rating is stored as
+``elo`` (``rating`` on the data table already holds matchup good/bad votes),
+and the pk-elo-index GSI orders each board by it, so the top N of a
+leaderboard is a single Query that reads N items. Each ended matchup is applied once, guarded by a
+LEADERBOARD_APPLIED/<matchup_id> marker written in the same transaction as the
+four standings it changes.
+"""
+
+from decimal import Decimal
+
+import storage
+from storage import DATA
+
+ALL = 'ALL'
+INITIAL_RATING = 1500
+K_FACTOR = 32
+APPLIED_PK = 'LEADERBOARD_APPLIED'
+
+
+def board_pk(scope):
+    return f'LEADERBOARD#{scope}'
+
+
+def standing_key(scope, entry_id):
+    return board_pk(scope), f'ENTRY#{entry_id}'
+
+
+def new_standing(scope, entry_id, name=''):
+    pk, sk = standing_key(scope, entry_id)
+    return {'pk': pk, 'sk': sk, 'entry_id': entry_id, 'name': name, 'elo': Decimal(INITIAL_RATING),
+            'wins': 0, 'losses': 0, 'ties': 0, 'matchups': 0, 'votes_for': 0, 'votes_against': 0}
+
+
+def left_score(left_votes, right_votes):
+    """1, 0 or 0.5 for the left entry; None when nobody voted"""
+    if left_votes == right_votes:
+        return None if left_votes == 0 else 0.5
+    return 1.0 if left_votes > right_votes else 0.0
+
+
+def standing_rating(standing):
+    # Standings written before the elo attribute kept it in rating; rebuild_leaderboard.py rewrites them.
+    return standing.get('elo', standing.get('rating', INITIAL_RATING))
+
+
+def expected_score(rating, opponent_rating):
+    return 1 / (1 + 10 ** ((float(opponent_rating) - float(rating)) / 400))
+
+
+def apply_result(left, right, left_votes, right_votes):
+    """Updated copies of two standings after one matchup (None if it has no result)"""
+    score = left_score(left_votes, right_votes)
+    if score is None:
+        return None
+    expected = expected_score(standing_rating(left), standing_rating(right))
+    delta = K_FACTOR * (score - expected)
+    updated = []
+    for standing, won, votes_for, votes_against, change in (
+            (left, score, left_votes, right_votes, delta), (right, 1 - score, right_votes, left_votes, -delta)):
+        standing = dict(standing)
+        standing['elo'] = Decimal(str(round(float(standing_rating(standing)) + change, 2)))
+        standing.pop('rating', None)
+        standing['wins'] = int(standing['wins']) + (won == 1)
+        standing['losses'] = int(standing['losses']) + (won == 0)
+        standing['ties'] = int(standing['ties']) + (won == 0.5)
+        standing['matchups'] = int(standing['matchups']) + 1
+        standing['votes_for'] = int(standing['votes_for']) + votes_for
+        standing['votes_against'] = int(standing['votes_against']) + votes_against
+        updated.append(standing)
+    return updated
+
+
+def scopes(matchup):
+    category = matchup.get('category')
+    return (ALL, category) if category and category != ALL else (ALL,)
+
+
+def apply_matchup(store, matchup, left_votes, right_votes, names=None, attempts=5):
+    """Fold one ended matchup into the standings; False if it was already applied or has no votes"""
+    left_votes, right_votes = int(left_votes), int(right_votes)
+    left_id, right_id = matchup['left_entry_id'], matchup['right_entry_id']
+    if left_score(left_votes, right_votes) is None or left_id == right_id:
+        return False
+    names = names or {}
+    keys = [standing_key(scope, entry_id) for scope in scopes(matchup) for entry_id in (left_id, right_id)]
+    for attempt in range(attempts):
+        current = store.batch_get(DATA, keys)
+        ops = [storage.put_op(DATA, {'pk': APPLIED_PK, 'sk': matchup['id'], 'left_votes': left_votes,
+                                     'right_votes': right_votes}, if_absent=True)]
+        for scope in scopes(matchup):
+            existing = [current.get(standing_key(scope, entry_id)) for entry_id in (left_id, right_id)]
+            pair = [item or new_standing(scope, entry_id, names.get(entry_id, ''))
+                    for item, entry_id in zip(existing, (left_id, right_id))]
+            for before, after in zip(existing, apply_result(pair[0], pair[1], left_votes, right_votes)):
+                if names.get(after['entry_id']):
+                    after['name'] = names[after['entry_id']]
+                if before is None:
+                    ops.append(storage.put_op(DATA, after, if_absent=True))
+                else:
+                    # Optimistic: another matchup touching this entry must not land in between.
+                    fields = {k: v for k, v in after.items() if k not in ('pk', 'sk')}
+                    ops.append(storage.update_op(DATA, after['pk'], after['sk'], set=fields,
+                                                 remove=['rating'] if 'rating' in before else None,
+                                                 expected={'matchups': before['matchups']}))
+        try:
+            store.transact(ops)
+            return True
+        except storage.ConditionFailed as e:
+            if 0 in e.failed:
+                return False
+    raise storage.ConditionFailed(f'Standings for {matchup["id"]} kept changing underneath')
+
+
+def rebuild(matchups, totals, names):
+    """(standings, applied markers) recomputed from ended matchups in end order"""
+    boards = {}
+    applied = []
+    for matchup in sorted(matchups, key=lambda m: (m.get('ends_at', ''), m['id'])):
+        votes = totals.get(matchup['id']) or {}
+        left_votes, right_votes = int(votes.get('left', 0)), int(votes.get('right', 0))
+        if left_score(left_votes, right_votes) is None or matchup['left_entry_id'] == matchup['right_entry_id']:
+            continue
+        for scope in scopes(matchup):
+            pair = [boards.get(standing_key(scope, entry_id)) or
+                    new_standing(scope, entry_id, names.get(entry_id, ''))
+                    for entry_id in (matchup['left_entry_id'], matchup['right_entry_id'])]
+            for standing in apply_result(pair[0], pair[1], left_votes, right_votes):
+                boards[(standing['pk'], standing['sk'])] = standing
+        applied.append({'pk': APPLIED_PK, 'sk': matchup['id'], 'left_votes': left_votes, 'right_votes': right_votes})
+    return list(boards.values()), applied
+
+
+def standing_payload(standing):
+    votes_for, votes_against = int(standing.get('votes_for', 0)), int(standing.get('votes_against', 0))
+    total = votes_for + votes_against
+    return {
+        'entry_id': standing.get('entry_id'),
+        'name': standing.get('name', ''),
+        'rating': round(float(standing_rating(standing))),
+        'wins': int(standing.get('wins', 0)),
+        'losses': int(standing.get('losses', 0)),
+        'ties': int(standing.get('ties', 0)),
+        'matchups': int(standing.get('matchups', 0)),
+        'votes': votes_for,
+        'vote_share': round(votes_for / total, 4) if total else 0.0,
+    }
@@ -0,0 +1,65 @@
+"""Newsletter subscriber export.
+
+Subscribers are NEWSLETTER/<email> items in the data table. An export walks
+that partition one Query page at a time and encodes each page on its own, so
+memory stays flat however long the list is. Status and source filters run
+server-side; the created_at range is checked on each page because created_at
+is not part of the key.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+from storage import DATA
+
+PK = 'NEWSLETTER'
+FIELDS = ('email', 'status', 'source', 'created_at', 'updated_at')
+CONTENT_TYPES = {'csv': 'text/csv; charset=utf-8', 'jsonl': 'application/x-ndjson'}
+PAGE_SIZE = 1000
+
+
+def parse_bound(value):
+    """created_at bound ('2026-02-01' or a full ISO time) in the stored naive-UTC format"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def in_range(item, since=None, until=None):
+    created_at = item.get('created_at', '')
+    return (not since or created_at >= since) and (not until or created_at < until)
+
+
+def pages(store, status=None, source=None, since=None, until=None, page_size=PAGE_SIZE, start_key=None):
+    """Yield (subscribers, last_key) for each Query page; last_key is None on the final page"""
+    filters = {name: value for name, value in (('status', status), ('source', source)) if value}
+    while True:
+        items, last_key = store.query(DATA, PK, limit=page_size, start_key=start_key, filters=filters or None,
+                                      attributes=list(FIELDS))
+        yield [item for item in items if in_range(item, since, until)], last_key
+        if not last_key:
+            return
+        start_key = last_key
+
+
+def _cell(value):
+    # Spreadsheet apps run cells starting with these as formulas.
+    value = str(value or '')
+    return "'" + value if value[:1] in ('=', '+', '-', '@') else value
+
+
+def encode(subscribers, fmt, header=False):
+    """One chunk of the export as text; ``header`` adds the CSV header row"""
+    if fmt == 'jsonl':
+        return ''.join(json.dumps({field: item.get(field, '') for field in FIELDS}) + '\n' for item in subscribers)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    if header:
+        writer.writerow(FIELDS)
+    writer.writerows([_cell(item.get(field)) for field in FIELDS] for item in subscribers)
+    return buffer.getvalue()
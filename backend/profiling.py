@@ -0,0 +1,145 @@
+"""Opt-in cProfile sampling of requests.
+
+A fraction of requests (optionally only on some paths), plus any request an
+admin asks for with an ``X-Profile`` header, run under cProfile. The top
+functions by cumulative time are reported as one structured log entry, and
+the full profile can be written to a directory for ``python -m pstats`` or
+snakeviz.
+
+Up to Python 3.11 cProfile only sees the request's own thread, so reads
+fanned out to worker threads show up as time spent waiting on the pool. From
+3.12 it is built on sys.monitoring and records calls made on every thread
+while it is enabled: the request's fan-out is attributed to it, but so is
+anything else running at the time. There, a request is not sampled while
+any other request is in the handler (server.py runs several at once) or the
+fan-out pool still has work in flight. A request that starts while a profile
+is running still lands in it; the report then carries ``overlapped=True``.
+"""
+
+import cProfile
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_TOP = 25
+# cProfile records every thread's calls on 3.12+ (sys.monitoring), only its own before that
+SEES_ALL_THREADS = sys.version_info >= (3, 12)
+
+
+def function_name(func):
+    filename, line, name = func
+    if filename == '~':
+        return name  # built-ins such as <method 'dumps' ...>
+    return f'{os.path.basename(filename)}:{line}({name})'
+
+
+def top_functions(profile, limit=DEFAULT_TOP):
+    """The ``limit`` functions with the most cumulative time, as log-friendly dicts"""
+    stats = pstats.Stats(profile).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [{
+        'function': function_name(func),
+        'calls': primitive if primitive == total else f'{total}/{primitive}',
+        'tottime_ms': round(tottime * 1000, 3),
+        'cumtime_ms': round(cumtime * 1000, 3),
+    } for func, (primitive, total, tottime, cumtime, _) in rows]
+
+
+class TrackedPool(ThreadPoolExecutor):
+    """ThreadPoolExecutor that counts submitted work not yet finished"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.in_flight = 0
+        self._count_lock = threading.Lock()
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = super().submit(fn, *args, **kwargs)
+        with self._count_lock:
+            self.in_flight += 1
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        with self._count_lock:
+            self.in_flight -= 1
+
+
+class RequestGauge:
+    """Requests currently in the handler; ``started`` counts every request ever begun"""
+
+    def __init__(self):
+        self.active = 0
+        self.started = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.active += 1
+            self.started += 1
+
+    def exit(self):
+        with self._lock:
+            self.active -= 1
+
+
+class Profiler:
+    """Decides which requests to profile and reports what they spent time on"""
+
+    def __init__(self, sample_rate=0.0, paths=None, top=DEFAULT_TOP, dump_dir=None, on_report=None, busy=None):
+        self.sample_rate = sample_rate
+        self.paths = set(paths or ())
+        self.top = top
+        self.dump_dir = dump_dir
+        self.on_report = on_report
+        # Returns True while other threads are doing work that a 3.12+ profile would pick up
+        self.busy = busy
+        # One profiler per process: cProfile refuses to nest, and overlapping requests would blur together.
+        self._busy = threading.Lock()
+
+    @classmethod
+    def from_env(cls, environ=os.environ, on_report=None, busy=None):
+        paths = [p.strip() for p in environ.get('PROFILE_PATHS', '').split(',') if p.strip()]
+        return cls(sample_rate=float(environ.get('PROFILE_SAMPLE_RATE', '0') or 0), paths=paths,
+                   top=int(environ.get('PROFILE_TOP', DEFAULT_TOP)), dump_dir=environ.get('PROFILE_DIR') or None,
+                   on_report=on_report, busy=busy)
+
+    def start(self, path, forced=False):
+        """A running cProfile.Profile for this request, or None if it is not sampled"""
+        if not forced:
+            if self.sample_rate <= 0 or (self.paths and path not in self.paths):
+                return None
+            if random.random() >= self.sample_rate:
+                return None
+        if SEES_ALL_THREADS and self.busy and self.busy():
+            return None
+        if not self._busy.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (a debugger, or python -m cProfile) already owns the hook.
+            self._busy.release()
+            return None
+        return profile
+
+    def finish(self, profile, path, request_id, **fields):
+        """Stop ``profile`` and report it; returns the dump path if one was written"""
+        try:
+            profile.disable()
+        finally:
+            self._busy.release()
+        dumped = None
+        if self.dump_dir:
+            os.makedirs(self.dump_dir, exist_ok=True)
+            slug = re.sub(r'[^A-Za-z0-9]+', '_', path).strip('_') or 'root'
+            dumped = os.path.join(self.dump_dir, f'{slug}-{request_id}.prof')
+            profile.dump_stats(dumped)
+        if self.on_report:
+            self.on_report(path, request_id, top_functions(profile, self.top), dumped, fields)
+        return dumped
@@ -0,0 +1,127 @@
+"""Per-client rate limits for the public write endpoints.
+
+Each instance keeps a token bucket per (route, client key). A coarse
+fixed-window counter in the data table bounds the total across instances:
+instances add their admitted requests to it in small batches and stop
+admitting a key once the shared count passes the limit. Rejections are
+decided from local state only, so a rejected request never writes.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from storage import DATA
+
+# path -> (requests, window seconds)
+DEFAULT_LIMITS = {
+    '/vote': (30, 60),
+    '/comment': (5, 60),
+    '/comment/vote': (30, 60),
+    '/submit': (3, 300),
+    '/newsletter': (3, 300),
+    '/visit': (20, 60),
+}
+# Source IPs are shared behind NATs and carrier gateways, so they get more room than fingerprints.
+IP_FACTOR = 4
+# Admitted requests an instance batches before adding them to the shared window counter
+SYNC_EVERY = 5
+MAX_KEYS = 10000
+
+
+def parse_limits(spec, defaults=DEFAULT_LIMITS):
+    """Overlay 'path=requests/seconds,...' on the defaults; 'path=0' turns a route off."""
+    limits = dict(defaults)
+    for part in (spec or '').split(','):
+        if not part.strip():
+            continue
+        path, _, value = part.partition('=')
+        path, value = path.strip(), value.strip()
+        if value in ('0', 'off'):
+            limits.pop(path, None)
+            continue
+        requests, _, seconds = value.partition('/')
+        limits[path] = (int(requests), int(seconds or 60))
+    return limits
+
+
+class RateLimiter:
+    """Token buckets per client key, backed by a shared window counter"""
+
+    def __init__(self, store, limits, enabled=True, on_error=None):
+        self.store = store
+        self.limits = limits
+        self.enabled = enabled
+        self.on_error = on_error
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, path, client_keys):
+        """Seconds the client should wait before retrying, or 0 if the request may proceed"""
+        if not self.enabled or path not in self.limits:
+            return 0
+        requests, window = self.limits[path]
+        now = time.time()
+        waits, flushes = [], []
+        with self._lock:
+            states = []
+            for kind, value in client_keys:
+                if not value:
+                    continue
+                limit = requests * IP_FACTOR if kind == 'ip' else requests
+                states.append((self._state(f'{path}#{kind}#{value}', limit, now), limit))
+            for state, limit in states:
+                waits.append(self._wait(state, limit, window, now))
+            if max(waits, default=0) > 0:
+                return math.ceil(max(waits))
+            # Admit: take a token from every key and batch the hit for the shared counter.
+            for state, limit in states:
+                state['tokens'] -= 1
+                state['pending'] += 1
+                if state['pending'] >= max(1, min(SYNC_EVERY, limit // 4)):
+                    flushes.append((state, limit, state['window'], state['pending']))
+                    state['pending'] = 0
+        for state, limit, window_index, count in flushes:
+            self._flush(path, state, limit, window, window_index, count)
+        return 0
+
+    def _state(self, key, limit, now):
+        state = self._keys.get(key)
+        if state is None:
+            state = {'key': key, 'tokens': float(limit), 'updated': now, 'window': None,
+                     'pending': 0, 'blocked_until': 0}
+            self._keys[key] = state
+            if len(self._keys) > MAX_KEYS:
+                self._keys.popitem(last=False)
+        else:
+            self._keys.move_to_end(key)
+        return state
+
+    def _wait(self, state, limit, window, now):
+        window_index = int(now // window)
+        if state['window'] != window_index:
+            # Hits not yet flushed from the previous window are dropped with it.
+            state['window'], state['pending'] = window_index, 0
+        state['tokens'] = min(limit, state['tokens'] + (now - state['updated']) * limit / window)
+        state['updated'] = now
+        if state['blocked_until'] > now:
+            return state['blocked_until'] - now
+        if state['tokens'] < 1:
+            return (1 - state['tokens']) * window / limit
+        return 0
+
+    def _flush(self, path, state, limit, window, window_index, count):
+        window_end = (window_index + 1) * window
+        try:
+            counter = self.store.update(DATA, f'RATELIMIT#{state["key"]}', f'W#{window_index}',
+                                        add={'count': count}, set={'expires_at': window_end + window},
+                                        return_new=True)
+        except Exception as e:
+            # The shared counter is best effort; local buckets still apply.
+            if self.on_error:
+                self.on_error(path, e)
+            return
+        if int(counter.get('count', 0)) >= limit:
+            with self._lock:
+                state['blocked_until'] = max(state['blocked_until'], window_end)
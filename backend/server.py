@@ -0,0 +1,267 @@
+"""Long-running HTTP server for the Lambda handler.
+
+Adapts HTTP/1.1 requests into Function URL (payload v2.0) events and runs
+``app.handler`` on a worker thread pool, so one warm process (with its
+storage connections and module-level caches) serves many requests at once.
+
+    python backend/server.py --port 8080 --workers 32
+    STORAGE_BACKEND=sqlite SQLITE_PATH=scrumble.db python backend/server.py
+
+SIGTERM/SIGINT stop accepting connections, let in-flight requests finish
+(up to --grace seconds) and then exit.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import signal
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+IDLE_TIMEOUT = 75
+
+
+def log(level, message, **kwargs):
+    """Structured JSON logging"""
+    print(json.dumps({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                      'level': level, 'message': message, **kwargs}), flush=True)
+
+
+class BadRequest(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def build_event(method, target, version, headers, body, peer):
+    """Function URL (payload v2.0) event for one HTTP request"""
+    path, _, query = target.partition('?')
+    event = {
+        'version': '2.0',
+        'rawPath': path,
+        'rawQueryString': query,
+        'headers': headers,
+        'requestContext': {
+            'http': {
+                'method': method,
+                'path': path,
+                'protocol': version,
+                'sourceIp': peer,
+                'userAgent': headers.get('user-agent', ''),
+            },
+            'requestId': str(uuid.uuid4()),
+            'timeEpoch': int(time.time() * 1000),
+        },
+        'isBase64Encoded': False,
+    }
+    if query:
+        params = {}
+        for key, value in parse_qsl(query, keep_blank_values=True):
+            # Function URLs join repeated parameters with commas.
+            params[key] = f'{params[key]},{value}' if key in params else value
+        event['queryStringParameters'] = params
+    if body:
+        try:
+            event['body'] = body.decode('utf-8')
+        except UnicodeDecodeError:
+            event['body'] = base64.b64encode(body).decode('ascii')
+            event['isBase64Encoded'] = True
+    return event
+
+
+async def read_request(reader):
+    """(method, target, version, headers, body), or None when the client closed the connection"""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise BadRequest(400, 'Incomplete request') from None
+        return None
+    except asyncio.LimitOverrunError:
+        raise BadRequest(431, 'Request header fields too large') from None
+
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, version = lines[0].split(' ')
+    except ValueError:
+        raise BadRequest(400, 'Malformed request line') from None
+    if not version.startswith('HTTP/1.'):
+        raise BadRequest(505, 'HTTP version not supported')
+
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(':')
+        if not sep:
+            raise BadRequest(400, 'Malformed header')
+        name = name.strip().lower()
+        value = value.strip()
+        headers[name] = f'{headers[name]},{value}' if name in headers else value
+
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        raise BadRequest(411, 'Chunked request bodies are not supported')
+    try:
+        length = int(headers.get('content-length', '0') or 0)
+    except ValueError:
+        raise BadRequest(400, 'Invalid Content-Length') from None
+    if length > MAX_BODY_BYTES:
+        raise BadRequest(413, 'Request body too large')
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target, version, headers, body
+
+
+def encode_response(response, keep_alive, head_only=False):
+    status = int(response.get('statusCode', 200))
+    body = response.get('body') or ''
+    if response.get('isBase64Encoded'):
+        payload = base64.b64decode(body)
+    else:
+        payload = body.encode('utf-8') if isinstance(body, str) else body
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ''
+    lines = [f'HTTP/1.1 {status} {reason}']
+    for name, value in (response.get('headers') or {}).items():
+        if name.lower() not in ('content-length', 'connection', 'transfer-encoding'):
+            lines.append(f'{name}: {value}')
+    for cookie in response.get('cookies') or []:
+        lines.append(f'Set-Cookie: {cookie}')
+    lines.append(f'Content-Length: {len(payload)}')
+    lines.append('Connection: keep-alive' if keep_alive else 'Connection: close')
+    head = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+    return head if head_only else head + payload
+
+
+def error_response(status, message):
+    return {
+        'statusCode': status,
+        'headers': {'Content-Type': 'application/json'},
+        'body': json.dumps({'success': False, 'error': message, 'error_code': None, 'data': None}),
+    }
+
+
+class Server:
+    """asyncio front end; handler calls run on a thread pool"""
+
+    def __init__(self, handler, workers=32, grace=20.0):
+        self.handler = handler
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='handler')
+        self.grace = grace
+        self.connections = {}
+        self.stopping = False
+        self.stats = {'requests': 0, 'errors': 0, 'in_flight': 0, 'started_at': time.time()}
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.on_connection, host, port, limit=MAX_HEADER_BYTES,
+                                            reuse_address=True)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:
+                pass
+        log('INFO', 'Server listening', host=host, port=port, workers=self.workers)
+        async with server:
+            await stop.wait()
+            await self.shutdown(server)
+
+    async def shutdown(self, server):
+        """Stop accepting, drain in-flight requests, then close idle connections"""
+        self.stopping = True
+        server.close()
+        log('INFO', 'Shutting down', in_flight=self.stats['in_flight'], connections=len(self.connections))
+        for task, busy in list(self.connections.items()):
+            if not busy:
+                task.cancel()
+        pending = list(self.connections)
+        if pending:
+            done, still_running = await asyncio.wait(pending, timeout=self.grace)
+            for task in still_running:
+                task.cancel()
+            if still_running:
+                log('WARN', 'Cancelled requests after grace period', count=len(still_running))
+        self.executor.shutdown(wait=True)
+        log('INFO', 'Server stopped', requests=self.stats['requests'], errors=self.stats['errors'])
+
+    async def on_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections[task] = False
+        peer = (writer.get_extra_info('peername') or ('127.0.0.1',))[0]
+        try:
+            while not self.stopping:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), IDLE_TIMEOUT)
+                except BadRequest as e:
+                    writer.write(encode_response(error_response(e.status, str(e)), keep_alive=False))
+                    await writer.drain()
+                    break
+                except asyncio.TimeoutError:
+                    break
+                if request is None:
+                    break
+                self.connections[task] = True
+                method, target, version, headers, body = request
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and (version == 'HTTP/1.1' or headers.get('connection', '').lower() == 'keep-alive'))
+                response = await self.dispatch(method, target, version, headers, body, peer)
+                keep_alive = keep_alive and not self.stopping
+                writer.write(encode_response(response, keep_alive, head_only=method == 'HEAD'))
+                await writer.drain()
+                self.connections[task] = False
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Idle keep-alive connections are cancelled on shutdown.
+            pass
+        finally:
+            self.connections.pop(task, None)
+            writer.close()
+
+    async def dispatch(self, method, target, version, headers, body, peer):
+        if target == '/healthz':
+            return {'statusCode': 200, 'headers': {'Content-Type': 'application/json'},
+                    'body': json.dumps({'ok': not self.stopping, **self.stats})}
+        event = build_event('GET' if method == 'HEAD' else method, target, version, headers, body, peer)
+        self.stats['requests'] += 1
+        self.stats['in_flight'] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self.handler, event, None)
+        except Exception as e:
+            self.stats['errors'] += 1
+            log('ERROR', 'Handler raised', error=str(e), path=event['rawPath'])
+            return error_response(500, 'Internal server error')
+        finally:
+            self.stats['in_flight'] -= 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the Scrumble API over HTTP without Lambda.')
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', '8080')))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WORKERS', '32')),
+                        help='Handler threads (concurrent requests)')
+    parser.add_argument('--grace', type=float, default=20.0, help='Seconds to let in-flight requests finish on shutdown')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app
+
+    asyncio.run(Server(app.handler, workers=args.workers, grace=args.grace).serve(args.host, args.port))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,539 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from decimal import Decimal
+
+DATA = 'data'
+COMMENTS = 'comments'
+
+
+class ConditionFailed(Exception):
+    """A conditional write found the item in an unexpected state"""
+
+    def __init__(self, message='', failed=()):
+        super().__init__(message)
+        # Positions of the ops whose condition failed, for transact()
+        self.failed = tuple(failed)
+
+
+class Storage:
+    """Item storage keyed by (pk, sk) on logical tables DATA and COMMENTS.
+
+    Numbers come back as Decimal, like boto3. ``query`` applies ``limit``
+    before ``filters`` (DynamoDB semantics) and returns ``(items, last_key)``;
+    with no limit it follows pagination and returns everything. ``attributes``
+    limits the returned attributes (pk and sk are always included).
+
+    ``index`` names a numeric attribute to order by instead of sk, backed by
+    the GSI ``pk-<index>-index`` on DynamoDB. Items without the attribute are
+    left out, and ``last_key`` then carries the attribute as well.
+    """
+
+    def get(self, table, pk, sk):
+        raise NotImplementedError
+
+    def put(self, table, item, if_absent=False):
+        raise NotImplementedError
+
+    def update(self, table, pk, sk, set=None, add=None, remove=None, if_exists=False, expected=None,
+               return_new=False):
+        raise NotImplementedError
+
+    def delete(self, table, pk, sk, expected=None):
+        raise NotImplementedError
+
+    def query(self, table, pk, prefix=None, forward=True, limit=None, start_key=None, filters=None,
+              attributes=None, index=None):
+        raise NotImplementedError
+
+    def batch_get(self, table, keys, attributes=None):
+        raise NotImplementedError
+
+    def transact(self, ops):
+        """Apply writes atomically, or none of them (ConditionFailed).
+
+        Each op is a dict with ``op`` ('put', 'update' or 'delete'), ``table``,
+        ``pk``/``sk`` (or ``item`` for put) and the keyword arguments of the
+        matching single-item method (``if_absent``, ``set``/``add``/``remove``,
+        ``if_exists``, ``expected``). ConditionFailed.failed lists the positions of the ops that failed.
+        """
+        raise NotImplementedError
+
+
+def put_op(table, item, if_absent=False):
+    return {'op': 'put', 'table': table, 'item': item, 'if_absent': if_absent}
+
+
+def update_op(table, pk, sk, set=None, add=None, remove=None, if_exists=False, expected=None):
+    return {'op': 'update', 'table': table, 'pk': pk, 'sk': sk, 'set': set, 'add': add, 'remove': remove,
+            'if_exists': if_exists, 'expected': expected}
+
+
+def delete_op(table, pk, sk, if_exists=False, expected=None):
+    return {'op': 'delete', 'table': table, 'pk': pk, 'sk': sk, 'if_exists': if_exists, 'expected': expected}
+
+
+class DynamoStorage(Storage):
+    """Storage over a boto3 DynamoDB resource.
+
+    boto3 resources are not thread-safe. ``resource`` is either one resource,
+    for single-threaded callers, or a callable that builds one; with a
+    callable each thread gets its own, like SqliteStorage's connections.
+    """
+
+    def __init__(self, resource, tables):
+        self.table_names = tables
+        self._factory = resource if callable(resource) else None
+        self._shared = None if self._factory else resource
+        self._local = threading.local()
+
+    def _thread_state(self):
+        local = self._local
+        if getattr(local, 'resource', None) is None:
+            local.resource = self._factory() if self._factory else self._shared
+            local.tables = {name: local.resource.Table(physical) for name, physical in self.table_names.items()}
+        return local
+
+    @property
+    def resource(self):
+        return self._thread_state().resource
+
+    @property
+    def tables(self):
+        return self._thread_state().tables
+
+    def _call(self, method, **kwargs):
+        try:
+            return method(**kwargs)
+        except Exception as e:
+            code = getattr(e, 'response', {}).get('Error', {}).get('Code')
+            if code == 'ConditionalCheckFailedException':
+                raise ConditionFailed(str(e)) from e
+            raise
+
+    @staticmethod
+    def _names(names, attrs):
+        placeholders = []
+        for attr in attrs:
+            placeholder = f'#a{len(names)}'
+            names[placeholder] = attr
+            placeholders.append(placeholder)
+        return placeholders
+
+    def _projection(self, attributes, names):
+        return ', '.join(self._names(names, dict.fromkeys(['pk', 'sk', *attributes])))
+
+    def _expected(self, expected, names, values, clauses):
+        for attr, value in (expected or {}).items():
+            placeholder = self._names(names, [attr])[0]
+            values[f':e{len(values)}'] = value
+            clauses.append(f'{placeholder} = :e{len(values) - 1}')
+
+    def get(self, table, pk, sk):
+        return self.tables[table].get_item(Key={'pk': pk, 'sk': sk}).get('Item')
+
+    def _condition(self, kwargs, names, values, if_exists=False, if_absent=False, expected=None):
+        clauses = ['attribute_exists(pk)'] if if_exists else []
+        if if_absent:
+            clauses.append('attribute_not_exists(pk)')
+        self._expected(expected, names, values, clauses)
+        if clauses:
+            kwargs['ConditionExpression'] = ' AND '.join(clauses)
+        if names:
+            kwargs['ExpressionAttributeNames'] = names
+        if values:
+            kwargs['ExpressionAttributeValues'] = values
+        return kwargs
+
+    def put(self, table, item, if_absent=False):
+        kwargs = {'Item': item}
+        if if_absent:
+            kwargs['ConditionExpression'] = 'attribute_not_exists(pk)'
+        self._call(self.tables[table].put_item, **kwargs)
+
+    def _update_params(self, pk, sk, set=None, add=None, remove=None, if_exists=False, expected=None):
+        names, values, parts = {}, {}, []
+        if set:
+            assignments = []
+            for placeholder, value in zip(self._names(names, set), set.values()):
+                values[f':v{len(values)}'] = value
+                assignments.append(f'{placeholder} = :v{len(values) - 1}')
+            parts.append('SET ' + ', '.join(assignments))
+        if add:
+            increments = []
+            for placeholder, value in zip(self._names(names, add), add.values()):
+                values[f':v{len(values)}'] = value
+                increments.append(f'{placeholder} :v{len(values) - 1}')
+            parts.append('ADD ' + ', '.join(increments))
+        if remove:
+            parts.append('REMOVE ' + ', '.join(self._names(names, remove)))
+        kwargs = {'Key': {'pk': pk, 'sk': sk}, 'UpdateExpression': ' '.join(parts)}
+        return self._condition(kwargs, names, values, if_exists=if_exists, expected=expected)
+
+    def update(self, table, pk, sk, set=None, add=None, remove=None, if_exists=False, expected=None,
+               return_new=False):
+        kwargs = self._update_params(pk, sk, set=set, add=add, remove=remove, if_exists=if_exists,
+                                     expected=expected)
+        if return_new:
+            kwargs['ReturnValues'] = 'ALL_NEW'
+        resp = self._call(self.tables[table].update_item, **kwargs)
+        return resp.get('Attributes') if return_new else None
+
+    def delete(self, table, pk, sk, expected=None):
+        kwargs = self._condition({'Key': {'pk': pk, 'sk': sk}}, {}, {}, expected=expected)
+        self._call(self.tables[table].delete_item, **kwargs)
+
+    def transact(self, ops, attempts=3):
+        items = []
+        for op in ops:
+            physical = self.table_names[op['table']]
+            if op['op'] == 'put':
+                kwargs = self._condition({'Item': op['item']}, {}, {}, if_absent=op.get('if_absent'))
+                items.append({'Put': {'TableName': physical, **kwargs}})
+            elif op['op'] == 'update':
+                kwargs = self._update_params(op['pk'], op['sk'], set=op.get('set'), add=op.get('add'),
+                                             remove=op.get('remove'), if_exists=op.get('if_exists'),
+                                             expected=op.get('expected'))
+                items.append({'Update': {'TableName': physical, **kwargs}})
+            else:
+                kwargs = self._condition({'Key': {'pk': op['pk'], 'sk': op['sk']}}, {}, {},
+                                         if_exists=op.get('if_exists'), expected=op.get('expected'))
+                items.append({'Delete': {'TableName': physical, **kwargs}})
+        for attempt in range(attempts):
+            try:
+                self.resource.meta.client.transact_write_items(TransactItems=items)
+                return
+            except Exception as e:
+                response = getattr(e, 'response', {})
+                if response.get('Error', {}).get('Code') != 'TransactionCanceledException':
+                    raise
+                reasons = [reason.get('Code') for reason in response.get('CancellationReasons', [])]
+                if 'ConditionalCheckFailed' in reasons:
+                    failed = [i for i, code in enumerate(reasons) if code == 'ConditionalCheckFailed']
+                    raise ConditionFailed(str(e), failed) from e
+                # Conflicts with another in-flight transaction are retried.
+                if attempt == attempts - 1 or any(code not in (None, 'None', 'TransactionConflict') for code in reasons):
+                    raise
+                time.sleep(0.05 * 2 ** attempt)
+
+    def query(self, table, pk, prefix=None, forward=True, limit=None, start_key=None, filters=None,
+              attributes=None, index=None):
+        kwargs = {'KeyConditionExpression': 'pk = :pk', 'ExpressionAttributeValues': {':pk': pk},
+                  'ScanIndexForward': forward}
+        if index:
+            kwargs['IndexName'] = f'pk-{index}-index'
+        if prefix:
+            kwargs['KeyConditionExpression'] += ' AND begins_with(sk, :prefix)'
+            kwargs['ExpressionAttributeValues'][':prefix'] = prefix
+        names = {}
+        if filters:
+            clauses = []
+            self._expected(filters, names, kwargs['ExpressionAttributeValues'], clauses)
+            kwargs['FilterExpression'] = ' AND '.join(clauses)
+        if attributes:
+            kwargs['ProjectionExpression'] = self._projection(attributes, names)
+        if names:
+            kwargs['ExpressionAttributeNames'] = names
+        if limit:
+            kwargs['Limit'] = limit
+        if start_key:
+            kwargs['ExclusiveStartKey'] = start_key
+
+        items = []
+        while True:
+            resp = self.tables[table].query(**kwargs)
+            items.extend(resp.get('Items', []))
+            last_key = resp.get('LastEvaluatedKey')
+            if limit or not last_key:
+                return items, last_key
+            kwargs['ExclusiveStartKey'] = last_key
+
+    def batch_get(self, table, keys, attributes=None):
+        physical = self.table_names[table]
+        unique = list(dict.fromkeys(keys))
+        projection = {}
+        if attributes:
+            names = {}
+            projection = {'ProjectionExpression': self._projection(attributes, names),
+                          'ExpressionAttributeNames': names}
+        results = {}
+        for i in range(0, len(unique), 100):
+            pending = {physical: {'Keys': [{'pk': pk, 'sk': sk} for pk, sk in unique[i:i + 100]], **projection}}
+            attempt = 0
+            while pending:
+                resp = self.resource.batch_get_item(RequestItems=pending)
+                for item in resp.get('Responses', {}).get(physical, []):
+                    results[(item['pk'], item['sk'])] = item
+                pending = resp.get('UnprocessedKeys') or {}
+                if pending:
+                    attempt += 1
+                    time.sleep(min(1.0, 0.05 * 2 ** attempt))
+        return results
+
+
+def _encode(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f'Unsupported type {type(value).__name__}')
+
+
+def _dumps(item):
+    return json.dumps(item, default=_encode, separators=(',', ':'))
+
+
+def _loads(data):
+    return json.loads(data, parse_float=Decimal, parse_int=Decimal)
+
+
+def _project(item, attributes):
+    if not attributes:
+        return item
+    return {attr: item[attr] for attr in ('pk', 'sk', *attributes) if attr in item}
+
+
+def _prefix_end(prefix):
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class SqliteStorage(Storage):
+    """Storage in one SQLite file (WAL mode); one connection per thread"""
+
+    SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS items (
+        tbl TEXT NOT NULL,
+        pk TEXT NOT NULL,
+        sk TEXT NOT NULL,
+        data TEXT NOT NULL,
+        PRIMARY KEY (tbl, pk, sk)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS items_rank ON items (tbl, pk, json_extract(data, '$.rank'), sk);
+    CREATE INDEX IF NOT EXISTS items_elo ON items (tbl, pk, json_extract(data, '$.elo'), sk);
+    '''
+
+    def __init__(self, path, tables):
+        self.path = path
+        self.table_names = tables
+        self._local = threading.local()
+        self.conn.executescript(self.SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=30000')
+        return conn
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _row(self, conn, table, pk, sk):
+        row = conn.execute('SELECT data FROM items WHERE tbl = ? AND pk = ? AND sk = ?',
+                           (self.table_names[table], pk, sk)).fetchone()
+        return _loads(row[0]) if row else None
+
+    def _write(self, conn, table, item):
+        conn.execute('INSERT OR REPLACE INTO items (tbl, pk, sk, data) VALUES (?, ?, ?, ?)',
+                     (self.table_names[table], item['pk'], item['sk'], _dumps(item)))
+
+    @staticmethod
+    def _matches(item, expected):
+        for attr, value in (expected or {}).items():
+            current = item.get(attr)
+            if isinstance(current, bool) or isinstance(value, bool):
+                if current is not value:
+                    return False
+            elif current is None or current != value:
+                return False
+        return True
+
+    def _transaction(self):
+        conn = self.conn
+        conn.execute('BEGIN IMMEDIATE')
+        return conn
+
+    def get(self, table, pk, sk):
+        return self._row(self.conn, table, pk, sk)
+
+    def put(self, table, item, if_absent=False):
+        if not if_absent:
+            self._write(self.conn, table, item)
+            return
+        conn = self._transaction()
+        try:
+            if self._row(conn, table, item['pk'], item['sk']) is not None:
+                raise ConditionFailed(f"Item exists: {item['pk']}/{item['sk']}")
+            self._write(conn, table, item)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _check(self, current, pk, sk, if_exists=False, if_absent=False, expected=None):
+        if if_exists and current is None:
+            raise ConditionFailed(f'Item does not exist: {pk}/{sk}')
+        if if_absent and current is not None:
+            raise ConditionFailed(f'Item exists: {pk}/{sk}')
+        if expected and (current is None or not self._matches(current, expected)):
+            raise ConditionFailed(f'Condition failed: {pk}/{sk}')
+
+    def _apply_update(self, conn, table, pk, sk, set=None, add=None, remove=None, if_exists=False, expected=None):
+        current = self._row(conn, table, pk, sk)
+        self._check(current, pk, sk, if_exists=if_exists, expected=expected)
+        item = current or {'pk': pk, 'sk': sk}
+        item.update(_loads(_dumps(set or {})))
+        for attr, value in (add or {}).items():
+            item[attr] = item.get(attr, Decimal(0)) + Decimal(str(value))
+        for attr in remove or []:
+            item.pop(attr, None)
+        self._write(conn, table, item)
+        return item
+
+    def update(self, table, pk, sk, set=None, add=None, remove=None, if_exists=False, expected=None,
+               return_new=False):
+        conn = self._transaction()
+        try:
+            item = self._apply_update(conn, table, pk, sk, set=set, add=add, remove=remove, if_exists=if_exists,
+                                      expected=expected)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return item if return_new else None
+
+    def transact(self, ops):
+        conn = self._transaction()
+        try:
+            for position, op in enumerate(ops):
+                table = op['table']
+                if op['op'] == 'put':
+                    item = op['item']
+                    self._check(self._row(conn, table, item['pk'], item['sk']), item['pk'], item['sk'],
+                                if_absent=op.get('if_absent'))
+                    self._write(conn, table, item)
+                elif op['op'] == 'update':
+                    self._apply_update(conn, table, op['pk'], op['sk'], set=op.get('set'), add=op.get('add'),
+                                       remove=op.get('remove'), if_exists=op.get('if_exists'),
+                                       expected=op.get('expected'))
+                else:
+                    self._check(self._row(conn, table, op['pk'], op['sk']), op['pk'], op['sk'],
+                                if_exists=op.get('if_exists'), expected=op.get('expected'))
+                    conn.execute('DELETE FROM items WHERE tbl = ? AND pk = ? AND sk = ?',
+                                 (self.table_names[table], op['pk'], op['sk']))
+            conn.execute('COMMIT')
+        except ConditionFailed as e:
+            conn.execute('ROLLBACK')
+            raise ConditionFailed(str(e), [position]) from e
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def delete(self, table, pk, sk, expected=None):
+        if not expected:
+            self.conn.execute('DELETE FROM items WHERE tbl = ? AND pk = ? AND sk = ?',
+                              (self.table_names[table], pk, sk))
+            return
+        conn = self._transaction()
+        try:
+            current = self._row(conn, table, pk, sk)
+            if current is None or not self._matches(current, expected):
+                raise ConditionFailed(f'Condition failed: {pk}/{sk}')
+            conn.execute('DELETE FROM items WHERE tbl = ? AND pk = ? AND sk = ?',
+                         (self.table_names[table], pk, sk))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def query(self, table, pk, prefix=None, forward=True, limit=None, start_key=None, filters=None,
+              attributes=None, index=None):
+        sql = 'SELECT data FROM items WHERE tbl = ? AND pk = ?'
+        params = [self.table_names[table], pk]
+        order = 'sk'
+        if prefix:
+            sql += ' AND sk >= ? AND sk < ?'
+            params += [prefix, _prefix_end(prefix)]
+        if index:
+            if not index.isidentifier():
+                raise ValueError(f'Invalid index attribute: {index}')
+            column = f"json_extract(data, '$.{index}')"
+            sql += f' AND {column} IS NOT NULL'
+            order = f'{column}{"" if forward else " DESC"}, sk'
+            if start_key:
+                op = '>' if forward else '<'
+                value = start_key[index]
+                value = _encode(value) if isinstance(value, Decimal) else value
+                sql += f' AND ({column} {op} ? OR ({column} = ? AND sk {op} ?))'
+                params += [value, value, start_key['sk']]
+        elif start_key:
+            sql += ' AND sk > ?' if forward else ' AND sk < ?'
+            params.append(start_key['sk'])
+        sql += ' ORDER BY ' + order + ('' if forward else ' DESC')
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        rows = [_loads(row[0]) for row in self.conn.execute(sql, params)]
+        last_key = None
+        if limit and len(rows) == limit:
+            last_key = {'pk': pk, 'sk': rows[-1]['sk']}
+            if index:
+                last_key[index] = rows[-1][index]
+        if filters:
+            rows = [item for item in rows if self._matches(item, filters)]
+        return [_project(item, attributes) for item in rows], last_key
+
+    def batch_get(self, table, keys, attributes=None):
+        results = {}
+        unique = list(dict.fromkeys(keys))
+        physical = self.table_names[table]
+        for i in range(0, len(unique), 400):
+            chunk = unique[i:i + 400]
+            clause = ' OR '.join(['(pk = ? AND sk = ?)'] * len(chunk))
+            params = [physical] + [part for key in chunk for part in key]
+            for (data,) in self.conn.execute(f'SELECT data FROM items WHERE tbl = ? AND ({clause})', params):
+                item = _project(_loads(data), attributes)
+                results[(item['pk'], item['sk'])] = item
+        return results
+
+    def load(self, table, items):
+        """Bulk upsert in one transaction (seeding and imports)"""
+        physical = self.table_names[table]
+        conn = self._transaction()
+        try:
+            count = 0
+            for item in items:
+                conn.execute('INSERT OR REPLACE INTO items (tbl, pk, sk, data) VALUES (?, ?, ?, ?)',
+                             (physical, item['pk'], item['sk'], _dumps(item)))
+                count += 1
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return count
+
+
+def table_names():
+    return {
+        DATA: os.environ.get('TABLE_NAME', 'scrumble-data'),
+        COMMENTS: os.environ.get('COMMENTS_TABLE_NAME', 'scrumble-comments'),
+    }
+
+
+def from_env():
+    """Storage selected by STORAGE_BACKEND (dynamodb or sqlite)"""
+    backend = os.environ.get('STORAGE_BACKEND', 'dynamodb').strip().lower()
+    if backend == 'sqlite':
+        return SqliteStorage(os.environ.get('SQLITE_PATH', 'scrumble.db'), table_names())
+    if backend != 'dynamodb':
+        raise ValueError(f'Unknown STORAGE_BACKEND: {backend}')
+    import boto3
+    # One resource per thread (server handlers, app.fanout_pool), each from its own session:
+    # neither boto3 resources nor the default session are safe to share between threads.
+    return DynamoStorage(lambda: boto3.session.Session().resource('dynamodb'), table_names())
@@ -0,0 +1,111 @@
+"""Matchup suggestions, partitioned by moderation status.
+
+Each submission lives under SUBMISSION#<status> with its creation time as the
+sort key, so a moderation queue is one range query in time order. A
+SUBMISSION_FINGERPRINT/<fingerprint> item maps the normalized (left, right,
+category) of every submission to the one row that represents it: repeats of
+the same suggestion add to that row's ``duplicate_count`` instead of creating
+new rows. Changing status moves the row to its new partition in the same
+transaction that re-points the fingerprint.
+"""
+
+import re
+import unicodedata
+from datetime import datetime
+
+import storage
+from storage import DATA
+
+STATUSES = ('pending', 'approved', 'rejected')
+FINGERPRINT_PK = 'SUBMISSION_FINGERPRINT'
+
+
+class NotFound(Exception):
+    """No submission was created at that time"""
+
+
+def status_pk(status):
+    return f'SUBMISSION#{status}'
+
+
+def normalize(value):
+    value = unicodedata.normalize('NFKD', value or '').encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', ' ', value.lower()).strip()
+
+
+def fingerprint(left_name, right_name, category):
+    """Same suggestion regardless of case, punctuation or which side each entry is on"""
+    left, right = sorted((normalize(left_name), normalize(right_name)))
+    return f'{normalize(category)}|{left}|{right}'
+
+
+def submit(store, item, attempts=5):
+    """Store a new submission, or count it against an existing one; returns (item, duplicate)"""
+    fp = fingerprint(item['left_name'], item['right_name'], item['category'])
+    for _ in range(attempts):
+        created_at = datetime.utcnow().isoformat()
+        row = {**item, 'pk': status_pk('pending'), 'sk': created_at, 'created_at': created_at,
+               'status': 'pending', 'fingerprint': fp, 'duplicate_count': 0}
+        try:
+            store.transact([
+                storage.put_op(DATA, {'pk': FINGERPRINT_PK, 'sk': fp, 'status': 'pending',
+                                      'created_at': created_at}, if_absent=True),
+                storage.put_op(DATA, row, if_absent=True),
+            ])
+            return row, False
+        except storage.ConditionFailed as e:
+            if 0 not in e.failed:
+                continue  # another submission landed on the same microsecond
+        owner = store.get(DATA, FINGERPRINT_PK, fp)
+        if owner is None:
+            continue
+        try:
+            updated = store.update(DATA, status_pk(owner['status']), owner['created_at'],
+                                   add={'duplicate_count': 1}, set={'last_submitted_at': created_at},
+                                   if_exists=True, return_new=True)
+            return updated, True
+        except storage.ConditionFailed:
+            continue  # a moderator moved it in between; read the fingerprint again
+    raise storage.ConditionFailed(f'Submission {fp} kept changing underneath')
+
+
+def find(store, created_at):
+    """The submission created at ``created_at``, whichever status it is in (one BatchGetItem)"""
+    found = store.batch_get(DATA, [(status_pk(status), created_at) for status in STATUSES])
+    if not found:
+        raise NotFound(created_at)
+    return next(iter(found.values()))
+
+
+def set_status(store, created_at, status, updates):
+    """Apply a moderation decision, moving the row to its status partition; returns the new row"""
+    current = find(store, created_at)
+    if current['status'] == status:
+        return store.update(DATA, current['pk'], created_at, set=updates, if_exists=True, return_new=True)
+    row = {**current, **updates, 'pk': status_pk(status), 'status': status}
+    ops = [
+        storage.delete_op(DATA, current['pk'], created_at, expected={'status': current['status']}),
+        storage.put_op(DATA, row, if_absent=True),
+    ]
+    if current.get('fingerprint'):
+        ops.append(storage.update_op(DATA, FINGERPRINT_PK, current['fingerprint'], set={'status': status},
+                                     expected={'created_at': created_at}))
+    store.transact(ops)
+    return row
+
+
+def submission_payload(item):
+    return {
+        'timestamp': item['sk'],
+        'left_name': item.get('left_name', ''),
+        'right_name': item.get('right_name', ''),
+        'category': item.get('category', ''),
+        'email': item.get('email', ''),
+        'reason': item.get('reason', ''),
+        'status': item.get('status', 'pending'),
+        'duplicate_count': int(item.get('duplicate_count', 0)),
+        'last_submitted_at': item.get('last_submitted_at', ''),
+        'reviewed_by': item.get('reviewed_by', ''),
+        'reviewed_at': item.get('reviewed_at', ''),
+        'rejection_reason': item.get('rejection_reason', '')
+    }
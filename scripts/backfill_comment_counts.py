@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Backfill ``comment_count`` on each matchup's VOTES#<id>/TOTAL item.
+
+backend/app.py keeps the counter in step with every comment posted or deleted
+(both in one transaction), so this only needs to run once for comments written
+before the counter existed, or to repair drift. Comments posted while the scan
+is running can be counted twice or not at all; run it during a quiet period or
+simply run it again.
+
+Usage:
+    python scripts/backfill_comment_counts.py                    # scrumble-comments -> scrumble-data
+    python scripts/backfill_comment_counts.py --dry-run
+    python scripts/backfill_comment_counts.py --sqlite scrumble.db
+"""
+
+import argparse
+import sys
+import threading
+from collections import Counter
+
+from dynamo_batch import Progress, capacity_bucket, get_client, parallel_scan, table_capacity
+
+
+def matchup_id(pk, sk):
+    if pk.startswith("COMMENT#") and sk.startswith("TIMESTAMP#"):
+        return pk[len("COMMENT#"):]
+    return None
+
+
+def backfill_dynamodb(args):
+    client = get_client(args.segments)
+    counts = Counter()
+    lock = threading.Lock()
+    progress = Progress("scanned")
+
+    def handle_page(segment, items):
+        found = Counter(m for m in (matchup_id(i["pk"]["S"], i["sk"]["S"]) for i in items) if m)
+        with lock:
+            counts.update(found)
+
+    parallel_scan(client, args.comments_table, args.segments, handle_page, progress=progress)
+    progress.finish()
+
+    # Matchups whose comments were all deleted still carry a stale count; reset those too.
+    stale = []
+    paginator = client.get_paginator("scan")
+    for page in paginator.paginate(TableName=args.data_table, ProjectionExpression="pk, sk, comment_count",
+                                   FilterExpression="sk = :total AND comment_count > :zero",
+                                   ExpressionAttributeValues={":total": {"S": "TOTAL"}, ":zero": {"N": "0"}}):
+        for item in page.get("Items", []):
+            mid = item["pk"]["S"][len("VOTES#"):]
+            if mid not in counts:
+                stale.append(mid)
+
+    targets = {**counts, **{mid: 0 for mid in stale}}
+    if args.dry_run:
+        return len(counts), len(targets), sum(counts.values())
+
+    _, write_units = table_capacity(client, args.data_table)
+    write_bucket = capacity_bucket(write_units, args.write_fraction, args.max_rate)
+    for mid, count in targets.items():
+        write_bucket.acquire(1)
+        client.update_item(
+            TableName=args.data_table,
+            Key={"pk": {"S": f"VOTES#{mid}"}, "sk": {"S": "TOTAL"}},
+            UpdateExpression="SET comment_count = :count",
+            ExpressionAttributeValues={":count": {"N": str(count)}},
+        )
+    return len(counts), len(targets), sum(counts.values())
+
+
+def backfill_sqlite(args):
+    from local_handler import BACKEND_DIR
+
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    import storage
+
+    tables = {**storage.table_names(), storage.DATA: args.data_table, storage.COMMENTS: args.comments_table}
+    store = storage.SqliteStorage(args.sqlite, tables)
+    rows = store.conn.execute("SELECT pk, sk FROM items WHERE tbl = ? AND pk LIKE 'COMMENT#%'",
+                              (args.comments_table,)).fetchall()
+    counts = Counter(m for m in (matchup_id(pk, sk) for pk, sk in rows) if m)
+    stale = [pk[len("VOTES#"):] for (pk,) in store.conn.execute(
+        "SELECT pk FROM items WHERE tbl = ? AND sk = 'TOTAL' AND json_extract(data, '$.comment_count') > 0",
+        (args.data_table,)).fetchall() if pk[len("VOTES#"):] not in counts]
+    targets = {**counts, **{mid: 0 for mid in stale}}
+    if not args.dry_run:
+        for mid, count in targets.items():
+            store.update(storage.DATA, f"VOTES#{mid}", "TOTAL", set={"comment_count": count})
+    return len(counts), len(targets), sum(counts.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recount comments per matchup into VOTES#<id>/TOTAL.")
+    parser.add_argument("--comments-table", default="scrumble-comments", help="Comments table name.")
+    parser.add_argument("--data-table", default="scrumble-data", help="Data table holding the TOTAL items.")
+    parser.add_argument("--sqlite", metavar="PATH", help="Backfill a local SQLite store instead of DynamoDB.")
+    parser.add_argument("--segments", type=int, default=4, help="Parallel scan segments.")
+    parser.add_argument("--write-fraction", type=float, default=0.5,
+                        help="Fraction of provisioned WCUs the updates may use.")
+    parser.add_argument("--max-rate", type=float, help="Absolute WCU/s limit (overrides --write-fraction).")
+    parser.add_argument("--dry-run", action="store_true", help="Count comments; write nothing.")
+    args = parser.parse_args()
+
+    try:
+        matchups, written, comments = backfill_sqlite(args) if args.sqlite else backfill_dynamodb(args)
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted", file=sys.stderr)
+        sys.exit(130)
+    verb = "would set" if args.dry_run else "set"
+    print(f"✓ {comments} comments across {matchups} matchups, {verb} {written} counts")
+
+
+if __name__ == "__main__":
+    main()
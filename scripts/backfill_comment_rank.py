@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Backfill ``rank`` on comments written before the pk-rank-index GSI existed.
+
+rank = (upvotes - downvotes) * 10**13 + timestamp_ms, the value backend/app.py
+keeps in step on every comment vote. Comments without a rank are missing from
+the "top" view until this runs (or until someone votes on them). Each update is
+conditional on the vote counts it was computed from, so concurrent votes are
+re-read and retried rather than overwritten.
+
+Usage:
+    ./scripts/setup_comment_rank_index.sh
+    python scripts/backfill_comment_rank.py                      # scrumble-comments
+    python scripts/backfill_comment_rank.py --dry-run
+    python scripts/backfill_comment_rank.py --sqlite scrumble.db
+"""
+
+import argparse
+import sys
+import threading
+
+from dynamo_batch import Progress, capacity_bucket, get_client, parallel_scan, table_capacity
+
+RANK_SCORE_WEIGHT = 10 ** 13
+MAX_ATTEMPTS = 5
+
+
+def expected_rank(upvotes, downvotes, sk):
+    return (int(upvotes) - int(downvotes)) * RANK_SCORE_WEIGHT + int(sk.replace("TIMESTAMP#", ""))
+
+
+def is_comment(pk, sk):
+    return pk.startswith("COMMENT#") and sk.startswith("TIMESTAMP#") and sk[len("TIMESTAMP#"):].isdigit()
+
+
+def backfill_dynamodb(args):
+    client = get_client(args.segments)
+    _, write_units = table_capacity(client, args.table)
+    write_bucket = capacity_bucket(write_units, args.write_fraction, args.max_rate)
+    progress = Progress("scanned")
+    counts = {"comments": 0, "updated": 0, "retried": 0}
+    lock = threading.Lock()
+
+    def number(item, name):
+        return int(item[name]["N"]) if name in item else 0
+
+    def fix(item):
+        key = {"pk": item["pk"], "sk": item["sk"]}
+        for attempt in range(MAX_ATTEMPTS):
+            upvotes, downvotes = number(item, "upvotes"), number(item, "downvotes")
+            rank = expected_rank(upvotes, downvotes, item["sk"]["S"])
+            if "rank" in item and int(item["rank"]["N"]) == rank:
+                return False
+            if args.dry_run:
+                return True
+            write_bucket.acquire(1)
+            try:
+                client.update_item(
+                    TableName=args.table,
+                    Key=key,
+                    UpdateExpression="SET #rank = :rank",
+                    ConditionExpression=(
+                        "(attribute_not_exists(upvotes) OR upvotes = :up) AND "
+                        "(attribute_not_exists(downvotes) OR downvotes = :down)"
+                    ),
+                    ExpressionAttributeNames={"#rank": "rank"},
+                    ExpressionAttributeValues={
+                        ":rank": {"N": str(rank)},
+                        ":up": {"N": str(upvotes)},
+                        ":down": {"N": str(downvotes)},
+                    },
+                )
+                return True
+            except client.exceptions.ConditionalCheckFailedException:
+                with lock:
+                    counts["retried"] += 1
+                item = client.get_item(TableName=args.table, Key=key, ConsistentRead=True).get("Item")
+                if item is None:
+                    return False
+        print(f"  gave up on {key['pk']['S']} {key['sk']['S']} after {MAX_ATTEMPTS} attempts", file=sys.stderr)
+        return False
+
+    def handle_page(segment, items):
+        for item in items:
+            if not is_comment(item["pk"]["S"], item["sk"]["S"]):
+                continue
+            updated = fix(item)
+            with lock:
+                counts["comments"] += 1
+                counts["updated"] += updated
+
+    parallel_scan(client, args.table, args.segments, handle_page, progress=progress)
+    progress.finish()
+    return counts
+
+
+def backfill_sqlite(args):
+    from local_handler import BACKEND_DIR
+
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    import storage
+
+    store = storage.SqliteStorage(args.sqlite, {**storage.table_names(), storage.COMMENTS: args.table})
+    rows = store.conn.execute("SELECT pk, sk FROM items WHERE tbl = ? AND pk LIKE 'COMMENT#%'",
+                              (args.table,)).fetchall()
+    counts = {"comments": 0, "updated": 0, "retried": 0}
+    for pk, sk in rows:
+        if not is_comment(pk, sk):
+            continue
+        counts["comments"] += 1
+        item = store.get(storage.COMMENTS, pk, sk)
+        rank = expected_rank(item.get("upvotes", 0), item.get("downvotes", 0), sk)
+        if item.get("rank") == rank:
+            continue
+        counts["updated"] += 1
+        if not args.dry_run:
+            # BEGIN IMMEDIATE in update() serializes this with live votes.
+            store.update(storage.COMMENTS, pk, sk, set={"rank": rank})
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill comment ranks for the pk-rank-index GSI.")
+    parser.add_argument("--table", default="scrumble-comments", help="Comments table name.")
+    parser.add_argument("--sqlite", metavar="PATH", help="Backfill a local SQLite store instead of DynamoDB.")
+    parser.add_argument("--segments", type=int, default=4, help="Parallel scan segments.")
+    parser.add_argument("--write-fraction", type=float, default=0.5,
+                        help="Fraction of provisioned WCUs the updates may use.")
+    parser.add_argument("--max-rate", type=float, help="Absolute WCU/s limit (overrides --write-fraction).")
+    parser.add_argument("--dry-run", action="store_true", help="Count comments that need a rank; write nothing.")
+    args = parser.parse_args()
+
+    try:
+        counts = backfill_sqlite(args) if args.sqlite else backfill_dynamodb(args)
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted", file=sys.stderr)
+        sys.exit(130)
+    verb = "would update" if args.dry_run else "updated"
+    print(f"✓ {counts['comments']} comments, {verb} {counts['updated']} ranks ({counts['retried']} retries)")
+
+
+if __name__ == "__main__":
+    main()
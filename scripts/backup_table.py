@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Backup / restore for the Scrumble DynamoDB tables.
+
+Backups are written as chunked JSONL files (one low-level DynamoDB item per
+line) by a segmented parallel Scan. Restores stream those files back through
+concurrent BatchWriteItem calls, throttled to a fraction of the table's
+provisioned capacity.
+
+Usage:
+    python scripts/backup_table.py backup                          # both tables -> backups/<timestamp>/
+    python scripts/backup_table.py backup --tables scrumble-data --segments 8 --gzip
+    python scripts/backup_table.py restore backups/20260301T120000Z
+    python scripts/backup_table.py restore backups/20260301T120000Z --map scrumble-data=scrumble-data-dev
+
+Layout:
+    backups/<timestamp>/<table>/manifest.json
+    backups/<timestamp>/<table>/segment-000-00000.jsonl[.gz]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+from dynamo_batch import (
+    BatchWriter,
+    Progress,
+    capacity_bucket,
+    get_client,
+    parallel_scan,
+    table_capacity,
+)
+
+DEFAULT_TABLES = ["scrumble-data", "scrumble-comments"]
+
+
+def open_chunk(path, compress):
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def open_chunk_for_read(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+class SegmentWriter:
+    """Writes one scan segment into numbered chunk files of at most ``chunk_size`` items."""
+
+    def __init__(self, out_dir, segment, chunk_size, compress):
+        self.out_dir = out_dir
+        self.segment = segment
+        self.chunk_size = chunk_size
+        self.compress = compress
+        self.files = []
+        self._handle = None
+        self._in_chunk = 0
+
+    def _roll(self):
+        self.close()
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        name = f"segment-{self.segment:03d}-{len(self.files):05d}{suffix}"
+        self._handle = open_chunk(os.path.join(self.out_dir, name), self.compress)
+        self.files.append({"name": name, "items": 0})
+        self._in_chunk = 0
+
+    def write(self, items):
+        for item in items:
+            if self._handle is None or self._in_chunk >= self.chunk_size:
+                self._roll()
+            self._handle.write(json.dumps(item, separators=(",", ":")))
+            self._handle.write("\n")
+            self._in_chunk += 1
+            self.files[-1]["items"] += 1
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def backup_table(client, table_name, out_root, segments, chunk_size, read_fraction, compress, max_rate=None):
+    out_dir = os.path.join(out_root, table_name)
+    os.makedirs(out_dir, exist_ok=True)
+
+    read_units, _ = table_capacity(client, table_name)
+    # Scans are eventually consistent: 0.5 RCU per 4 KB, reported via ConsumedCapacity.
+    bucket = capacity_bucket(read_units, read_fraction, override=max_rate)
+    writers = {segment: SegmentWriter(out_dir, segment, chunk_size, compress) for segment in range(segments)}
+    progress = Progress(f"backup {table_name}")
+
+    print(f"📦 Backing up {table_name} ({segments} segments, read limit {bucket.rate or 'none'} RCU/s)")
+    try:
+        count = parallel_scan(
+            client,
+            table_name,
+            segments,
+            lambda segment, items: writers[segment].write(items),
+            read_bucket=bucket,
+            progress=progress,
+        )
+    finally:
+        for writer in writers.values():
+            writer.close()
+    progress.finish()
+
+    manifest = {
+        "table": table_name,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "segments": segments,
+        "item_count": count,
+        "files": [entry for segment in range(segments) for entry in writers[segment].files],
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2)
+
+    print(f"✅ {table_name}: {count} items in {len(manifest['files'])} files")
+    return count
+
+
+def iter_backup_items(table_dir, manifest):
+    for entry in manifest["files"]:
+        with open_chunk_for_read(os.path.join(table_dir, entry["name"])) as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def restore_table(client, table_dir, target_table, workers, write_fraction, max_rate=None):
+    with open(os.path.join(table_dir, "manifest.json"), "r", encoding="utf-8") as handle:
+        manifest = json.load(handle)
+
+    _, write_units = table_capacity(client, target_table)
+    bucket = capacity_bucket(write_units, write_fraction, override=max_rate)
+    progress = Progress(f"restore {target_table}", total=manifest.get("item_count"))
+
+    print(
+        f"♻️  Restoring {manifest['item_count']} items from {manifest['table']} into {target_table} "
+        f"({workers} workers, write limit {bucket.rate or 'none'} WCU/s)"
+    )
+    with BatchWriter(client, target_table, workers=workers, write_bucket=bucket, progress=progress) as writer:
+        for item in iter_backup_items(table_dir, manifest):
+            writer.put(item)
+    progress.finish()
+
+    print(f"✅ {target_table}: {writer.written} items restored")
+    return writer.written
+
+
+def parse_table_map(values):
+    mapping = {}
+    for value in values or []:
+        source, sep, target = value.partition("=")
+        if not sep or not source or not target:
+            raise SystemExit(f"Invalid --map value: {value!r} (expected source=target)")
+        mapping[source] = target
+    return mapping
+
+
+def run_backup(args):
+    client = get_client(args.segments)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    out_root = os.path.join(args.out, stamp)
+    for table_name in args.tables:
+        backup_table(
+            client,
+            table_name,
+            out_root,
+            args.segments,
+            args.chunk_size,
+            args.read_fraction,
+            args.gzip,
+            max_rate=args.max_rate,
+        )
+    print(f"\n📁 Backup written to {out_root}")
+
+
+def run_restore(args):
+    client = get_client(args.workers)
+    mapping = parse_table_map(args.map)
+    tables = args.tables or sorted(
+        name for name in os.listdir(args.backup_dir)
+        if os.path.isfile(os.path.join(args.backup_dir, name, "manifest.json"))
+    )
+    if not tables:
+        raise SystemExit(f"No table backups found in {args.backup_dir}")
+    for table_name in tables:
+        restore_table(
+            client,
+            os.path.join(args.backup_dir, table_name),
+            mapping.get(table_name, table_name),
+            args.workers,
+            args.write_fraction,
+            max_rate=args.max_rate,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backup and restore Scrumble DynamoDB tables.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backup = subparsers.add_parser("backup", help="Dump tables to chunked JSONL files.")
+    backup.add_argument("--tables", nargs="+", default=DEFAULT_TABLES)
+    backup.add_argument("--out", default="backups", help="Output root directory.")
+    backup.add_argument("--segments", type=int, default=4, help="Parallel scan segments.")
+    backup.add_argument("--chunk-size", type=int, default=100000, help="Items per output file.")
+    backup.add_argument("--read-fraction", type=float, default=0.5,
+                        help="Fraction of provisioned RCUs the scan may use.")
+    backup.add_argument("--max-rate", type=float, help="Absolute RCU/s limit (overrides --read-fraction).")
+    backup.add_argument("--gzip", action="store_true", help="Gzip chunk files.")
+    backup.set_defaults(func=run_backup)
+
+    restore = subparsers.add_parser("restore", help="Load a backup with batch writes.")
+    restore.add_argument("backup_dir", help="Backup directory (backups/<timestamp>).")
+    restore.add_argument("--tables", nargs="+", help="Tables to restore (default: all in backup).")
+    restore.add_argument("--map", action="append", metavar="SOURCE=TARGET",
+                         help="Restore SOURCE table into TARGET (repeatable).")
+    restore.add_argument("--workers", type=int, default=8, help="Concurrent batch writers.")
+    restore.add_argument("--write-fraction", type=float, default=0.8,
+                         help="Fraction of provisioned WCUs the restore may use.")
+    restore.add_argument("--max-rate", type=float, help="Absolute WCU/s limit (overrides --write-fraction).")
+    restore.set_defaults(func=run_restore)
+
+    args = parser.parse_args()
+    try:
+        args.func(args)
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted", file=sys.stderr)
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
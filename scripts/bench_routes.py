@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+"""
+In-process route benchmarks for backend/app.py.
+
+Seeds an in-memory DynamoDB stand-in (scripts/memory_dynamo.py) at a chosen
+scale, invokes ``handler`` directly with Function URL events for every public
+and read-only admin route, and reports per route: wall time, DynamoDB calls,
+items read, bytes read, capacity units and response bytes. Results can be
+saved as a JSON baseline and later runs compared against it; the run exits
+non-zero when a route regresses or any request returns a 5xx.
+
+Usage:
+    python scripts/bench_routes.py --scale small
+    python scripts/bench_routes.py --scale medium --save-baseline bench/baseline-medium.json
+    python scripts/bench_routes.py --scale medium --baseline bench/baseline-medium.json
+    python scripts/bench_routes.py --scale medium --storage sqlite
+    python scripts/bench_routes.py --matchups 10000 --entries 100000 --votes 2000000 --routes "GET /history"
+    python scripts/bench_routes.py --routes "GET /matchup" --profile-dir bench/profiles
+
+Counters (calls, items, bytes, units) are deterministic for a given scale,
+seed and iteration count, so they are compared tightly; wall time is compared
+with a looser tolerance. Baselines only compare against runs with the same
+configuration: a mismatch exits 2 unless --allow-config-mismatch is given.
+
+--storage sqlite runs the same routes through backend/storage.py's SQLite
+engine on a temporary file, for wall-time comparison (no DynamoDB counters).
+
+--profile-dir runs each route's measured requests under cProfile, writes
+<dir>/<route>.prof and prints the top functions by cumulative time. Profiling
+slows every call, so don't save or compare baselines from such a run.
+"""
+import argparse
+import base64
+import cProfile
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+
+from local_handler import build_event, load_app
+from memory_dynamo import CallStats, MemoryDynamo
+
+ADMIN_KEY = "bench-admin"
+DATA = "data"
+COMMENTS = "comments"
+
+SCALES = {
+    "small": {"matchups": 10, "entries": 200, "votes": 10_000, "comments": 200},
+    "medium": {"matchups": 1_000, "entries": 10_000, "votes": 200_000, "comments": 2_000},
+    "large": {"matchups": 10_000, "entries": 100_000, "votes": 1_000_000, "comments": 20_000},
+}
+CATEGORIES = ["pizza", "tacos", "coffee", "bbq", "burgers", "brunch", "bars", "parks"]
+NEIGHBORHOODS = ["Downtown", "Northshore", "Southside", "St. Elmo", "Highland Park", "East Ridge"]
+COUNTERS = ("calls", "items_read", "read_bytes", "read_units", "write_units")
+
+
+class NullMetrics:
+    """Replaces the CloudWatch client; counts put_metric_data calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def put_metric_data(self, **kwargs):
+        self.calls += 1
+
+
+def iso(dt):
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+def hot_weights(count):
+    """Zipf-like cumulative weights so a few matchups get most of the traffic."""
+    total = 0.0
+    cumulative = []
+    for rank in range(count):
+        total += 1.0 / (rank + 1)
+        cumulative.append(total)
+    return cumulative
+
+
+def seed_store(load, config, seed):
+    """Load a synthetic dataset through ``load(table, items)``.
+
+    Returns the ids the routes need (hot matchup, comment timestamps).
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+
+    entry_ids = [f"entry-{i:06d}" for i in range(config["entries"])]
+    load(DATA, ({
+        "pk": "ENTRY",
+        "sk": entry_id,
+        "id": entry_id,
+        "name": f"Bench Place {i}",
+        "blurb": "A synthetic entry used for route benchmarks. " * 2,
+        "neighborhood": NEIGHBORHOODS[i % len(NEIGHBORHOODS)],
+        "category": CATEGORIES[i % len(CATEGORIES)],
+        "tag": "Local",
+        "image_url": f"https://images.example.invalid/{entry_id}.jpg",
+    } for i, entry_id in enumerate(entry_ids)))
+
+    matchup_ids = [f"bench-{i:06d}" for i in range(config["matchups"])]
+    live = []
+    matchups = []
+    for i, matchup_id in enumerate(matchup_ids):
+        left, right = rng.sample(entry_ids, 2)
+        bucket = i % 10
+        active = bucket < 4 or i == 0
+        if i == 0 or bucket < 2:
+            starts, ends = now - timedelta(days=1), now + timedelta(days=6)
+            live.append(matchup_id)
+        elif bucket < 3:
+            starts, ends = now + timedelta(days=bucket + 1), now + timedelta(days=bucket + 8)
+        else:
+            starts, ends = now - timedelta(days=30 + i % 30), now - timedelta(days=23 + i % 30)
+        matchups.append({
+            "pk": "MATCHUP",
+            "sk": matchup_id,
+            "id": matchup_id,
+            "title": f"Bench Matchup {i}",
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "left_entry_id": left,
+            "right_entry_id": right,
+            "active": active,
+            "cadence": "weekly",
+            "starts_at": iso(starts),
+            "ends_at": iso(ends),
+            "message": "",
+        })
+    load(DATA, matchups)
+    load(DATA, [{"pk": "MATCHUP", "sk": "ACTIVE", "matchup_id": matchup_ids[0]}])
+
+    cumulative = hot_weights(len(matchup_ids))
+    totals = {matchup_id: [0, 0] for matchup_id in matchup_ids}
+
+    def vote_rows():
+        chosen = rng.choices(matchup_ids, cum_weights=cumulative, k=config["votes"])
+        base = now - timedelta(days=7)
+        for n, matchup_id in enumerate(chosen):
+            side = n & 1
+            totals[matchup_id][side] += 1
+            ts = (base + timedelta(seconds=n % 600000)).isoformat()
+            yield {
+                "pk": f"VOTES#{matchup_id}",
+                "sk": f"V#fp-{n % 250000:06d}#{ts}",
+                "side": "right" if side else "left",
+                "ts": ts,
+            }
+
+    load(DATA, vote_rows())
+
+    hot = live[0]
+    base_ms = int((now - timedelta(days=3)).timestamp() * 1000)
+    comment_matchups = rng.choices(matchup_ids, cum_weights=cumulative, k=config["comments"])
+    hot_timestamps = []
+    rows = []
+    for n, matchup_id in enumerate(comment_matchups):
+        timestamp = str(base_ms + n * 1000)
+        if matchup_id == hot:
+            hot_timestamps.append(timestamp)
+        rows.append({
+            "pk": f"COMMENT#{matchup_id}",
+            "sk": f"TIMESTAMP#{timestamp}",
+            "author_name": f"Bencher {n % 97}",
+            "comment_text": "Synthetic comment body for benchmarking. " * (1 + n % 4),
+            "fingerprint": f"fp-{n:06d}",
+            "created_at": iso(now - timedelta(days=3) + timedelta(seconds=n)),
+            "upvotes": n % 7,
+            "downvotes": n % 3,
+            "rank": (n % 7 - n % 3) * 10 ** 13 + int(timestamp),
+        })
+    load(COMMENTS, rows)
+    comment_counts = Counter(comment_matchups)
+    load(DATA, ({"pk": f"VOTES#{matchup_id}", "sk": "TOTAL", "left": left, "right": right,
+                 "comment_count": comment_counts[matchup_id]}
+                for matchup_id, (left, right) in totals.items()))
+
+    import leaderboard
+
+    ended = [m for m in matchups if m["ends_at"] < iso(now)]
+    standings, applied = leaderboard.rebuild(
+        ended, {m["id"]: {"left": totals[m["id"]][0], "right": totals[m["id"]][1]} for m in ended},
+        {entry_id: f"Bench Place {i}" for i, entry_id in enumerate(entry_ids)})
+    load(DATA, standings + applied)
+
+    import submissions
+
+    pending = [{
+        "pk": submissions.status_pk("pending"),
+        "sk": iso(now - timedelta(minutes=n)),
+        "created_at": iso(now - timedelta(minutes=n)),
+        "left_name": f"Left {n}",
+        "right_name": f"Right {n}",
+        "category": CATEGORIES[n % len(CATEGORIES)],
+        "email": f"submitter{n}@example.invalid",
+        "reason": "benchmark",
+        "status": "pending",
+        "fingerprint": submissions.fingerprint(f"Left {n}", f"Right {n}", CATEGORIES[n % len(CATEGORIES)]),
+        "duplicate_count": n % 4,
+    } for n in range(500)]
+    load(DATA, pending)
+    load(DATA, ({"pk": submissions.FINGERPRINT_PK, "sk": item["fingerprint"], "status": "pending",
+                 "created_at": item["sk"]} for item in pending))
+    load(DATA, [
+        {"pk": "VISIT", "sk": "ALL", "count": 100000, "updated_at": iso(now)},
+        {"pk": "VISIT", "sk": "REAL", "count": 60000, "updated_at": iso(now)},
+    ])
+    return {"hot_matchup": hot, "live_matchups": live, "hot_comment_timestamps": hot_timestamps or [str(base_ms)]}
+
+
+def encode_cursor(key):
+    """Same shape as backend/app.py's encode_cursor."""
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def build_routes(ids):
+    """(name, method, path, query, body_fn, admin[, extra headers]) for every non-destructive route."""
+    hot = ids["hot_matchup"]
+    live = ids["live_matchups"]
+    stamps = ids["hot_comment_timestamps"]
+    return [
+        ("GET /matchup", "GET", "/matchup", "", None, False),
+        ("GET /matchup compact", "GET", "/matchup", "fields=matchup.title,entry.name,votes&compact=1", None, False),
+        ("GET /history", "GET", "/history", "", None, False),
+        ("GET /future", "GET", "/future", "", None, False),
+        ("GET /comments", "GET", "/comments", f"matchup_id={hot}", None, False),
+        ("GET /comments new", "GET", "/comments", f"matchup_id={hot}&sort=new&limit=20", None, False),
+        # Cursors handed across sort orders: sort=top rejects one without rank (400, not 500),
+        # sort=new ignores the extra rank.
+        ("GET /comments bad cursor", "GET", "/comments", f"matchup_id={hot}&sort=top&cursor="
+         + encode_cursor({"pk": f"COMMENT#{hot}", "sk": f"TIMESTAMP#{stamps[0]}"}), None, False),
+        ("GET /comments top cursor", "GET", "/comments", f"matchup_id={hot}&sort=new&limit=20&cursor="
+         + encode_cursor({"pk": f"COMMENT#{hot}", "sk": f"TIMESTAMP#{stamps[0]}", "rank": 0}), None, False),
+        ("GET /comments/summary", "GET", "/comments/summary", "ids=" + ",".join(live[:10]), None, False),
+        ("GET /ratings", "GET", "/ratings", "ids=" + ",".join(live[:10]), None, False),
+        ("GET /leaderboard", "GET", "/leaderboard", f"category={CATEGORIES[0]}", None, False),
+        ("POST /vote", "POST", "/vote", "",
+         lambda i: {"matchup_id": live[i % len(live)], "side": "left" if i % 2 else "right",
+                    "fingerprint": f"bench-voter-{i}"}, False),
+        ("POST /vote replay", "POST", "/vote", "",
+         lambda i: {"matchup_id": hot, "side": "left", "fingerprint": "bench-retrier"}, False,
+         {"Idempotency-Key": "bench-vote-retry"}),
+        ("POST /visit", "POST", "/visit", "", lambda i: {"real": True}, False),
+        ("POST /comment", "POST", "/comment", "",
+         lambda i: {"matchup_id": hot, "author_name": "Bench", "comment_text": f"bench comment {i}",
+                    "fingerprint": f"bench-commenter-{i}"}, False),
+        ("POST /comment/vote", "POST", "/comment/vote", "",
+         lambda i: {"matchup_id": hot, "timestamp": stamps[i % len(stamps)], "vote_type": "up",
+                    "fingerprint": f"bench-comment-voter-{i}"}, False),
+        ("POST /matchup/rate", "POST", "/matchup/rate", "",
+         lambda i: {"matchup_id": hot, "rating": "good", "fingerprint": f"bench-rater-{i}"}, False),
+        ("POST /submit", "POST", "/submit", "",
+         lambda i: {"left_name": "Bench Left", "right_name": "Bench Right", "category": "pizza"}, False),
+        ("POST /newsletter", "POST", "/newsletter", "",
+         lambda i: {"email": f"bench{i}@example.invalid", "source": "bench"}, False),
+        ("GET /admin/matchups", "GET", "/admin/matchups", "", None, True),
+        ("GET /admin/entries", "GET", "/admin/entries", "", None, True),
+        ("GET /admin/submissions", "GET", "/admin/submissions", "", None, True),
+        ("GET /admin/visits", "GET", "/admin/visits", "", None, True),
+        ("GET /admin/dashboard", "GET", "/admin/dashboard", "", None, True),
+        ("POST /admin/bulk-activate", "POST", "/admin/bulk-activate", "", lambda i: {"matchup_ids": live}, True),
+    ]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def response_size(response):
+    """Bytes on the wire for a handler response (base64 bodies are decoded)."""
+    body = response.get("body") or ""
+    if response.get("isBase64Encoded"):
+        return len(base64.b64decode(body))
+    return len(body.encode("utf-8"))
+
+
+def bench_route(app, db, metrics, route, iterations, warmup, accept_encoding="", profile_dir=None):
+    name, method, path, query, body_fn, admin, *extra_headers = route
+    headers = {"Content-Type": "application/json", "User-Agent": "ScrumbleBench/1.0", **dict(*extra_headers)}
+    if accept_encoding:
+        headers["Accept-Encoding"] = accept_encoding
+    if admin:
+        headers["X-Admin-Key"] = ADMIN_KEY
+
+    def invoke(i):
+        event = build_event(method, path, query, headers, body_fn(i) if body_fn else None)
+        return app.handler(event, None)
+
+    for i in range(warmup):
+        invoke(-(i + 1))
+
+    timings = []
+    statuses = {}
+    response_bytes = 0
+    before = db.stats.snapshot()
+    metric_calls = metrics.calls
+    serialize_before = dict(app.response_stats)
+    profile = cProfile.Profile() if profile_dir else None
+    if profile:
+        profile.enable()
+    for i in range(iterations):
+        start = time.perf_counter()
+        response = invoke(i)
+        timings.append((time.perf_counter() - start) * 1000)
+        status = str(response["statusCode"])
+        statuses[status] = statuses.get(status, 0) + 1
+        response_bytes += response_size(response)
+    profiled = None
+    if profile:
+        import profiling
+
+        profile.disable()
+        dump = os.path.join(profile_dir, re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_") + ".prof")
+        profile.dump_stats(dump)
+        profiled = {"file": dump, "top": profiling.top_functions(profile, 10)}
+    serialize = {key: app.response_stats[key] - value for key, value in serialize_before.items()}
+    by_op = CallStats.diff(db.stats.snapshot(), before)
+    totals = {field: 0 for field in CallStats.FIELDS}
+    for bucket in by_op.values():
+        for field in CallStats.FIELDS:
+            totals[field] += bucket[field]
+
+    timings.sort()
+    per_request = {field: round(totals[field] / iterations, 2) for field in COUNTERS}
+    per_request["response_bytes"] = round(response_bytes / iterations, 1)
+    return {
+        "requests": iterations,
+        "status": statuses,
+        "wall_ms": {
+            "p50": round(percentile(timings, 50), 3),
+            "p95": round(percentile(timings, 95), 3),
+            "mean": round(sum(timings) / iterations, 3),
+        },
+        "per_request": per_request,
+        "calls_by_op": {op: round(bucket["calls"] / iterations, 2) for op, bucket in sorted(by_op.items())},
+        "metric_calls": round((metrics.calls - metric_calls) / iterations, 2),
+        "serialize": {
+            "ms_per_request": round(serialize["serialize_ms"] / iterations, 3),
+            "bodies_per_request": round(serialize["serializations"] / iterations, 2),
+            "cache_hits": serialize["cache_hits"],
+            "not_modified": serialize["not_modified"],
+        },
+        **({"profile": profiled} if profiled else {}),
+    }
+
+
+def print_results(results):
+    print(f"  {'route':<24} {'status':<10} {'p50 ms':>9} {'p95 ms':>9} {'calls':>8} "
+          f"{'items':>9} {'read KB':>9} {'RCU':>8} {'WCU':>6} {'resp KB':>8} {'ser ms':>7} {'hits':>5}")
+    for name, result in results.items():
+        stats = result["per_request"]
+        status = ",".join(f"{code}x{count}" for code, count in sorted(result["status"].items()))
+        print(f"  {name:<24} {status:<10} {result['wall_ms']['p50']:>9.2f} {result['wall_ms']['p95']:>9.2f} "
+              f"{stats['calls']:>8g} {stats['items_read']:>9g} {stats['read_bytes'] / 1024:>9.1f} "
+              f"{stats['read_units']:>8g} {stats['write_units']:>6g} {stats['response_bytes'] / 1024:>8.1f} "
+              f"{result['serialize']['ms_per_request']:>7.3f} {result['serialize']['cache_hits']:>5}")
+
+
+def print_profiles(results, limit=5):
+    for name, result in results.items():
+        if "profile" not in result:
+            continue
+        print(f"\n  {name}  ({result['profile']['file']})")
+        for row in result["profile"]["top"][:limit]:
+            print(f"    {row['cumtime_ms']:>10.1f} ms cum  {row['tottime_ms']:>9.1f} ms own  {row['calls']:>8}  "
+                  f"{row['function']}")
+
+
+def compare(baseline, results, wall_tolerance, count_tolerance, min_wall_ms):
+    """List of human-readable regressions against a saved baseline."""
+    regressions = []
+    for name, result in results.items():
+        old = baseline["routes"].get(name)
+        if old is None:
+            continue
+        for field in COUNTERS + ("response_bytes",):
+            before, after = old["per_request"].get(field, 0), result["per_request"][field]
+            if after > before * (1 + count_tolerance) and after - before > 1e-9:
+                regressions.append(f"{name}: {field} {before:g} -> {after:g}")
+        before, after = old["wall_ms"]["p50"], result["wall_ms"]["p50"]
+        if after > before * (1 + wall_tolerance) and after - before > min_wall_ms:
+            regressions.append(f"{name}: p50 {before:.2f}ms -> {after:.2f}ms")
+        if set(old["status"]) != set(result["status"]):
+            regressions.append(f"{name}: status {sorted(old['status'])} -> {sorted(result['status'])}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend/app.py routes in-process.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Dataset preset.")
+    parser.add_argument("--matchups", type=int, help="Override the preset's matchup count.")
+    parser.add_argument("--entries", type=int, help="Override the preset's entry count.")
+    parser.add_argument("--votes", type=int, help="Override the preset's vote-row count.")
+    parser.add_argument("--comments", type=int, help="Override the preset's comment count.")
+    parser.add_argument("--storage", choices=["memory", "sqlite"], default="memory",
+                        help="In-memory DynamoDB stand-in (with call accounting) or a temporary SQLite file.")
+    parser.add_argument("--seed", type=int, default=1, help="RNG seed for the dataset.")
+    parser.add_argument("--iterations", type=int, default=20, help="Measured requests per route.")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests per route.")
+    parser.add_argument("--routes", help="Comma-separated route names to run (e.g. 'GET /matchup,POST /vote').")
+    parser.add_argument("--accept-encoding", default="",
+                        help="Accept-Encoding to send (e.g. 'gzip, br'); response sizes are measured on the wire.")
+    parser.add_argument("--response-cache", action="store_true",
+                        help="Keep the backend's encoded-response cache on (off by default so every request "
+                             "does the route's full work).")
+    parser.add_argument("--rate-limit", action="store_true",
+                        help="Keep the backend's per-client rate limits on (off by default; the bench sends "
+                             "every write from one client).")
+    parser.add_argument("--profile-dir", help="Profile each route's measured requests with cProfile and write "
+                                               "<dir>/<route>.prof (wall times include profiling overhead).")
+    parser.add_argument("--json-out", help="Write results as JSON.")
+    parser.add_argument("--save-baseline", help="Write results as a baseline file.")
+    parser.add_argument("--baseline", help="Compare against a baseline; exit 1 on regression, "
+                                           "2 if it was recorded with a different configuration.")
+    parser.add_argument("--allow-config-mismatch", action="store_true",
+                        help="Compare against a baseline recorded with a different configuration.")
+    parser.add_argument("--wall-tolerance", type=float, default=0.25, help="Allowed p50 slowdown (0.25 = 25%%).")
+    parser.add_argument("--count-tolerance", type=float, default=0.02,
+                        help="Allowed growth in calls/items/bytes/units (0.02 = 2%%).")
+    parser.add_argument("--min-wall-ms", type=float, default=0.2,
+                        help="Ignore p50 slowdowns smaller than this many ms.")
+    args = parser.parse_args()
+    if args.iterations < 1:
+        raise SystemExit("--iterations must be at least 1")
+
+    config = dict(SCALES[args.scale])
+    for field in ("matchups", "entries", "votes", "comments"):
+        if getattr(args, field) is not None:
+            config[field] = getattr(args, field)
+    if config["matchups"] < 1 or config["entries"] < 2:
+        raise SystemExit("Need at least 1 matchup and 2 entries")
+
+    os.environ["ADMIN_KEY"] = ADMIN_KEY
+    app = load_app()
+    import storage
+
+    app.ADMIN_KEY = ADMIN_KEY
+    app.RESPONSE_CACHE_ENABLED = args.response_cache
+    app.limiter.enabled = args.rate_limit
+    db = MemoryDynamo()
+    metrics = NullMetrics()
+    app.cloudwatch = metrics
+    if args.storage == "sqlite":
+        sqlite_dir = tempfile.mkdtemp(prefix="scrumble-bench-")
+        app.store = storage.SqliteStorage(os.path.join(sqlite_dir, "bench.db"), storage.table_names())
+        load = app.store.load
+    else:
+        app.store = storage.DynamoStorage(db, storage.table_names())
+        tables = {DATA: db.Table(app.store.table_names[DATA]), COMMENTS: db.Table(app.store.table_names[COMMENTS])}
+        tables[COMMENTS].add_index("pk-rank-index", "pk", "rank")
+        tables[DATA].add_index("pk-elo-index", "pk", "elo")
+
+        def load(table, items):
+            tables[table].load(items)
+    app.limiter.store = app.store
+    app.idempotency_store.store = app.store
+    if args.profile_dir:
+        os.makedirs(args.profile_dir, exist_ok=True)
+        app.profiler.sample_rate = 0  # the bench profiles whole routes itself
+
+    started = time.perf_counter()
+    ids = seed_store(load, config, args.seed)
+    print(f"Seeded {config['matchups']:,} matchups, {config['entries']:,} entries, "
+          f"{config['votes']:,} votes, {config['comments']:,} comments "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    routes = build_routes(ids)
+    if args.routes:
+        wanted = {name.strip() for name in args.routes.split(",") if name.strip()}
+        unknown = wanted - {route[0] for route in routes}
+        if unknown:
+            raise SystemExit(f"Unknown routes: {', '.join(sorted(unknown))}")
+        routes = [route for route in routes if route[0] in wanted]
+
+    results = {}
+    for route in routes:
+        # The handler prints two JSON log lines per request; keep them off the report.
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            results[route[0]] = bench_route(app, db, metrics, route, args.iterations, args.warmup,
+                                            args.accept_encoding, args.profile_dir)
+    print_results(results)
+    print_profiles(results)
+    if args.storage == "sqlite":
+        print("  (calls/items/units are DynamoDB accounting and read 0 with --storage sqlite)")
+        shutil.rmtree(sqlite_dir, ignore_errors=True)
+
+    run = {
+        "config": {**config, "storage": args.storage, "accept_encoding": args.accept_encoding,
+                   "response_cache": args.response_cache, "rate_limit": args.rate_limit, "seed": args.seed, "iterations": args.iterations,
+                   "warmup": args.warmup},
+        "python": sys.version.split()[0],
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "routes": results,
+    }
+    for path in (args.json_out, args.save_baseline):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                json.dump(run, handle, indent=2, sort_keys=True)
+            print(f"Wrote {path}")
+
+    errors = [name for name, result in results.items() if any(code.startswith("5") for code in result["status"])]
+    if errors:
+        print(f"\n{len(errors)} route(s) returned server errors: {', '.join(errors)}")
+        sys.exit(1)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        if baseline.get("config") != run["config"]:
+            print(f"Baseline config {baseline.get('config')} does not match this run {run['config']}",
+                  file=sys.stderr)
+            if not args.allow_config_mismatch:
+                sys.exit(2)
+            print("⚠️  Comparing anyway (--allow-config-mismatch)", file=sys.stderr)
+        regressions = compare(baseline, results, args.wall_tolerance, args.count_tolerance, args.min_wall_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)
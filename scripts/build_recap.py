@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Build the weekly recap for matchups that ended in one ISO week.
+
+Reads the week's matchups with batched reads: one Query for matchups, then
+BatchGetItem for vote totals, entries and leaderboard ratings, plus one Limit-3
+rank-index query per matchup for its top comments. In a single pass it
+computes totals, margins, biggest upsets (a winner rated below its opponent on
+the leaderboard), vote velocity and top comments. The result is stored as a
+RECAP#<week>/SUMMARY item, served as-is by GET /recap/<week> (and
+/recap/latest), and written out as static JSON and HTML artifacts.
+
+Usage:
+    python scripts/build_recap.py                                # last full week
+    python scripts/build_recap.py --week 2026-W07
+    python scripts/build_recap.py --week 2026-W07 --dry-run
+    python scripts/build_recap.py --sqlite scrumble.db --out-dir app/recaps
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from local_handler import BACKEND_DIR
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+import leaderboard  # noqa: E402
+import storage  # noqa: E402
+
+WEEK_PATTERN = re.compile(r"^(\d{4})-W(\d{2})$")
+HIGHLIGHTS = 5
+COMMENTS_PER_MATCHUP = 3
+DEFAULT_OUT_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "app", "recaps")
+
+
+def parse_time(value):
+    try:
+        parsed = datetime.fromisoformat((value or "").replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def week_bounds(week):
+    match = WEEK_PATTERN.match(week or "")
+    if not match:
+        raise SystemExit(f"--week must look like 2026-W07, got {week!r}")
+    start = datetime.fromisocalendar(int(match.group(1)), int(match.group(2)), 1).replace(tzinfo=timezone.utc)
+    return start, start + timedelta(days=7)
+
+
+def last_full_week(now):
+    year, week, _ = (now - timedelta(days=7)).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def open_store(args):
+    tables = {**storage.table_names(), storage.DATA: args.table, storage.COMMENTS: args.comments_table}
+    if args.sqlite:
+        return storage.SqliteStorage(args.sqlite, tables)
+    import boto3
+
+    return storage.DynamoStorage(boto3.resource("dynamodb"), tables)
+
+
+def load_week(store, start, end, workers):
+    """Everything the recap needs, in batched reads."""
+    matchups, _ = store.query(storage.DATA, "MATCHUP")
+    week = []
+    for matchup in matchups:
+        ends = parse_time(matchup.get("ends_at"))
+        if matchup["sk"] != "ACTIVE" and ends is not None and start <= ends < end:
+            week.append(matchup)
+    ids = [m["id"] for m in week]
+    entry_ids = list(dict.fromkeys(e for m in week for e in (m["left_entry_id"], m["right_entry_id"])))
+
+    totals = store.batch_get(storage.DATA, [(f"VOTES#{i}", "TOTAL") for i in ids],
+                             attributes=["left", "right", "comment_count"])
+    entries = store.batch_get(storage.DATA, [("ENTRY", e) for e in entry_ids], attributes=["name", "neighborhood"])
+    ratings = store.batch_get(storage.DATA, [leaderboard.standing_key(leaderboard.ALL, e) for e in entry_ids],
+                              attributes=["elo", "rating"])
+
+    def top_comments(matchup_id):
+        items, _ = store.query(storage.COMMENTS, f"COMMENT#{matchup_id}", forward=False,
+                               limit=COMMENTS_PER_MATCHUP, index="rank")
+        return items
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        comments = dict(zip(ids, pool.map(top_comments, ids)))
+
+    return (week,
+            {i: totals.get((f"VOTES#{i}", "TOTAL")) or {} for i in ids},
+            {e: entries.get(("ENTRY", e)) or {} for e in entry_ids},
+            {sk[len("ENTRY#"):]: float(leaderboard.standing_rating(item)) for (_, sk), item in ratings.items()},
+            comments)
+
+
+def build_recap(week_id, start, end, matchups, totals, entries, ratings, comments, now):
+    """The recap document, computed in one pass over the week's matchups."""
+    summaries, all_comments = [], []
+    recap_totals = {"matchups": 0, "votes": 0, "comments": 0}
+    for matchup in matchups:
+        counts = totals[matchup["id"]]
+        left_votes, right_votes = int(counts.get("left", 0)), int(counts.get("right", 0))
+        total = left_votes + right_votes
+        sides = {}
+        for side, entry_id, votes in (("left", matchup["left_entry_id"], left_votes),
+                                      ("right", matchup["right_entry_id"], right_votes)):
+            entry = entries.get(entry_id, {})
+            sides[side] = {"id": entry_id, "name": entry.get("name", ""), "neighborhood": entry.get("neighborhood", ""),
+                           "votes": votes, "rating": round(ratings[entry_id]) if entry_id in ratings else None}
+        winner = None if left_votes == right_votes else ("left" if left_votes > right_votes else "right")
+        starts, ends = parse_time(matchup.get("starts_at")), parse_time(matchup.get("ends_at"))
+        hours = max((ends - starts).total_seconds() / 3600, 1) if starts and ends else 24 * 7
+        upset_gap = 0
+        if winner:
+            loser = "right" if winner == "left" else "left"
+            if sides[winner]["rating"] is not None and sides[loser]["rating"] is not None:
+                upset_gap = max(0, sides[loser]["rating"] - sides[winner]["rating"])
+        summary = {
+            "id": matchup["id"],
+            "title": matchup.get("title", ""),
+            "category": matchup.get("category", ""),
+            "left": sides["left"],
+            "right": sides["right"],
+            "total_votes": total,
+            "winner": winner,
+            "margin": abs(left_votes - right_votes),
+            "margin_pct": round(abs(left_votes - right_votes) / total, 4) if total else 0.0,
+            "votes_per_hour": round(total / hours, 2),
+            "comment_count": int(counts.get("comment_count", 0)),
+            "upset_gap": upset_gap,
+        }
+        summaries.append(summary)
+        recap_totals["matchups"] += 1
+        recap_totals["votes"] += total
+        recap_totals["comments"] += summary["comment_count"]
+        for item in comments.get(matchup["id"], []):
+            all_comments.append({
+                "matchup_id": matchup["id"],
+                "matchup_title": summary["title"],
+                "author_name": item.get("author_name", "Anonymous"),
+                "comment_text": item.get("comment_text", ""),
+                "score": int(item.get("upvotes", 0)) - int(item.get("downvotes", 0)),
+            })
+
+    decided = [s for s in summaries if s["total_votes"]]
+    return {
+        "week": week_id,
+        "starts_at": start.isoformat().replace("+00:00", "Z"),
+        "ends_at": end.isoformat().replace("+00:00", "Z"),
+        "generated_at": now.isoformat().replace("+00:00", "Z"),
+        "totals": recap_totals,
+        "matchups": summaries,
+        "top_by_votes": [s["id"] for s in sorted(decided, key=lambda s: -s["total_votes"])[:HIGHLIGHTS]],
+        "closest": [s["id"] for s in sorted(decided, key=lambda s: (s["margin_pct"], -s["total_votes"]))[:3]],
+        "upsets": [s["id"] for s in sorted((s for s in decided if s["upset_gap"] > 0),
+                                           key=lambda s: -s["upset_gap"])[:3]],
+        "fastest": [s["id"] for s in sorted(decided, key=lambda s: -s["votes_per_hour"])[:3]],
+        "top_comments": sorted(all_comments, key=lambda c: -c["score"])[:HIGHLIGHTS],
+    }
+
+
+def render_html(recap):
+    """Static recap page in the site's layout."""
+    by_id = {s["id"]: s for s in recap["matchups"]}
+    esc = html.escape
+
+    def line(summary):
+        if summary["winner"]:
+            winner = summary[summary["winner"]]
+            result = f"{esc(winner['name'])} won by {summary['margin']} of {summary['total_votes']} votes"
+        else:
+            result = f"tied at {summary['left']['votes']} votes each"
+        return f"<li><strong>{esc(summary['title'] or summary['category'] or 'Matchup')}</strong> — {result}</li>"
+
+    def section(title, ids):
+        if not ids:
+            return ""
+        items = "".join(line(by_id[i]) for i in ids)
+        return (f'<article class="panel" style="margin-bottom:14px;"><h4>{title}</h4>'
+                f'<ol style="margin-top:10px; line-height:1.8;">{items}</ol></article>')
+
+    comments = "".join(
+        f"<li>“{esc(c['comment_text'])}” — {esc(c['author_name'])} <span class=\"tiny\">on "
+        f"{esc(c['matchup_title'])}</span></li>" for c in recap["top_comments"])
+    totals = recap["totals"]
+    body = "".join([
+        section("Top by Vote Volume", recap["top_by_votes"]),
+        section("Closest Battles", recap["closest"]),
+        section("Biggest Upsets", recap["upsets"]),
+        section("Fastest Voting", recap["fastest"]),
+        (f'<article class="panel" style="margin-bottom:14px;"><h4>Top Comments</h4>'
+         f'<ol style="margin-top:10px; line-height:1.8;">{comments}</ol></article>') if comments else "",
+    ])
+    return f"""<!doctype html>
+<html lang="en">
+  <head>
+    <meta charset="utf-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1" />
+    <title>Weekly Recap {esc(recap['week'])} - Scrumble</title>
+    <link rel="canonical" href="https://scrumble.cc/recaps/{esc(recap['week'])}.html" />
+    <link rel="stylesheet" href="../styles.css" />
+  </head>
+  <body>
+    <div class="page">
+      <header class="hero">
+        <h1 class="hero-title" style="font-size: 3rem;"><span>WEEKLY RECAP</span></h1>
+        <p style="max-width:700px; margin:0 auto 20px; color:var(--muted);">{esc(recap['week'])}: {totals['matchups']} matchups, {totals['votes']} votes, {totals['comments']} comments.</p>
+      </header>
+      <main>
+        <section class="arena" style="max-width: 900px; margin: 0 auto;">
+          <div class="history-list">{body}</div>
+        </section>
+      </main>
+    </div>
+  </body>
+</html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and store the weekly recap.")
+    parser.add_argument("--week", help="ISO week, e.g. 2026-W07 (default: the last full week).")
+    parser.add_argument("--table", default="scrumble-data", help="Data table name.")
+    parser.add_argument("--comments-table", default="scrumble-comments", help="Comments table name.")
+    parser.add_argument("--sqlite", metavar="PATH", help="Read and store in a local SQLite store instead of DynamoDB.")
+    parser.add_argument("--out-dir", default=DEFAULT_OUT_DIR, help="Where to write <week>.json and <week>.html.")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent comment queries.")
+    parser.add_argument("--dry-run", action="store_true", help="Print the recap JSON; store and write nothing.")
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    week_id = args.week or last_full_week(now)
+    start, end = week_bounds(week_id)
+    try:
+        store = open_store(args)
+        recap = build_recap(week_id, start, end, *load_week(store, start, end, args.workers), now)
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted", file=sys.stderr)
+        sys.exit(130)
+
+    encoded = json.dumps(recap, separators=(",", ":"), ensure_ascii=False)
+    if args.dry_run:
+        print(json.dumps(recap, indent=2, ensure_ascii=False))
+        return
+
+    store.put(storage.DATA, {"pk": f"RECAP#{week_id}", "sk": "SUMMARY", "recap_json": encoded,
+                             "generated_at": recap["generated_at"]})
+    latest = store.get(storage.DATA, "RECAP", "LATEST")
+    if latest is None or latest.get("week", "") <= week_id:
+        store.put(storage.DATA, {"pk": "RECAP", "sk": "LATEST", "week": week_id})
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    with open(os.path.join(args.out_dir, f"{week_id}.json"), "w", encoding="utf-8") as handle:
+        handle.write(encoded)
+    with open(os.path.join(args.out_dir, f"{week_id}.html"), "w", encoding="utf-8") as handle:
+        handle.write(render_html(recap))
+    totals = recap["totals"]
+    print(f"✓ Recap {week_id}: {totals['matchups']} matchups, {totals['votes']} votes -> "
+          f"RECAP#{week_id} and {args.out_dir}/{week_id}.{{json,html}}")
+
+
+if __name__ == "__main__":
+    main()
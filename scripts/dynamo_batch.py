@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Bulk DynamoDB helpers: segmented parallel scans and a concurrent batch writer.
+
+Items are handled in the low-level attribute-value format (``{"S": "..."}``)
+so nothing is deserialized or re-serialized on the way through.
+"""
+
+import json
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+
+from token_bucket import TokenBucket
+
+BATCH_WRITE_LIMIT = 25
+MAX_BACKOFF_SECONDS = 5.0
+
+
+def get_client(max_workers=10):
+    """DynamoDB client with a connection pool large enough for ``max_workers`` threads."""
+    config = Config(
+        max_pool_connections=max(10, max_workers * 2),
+        retries={"mode": "adaptive", "max_attempts": 10},
+    )
+    return boto3.client("dynamodb", config=config)
+
+
+def table_capacity(client, table_name):
+    """Return provisioned ``(read_units, write_units)``, or ``(None, None)`` for on-demand tables."""
+    desc = client.describe_table(TableName=table_name)["Table"]
+    billing = desc.get("BillingModeSummary", {}).get("BillingMode", "PROVISIONED")
+    if billing == "PAY_PER_REQUEST":
+        return None, None
+    throughput = desc.get("ProvisionedThroughput", {})
+    return throughput.get("ReadCapacityUnits"), throughput.get("WriteCapacityUnits")
+
+
+def capacity_bucket(units, fraction, override=None):
+    """Token bucket sized to ``fraction`` of ``units`` per second (unlimited when unknown)."""
+    if override is not None:
+        rate = override
+    elif units:
+        rate = units * fraction
+    else:
+        rate = 0
+    # Allow roughly one second of burst, which is what DynamoDB itself tolerates.
+    return TokenBucket(rate, capacity=max(rate, BATCH_WRITE_LIMIT))
+
+
+def item_write_units(item):
+    """Approximate WCUs for one low-level item (1 WCU per started KB)."""
+    return max(1, math.ceil(len(json.dumps(item, separators=(",", ":"))) / 1024))
+
+
+class Progress:
+    """Thread-safe counter that prints a rate line at most every ``interval`` seconds."""
+
+    def __init__(self, label, total=None, interval=5.0, stream=None):
+        self.label = label
+        self.total = total
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.count = 0
+        self._started = time.monotonic()
+        self._last_report = self._started
+        self._lock = threading.Lock()
+
+    def add(self, n):
+        with self._lock:
+            self.count += n
+            now = time.monotonic()
+            if now - self._last_report < self.interval:
+                return
+            self._last_report = now
+            self._report(now)
+
+    def _report(self, now):
+        elapsed = max(now - self._started, 1e-6)
+        total = f"/{self.total}" if self.total else ""
+        print(
+            f"  {self.label}: {self.count}{total} items ({self.count / elapsed:,.0f}/s, {elapsed:.0f}s)",
+            file=self.stream,
+            flush=True,
+        )
+
+    def finish(self):
+        with self._lock:
+            self._report(time.monotonic())
+
+
+def parallel_scan(client, table_name, segments, handle_page, read_bucket=None, page_size=None, progress=None):
+    """Scan ``table_name`` with ``segments`` concurrent workers.
+
+    ``handle_page(segment, items)`` is called from the worker thread that owns
+    the segment, one page at a time, so memory stays bounded by
+    ``segments`` pages regardless of table size. Returns the item count.
+    """
+    read_bucket = read_bucket or TokenBucket(0)
+
+    def scan_segment(segment):
+        params = {
+            "TableName": table_name,
+            "Segment": segment,
+            "TotalSegments": segments,
+            "ReturnConsumedCapacity": "TOTAL",
+        }
+        if page_size:
+            params["Limit"] = page_size
+        count = 0
+        while True:
+            read_bucket.acquire(1)
+            resp = client.scan(**params)
+            consumed = resp.get("ConsumedCapacity", {}).get("CapacityUnits", 1)
+            read_bucket.consume(consumed - 1)
+            items = resp.get("Items", [])
+            handle_page(segment, items)
+            count += len(items)
+            if progress:
+                progress.add(len(items))
+            last_key = resp.get("LastEvaluatedKey")
+            if not last_key:
+                return count
+            params["ExclusiveStartKey"] = last_key
+
+    with ThreadPoolExecutor(max_workers=segments) as pool:
+        return sum(pool.map(scan_segment, range(segments)))
+
+
+class BatchWriter:
+    """Concurrent BatchWriteItem writer.
+
+    Requests are grouped into batches of 25 and sent from ``workers`` threads.
+    At most ``workers * 2`` batches are buffered, so callers streaming millions
+    of items stay in bounded memory. UnprocessedItems are retried with
+    exponential backoff and jitter; ``write_bucket`` throttles the estimated
+    WCUs per second. The first worker error is re-raised from ``put``/``close``.
+    """
+
+    def __init__(self, client, table_name, workers=8, write_bucket=None, progress=None,
+                 key_names=("pk", "sk"), max_retries=10):
+        self.client = client
+        self.table_name = table_name
+        self.write_bucket = write_bucket or TokenBucket(0)
+        self.progress = progress
+        self.key_names = key_names
+        self.max_retries = max_retries
+        self.written = 0
+        self._pending = {}
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(workers * 2)
+        self._lock = threading.Lock()
+        self._error = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._pool.shutdown(wait=True)
+
+    def _key(self, item):
+        return tuple(json.dumps(item[name], sort_keys=True) for name in self.key_names)
+
+    def put(self, item):
+        self._add(self._key(item), {"PutRequest": {"Item": item}})
+
+    def delete(self, key):
+        self._add(self._key(key), {"DeleteRequest": {"Key": key}})
+
+    def _add(self, key, request):
+        self._raise_if_failed()
+        # BatchWriteItem rejects duplicate keys in one batch; last write wins like serial puts.
+        self._pending[key] = request
+        if len(self._pending) >= BATCH_WRITE_LIMIT:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        requests = list(self._pending.values())
+        self._pending = {}
+        self._slots.acquire()
+        future = self._pool.submit(self._write_batch, requests)
+        future.add_done_callback(self._on_done)
+
+    def close(self):
+        self.flush()
+        self._pool.shutdown(wait=True)
+        self._raise_if_failed()
+
+    def _on_done(self, future):
+        self._slots.release()
+        error = future.exception()
+        if error is not None:
+            with self._lock:
+                if self._error is None:
+                    self._error = error
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            raise self._error
+
+    def _units(self, requests):
+        units = 0
+        for request in requests:
+            put = request.get("PutRequest")
+            units += item_write_units(put["Item"]) if put else 1
+        return units
+
+    def _write_batch(self, requests):
+        attempt = 0
+        while requests:
+            self.write_bucket.acquire(self._units(requests))
+            resp = self.client.batch_write_item(RequestItems={self.table_name: requests})
+            unprocessed = resp.get("UnprocessedItems", {}).get(self.table_name, [])
+            done = len(requests) - len(unprocessed)
+            with self._lock:
+                self.written += done
+            if self.progress and done:
+                self.progress.add(done)
+            requests = unprocessed
+            if requests:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise RuntimeError(
+                        f"{len(requests)} items still unprocessed after {self.max_retries} retries"
+                    )
+                backoff = min(MAX_BACKOFF_SECONDS, 0.05 * (2 ** attempt))
+                time.sleep(random.uniform(0, backoff))
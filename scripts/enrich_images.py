@@ -9,6 +9,23 @@ Usage:
     python scripts/enrich_images.py                        # Update DynamoDB with Google URLs
     python scripts/enrich_images.py --download-to-s3       # Download and store in S3
     python scripts/enrich_images.py --force                # Re-fetch even if image exists
+    python scripts/enrich_images.py --workers 16 --places-qps 10   # Tune concurrency / API rate
+
+Entries are processed concurrently by a bounded thread pool; each external
+API has its own token-bucket rate limit and Pillow resizing runs in a process
+pool. Finished entries are appended to a checkpoint file so an interrupted
+run resumes where it stopped (--no-resume starts over). The checkpoint is
+deleted when a run completes, only resumes a run with the same options, and
+is not used by --force or --dry-run.
+
+With --download-to-s3 each photo is also encoded into responsive variants
+(several widths in AVIF/WebP plus a JPEG fallback). Uploads are skipped when
+the object's stored sha256 already matches, and the variant manifest is
+saved on the ENTRY item as image_variants.
+
+Places lookups and downloaded photos are cached on disk (.enrich-cache/), so
+--force re-runs, dry runs and S3 re-uploads skip the network when the cache
+is fresh. Use --refresh-cache to bypass it or --no-cache to disable it.
 
 Requirements:
     pip install boto3 requests pillow
@@ -17,21 +34,41 @@ Environment Variables:
     GOOGLE_PLACES_API_KEY - Your Google Places API key
     TABLE_NAME - DynamoDB table name (default: scrumble-data)
     S3_BUCKET - S3 bucket for images (optional, for --download-to-s3)
+    GOOGLE_PLACES_BASE_URL - Places API base (default: https://places.googleapis.com/v1;
+                             point at a fake server in tests)
 """
 
 import os
 import sys
+import json
+import hashlib
 import argparse
-import time
+import threading
 import requests
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from PIL import Image
 import boto3
+from botocore.exceptions import ClientError
+
+from places_cache import DEFAULT_CACHE_DIR, PlacesCache
+from token_bucket import TokenBucket
 
 # Configuration
 LOCATION = "Chattanooga, TN"
+PLACES_API_BASE = os.environ.get('GOOGLE_PLACES_BASE_URL', 'https://places.googleapis.com/v1').rstrip('/')
 IMAGE_SIZE = 800  # Max width/height for Google Places photos
 S3_IMAGE_SIZE = (400, 400)  # Resize to consistent dimensions
+VARIANT_WIDTHS = (160, 400, 800)  # Responsive widths, capped at the source width
+VARIANT_FORMATS = ('avif', 'webp', 'jpeg')  # Preferred first; AVIF needs pillow-avif-plugin on Pillow < 11
+FORMAT_SETTINGS = {
+    'avif': ('AVIF', 'image/avif', {'quality': 60}),
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 6}),
+    'jpeg': ('JPEG', 'image/jpeg', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+DEFAULT_CHECKPOINT = '.enrich-checkpoint.jsonl'
+
+_thread_state = threading.local()
 
 def get_dynamodb_table():
     """Get DynamoDB table"""
@@ -44,29 +81,53 @@ def get_s3_client():
     return boto3.client('s3')
 
 def fetch_entries(table, force=False):
-    """Fetch all entries that need images"""
-    if force:
-        # Get all entries
-        resp = table.query(
-            KeyConditionExpression='pk = :pk',
-            ExpressionAttributeValues={':pk': 'ENTRY'}
-        )
-    else:
+    """Fetch all entries that need images, following LastEvaluatedKey"""
+    params = {
+        'KeyConditionExpression': 'pk = :pk',
+        'ExpressionAttributeValues': {':pk': 'ENTRY'}
+    }
+    if not force:
         # Only entries without images
-        resp = table.scan(
-            FilterExpression='pk = :pk AND (attribute_not_exists(image_url) OR image_url = :empty)',
-            ExpressionAttributeValues={':pk': 'ENTRY', ':empty': ''}
-        )
+        params['FilterExpression'] = 'attribute_not_exists(image_url) OR image_url = :empty'
+        params['ExpressionAttributeValues'][':empty'] = ''
     
-    return resp.get('Items', [])
+    entries = []
+    while True:
+        resp = table.query(**params)
+        entries.extend(resp.get('Items', []))
+        last_key = resp.get('LastEvaluatedKey')
+        if not last_key:
+            return entries
+        params['ExclusiveStartKey'] = last_key
 
-def search_google_places(api_key, name, category=''):
-    """Search Google Places for a business/location using new API"""
+def get_http_session():
+    """Per-thread requests session so connections are kept alive"""
+    session = getattr(_thread_state, 'session', None)
+    if session is None:
+        session = requests.Session()
+        _thread_state.session = session
+    return session
+
+def search_google_places(api_key, name, category='', log=print, cache=None, limiter=None):
+    """Search Google Places for a business/location using new API.
+    
+    With a cache, fresh results (including "no match") are returned without a
+    network call; the limiter is only charged for real requests.
+    """
     query = f"{name} {LOCATION}"
     
+    if cache:
+        hit, cached = cache.get_place(query)
+        if hit:
+            if cached is None:
+                log(f"  ⚠️  No results found (cached)")
+            return cached
+    
     try:
+        if limiter:
+            limiter.acquire()
         # Use Text Search (New)
-        url = "https://places.googleapis.com/v1/places:searchText"
+        url = f"{PLACES_API_BASE}/places:searchText"
         headers = {
             'Content-Type': 'application/json',
             'X-Goog-Api-Key': api_key,
@@ -76,46 +137,69 @@ def search_google_places(api_key, name, category=''):
             'textQuery': query
         }
         
-        response = requests.post(url, json=data, headers=headers)
+        response = get_http_session().post(url, json=data, headers=headers, timeout=10)
         response.raise_for_status()
         result = response.json()
         
         if not result.get('places'):
-            print(f"  ⚠️  No results found")
+            log(f"  ⚠️  No results found")
+            if cache:
+                cache.put_place(query, None)
             return None
         
         place = result['places'][0]
         
         if not place.get('photos'):
-            print(f"  ⚠️  No photos available")
+            log(f"  ⚠️  No photos available")
+            if cache:
+                cache.put_place(query, None)
             return None
         
         # Get first photo name
         photo_name = place['photos'][0]['name']
         
-        return {
+        place_data = {
             'photo_name': photo_name,
             'address': place.get('formattedAddress', ''),
             'website': place.get('websiteUri', ''),
             'rating': place.get('rating')
         }
+        if cache:
+            cache.put_place(query, place_data)
+        return place_data
         
     except Exception as e:
-        print(f"  ❌ Error: {e}")
+        log(f"  ❌ Error: {e}")
         return None
 
 def get_google_photo_url(api_key, photo_name, max_width=IMAGE_SIZE):
     """Construct Google Places photo URL using new API"""
     # Extract resource name from photo_name (format: places/{place_id}/photos/{photo_id})
-    return f"https://places.googleapis.com/v1/{photo_name}/media?maxWidthPx={max_width}&key={api_key}"
+    return f"{PLACES_API_BASE}/{photo_name}/media?maxWidthPx={max_width}&key={api_key}"
 
-def download_and_resize_image(url):
-    """Download image and resize to consistent dimensions"""
-    response = requests.get(url, timeout=10)
+def download_image(url):
+    """Download raw image bytes"""
+    response = get_http_session().get(url, timeout=10)
     response.raise_for_status()
-    
+    return response.content
+
+def fetch_photo(api_key, photo_name, cache=None, limiter=None, max_width=IMAGE_SIZE):
+    """Photo bytes from the cache, or downloaded (and cached) on a miss"""
+    if cache:
+        data = cache.get_photo(photo_name, max_width)
+        if data is not None:
+            return data
+    if limiter:
+        limiter.acquire()
+    data = download_image(get_google_photo_url(api_key, photo_name, max_width))
+    if cache:
+        cache.put_photo(photo_name, max_width, data)
+    return data
+
+def resize_image_bytes(data):
+    """Resize image bytes to a padded square JPEG (CPU bound, runs in a process pool)"""
     # Open and resize image
-    img = Image.open(BytesIO(response.content))
+    img = Image.open(BytesIO(data))
     
     # Convert to RGB if necessary (handles RGBA, etc)
     if img.mode != 'RGB':
@@ -132,27 +216,113 @@ def download_and_resize_image(url):
     # Convert to bytes
     buffer = BytesIO()
     new_img.save(buffer, format='JPEG', quality=85, optimize=True)
-    buffer.seek(0)
+    return buffer.getvalue()
+
+def available_formats(requested=VARIANT_FORMATS):
+    """Requested variant formats this Pillow build can encode"""
+    try:
+        import pillow_avif  # noqa: F401  (registers AVIF support with older Pillow)
+    except ImportError:
+        pass
+    Image.init()
+    return [fmt for fmt in requested if FORMAT_SETTINGS[fmt][0] in Image.SAVE]
+
+def encode_variants(data, widths=VARIANT_WIDTHS, formats=VARIANT_FORMATS):
+    """Encode aspect-preserving variants of an image (CPU bound, runs in a process pool).
     
-    return buffer
+    Returns a list of dicts with width, height, format, content_type, sha256
+    and the encoded bytes. Widths larger than the source are collapsed into
+    one variant at the source width.
+    """
+    source = Image.open(BytesIO(data))
+    source.load()
+    if source.mode != 'RGB':
+        source = source.convert('RGB')
+    
+    variants = []
+    seen_widths = set()
+    for width in sorted(widths):
+        img = source.copy()
+        img.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+        if img.size[0] in seen_widths:
+            continue
+        seen_widths.add(img.size[0])
+        for fmt in available_formats(formats):
+            pil_format, content_type, options = FORMAT_SETTINGS[fmt]
+            buffer = BytesIO()
+            img.save(buffer, format=pil_format, **options)
+            body = buffer.getvalue()
+            variants.append({
+                'width': img.size[0],
+                'height': img.size[1],
+                'format': fmt,
+                'content_type': content_type,
+                'sha256': hashlib.sha256(body).hexdigest(),
+                'data': body
+            })
+    return variants
 
-def upload_to_s3(s3_client, bucket, entry_id, image_data):
-    """Upload image to S3"""
-    key = f"entries/{entry_id}.jpg"
+def encode_entry_images(data, widths=VARIANT_WIDTHS, formats=VARIANT_FORMATS):
+    """Legacy square JPEG plus responsive variants, in one process-pool task"""
+    return resize_image_bytes(data), encode_variants(data, widths, formats)
+
+def download_and_resize_image(url):
+    """Download image and resize to consistent dimensions"""
+    return BytesIO(resize_image_bytes(download_image(url)))
+
+def s3_url(bucket, key):
+    return f"https://{bucket}.s3.amazonaws.com/{key}"
+
+def put_if_changed(s3_client, bucket, key, body, content_type):
+    """Upload unless the stored object's sha256 metadata already matches. Returns True if uploaded."""
+    digest = hashlib.sha256(body).hexdigest()
+    try:
+        head = s3_client.head_object(Bucket=bucket, Key=key)
+        if head.get('Metadata', {}).get('sha256') == digest:
+            return False
+    except ClientError:
+        pass  # Missing (or unreadable) object: upload it
     
     s3_client.put_object(
         Bucket=bucket,
         Key=key,
-        Body=image_data,
-        ContentType='image/jpeg',
+        Body=body,
+        ContentType=content_type,
         CacheControl='max-age=31536000',
+        Metadata={'sha256': digest},
         ACL='public-read'
     )
-    
-    return f"https://{bucket}.s3.amazonaws.com/{key}"
+    return True
+
+def upload_to_s3(s3_client, bucket, entry_id, image_data):
+    """Upload image to S3 (skipped when unchanged)"""
+    key = f"entries/{entry_id}.jpg"
+    body = image_data.getvalue() if hasattr(image_data, 'getvalue') else image_data
+    put_if_changed(s3_client, bucket, key, body, 'image/jpeg')
+    return s3_url(bucket, key)
+
+def variant_key(entry_id, variant):
+    ext = 'jpg' if variant['format'] == 'jpeg' else variant['format']
+    return f"entries/{entry_id}/{variant['width']}.{ext}"
+
+def upload_variants(s3_client, bucket, entry_id, variants, dry_run=False):
+    """Upload changed variants; returns (manifest, uploaded count)"""
+    manifest = []
+    uploaded = 0
+    for variant in variants:
+        key = variant_key(entry_id, variant)
+        if not dry_run and put_if_changed(s3_client, bucket, key, variant['data'], variant['content_type']):
+            uploaded += 1
+        manifest.append({
+            'width': variant['width'],
+            'height': variant['height'],
+            'format': variant['format'],
+            'url': s3_url(bucket, key)
+        })
+    return manifest, uploaded
 
-def update_entry(table, entry_id, image_url, place_data, dry_run=False):
-    """Update DynamoDB entry with image and metadata"""
+def update_entry(table, entry_id, image_url, place_data, dry_run=False, variants=None):
+    """Update DynamoDB entry with image, variant manifest and metadata"""
     if dry_run:
         print(f"  [DRY RUN] Would update with: {image_url}")
         return
@@ -161,6 +331,10 @@ def update_entry(table, entry_id, image_url, place_data, dry_run=False):
     expr_values = {':url': image_url}
     expr_names = {}
     
+    if variants:
+        update_expr += ', image_variants = :variants'
+        expr_values[':variants'] = variants
+    
     if place_data.get('address'):
         update_expr += ', address = :addr'
         expr_values[':addr'] = place_data['address']
@@ -181,12 +355,161 @@ def update_entry(table, entry_id, image_url, place_data, dry_run=False):
     
     table.update_item(**update_params)
 
+class Checkpoint:
+    """Append-only JSONL record of finished entries so interrupted runs can resume
+
+    The first line holds the run mode; a checkpoint left by a run in another
+    mode (plain URLs vs S3 variants, different widths/formats) is discarded.
+    """
+    
+    def __init__(self, path, mode, resume=True):
+        self.path = path
+        self.done = set()
+        self.discarded = False
+        self._lock = threading.Lock()
+        self._handle = None
+        if not path:
+            return
+        lines = []
+        if resume and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as handle:
+                lines = [json.loads(line) for line in handle if line.strip()]
+        resume = bool(lines) and lines[0].get('mode') == mode
+        self.discarded = bool(lines) and not resume
+        if resume:
+            self.done.update(line['entry_id'] for line in lines[1:])
+        self._handle = open(path, 'a' if resume else 'w', encoding='utf-8')
+        if not resume:
+            self._handle.write(json.dumps({'mode': mode}) + '\n')
+            self._handle.flush()
+    
+    def record(self, entry_id, status, image_url=''):
+        if not self._handle:
+            return
+        line = json.dumps({'entry_id': entry_id, 'status': status, 'image_url': image_url})
+        with self._lock:
+            self._handle.write(line + '\n')
+            self._handle.flush()
+            self.done.add(entry_id)
+    
+    def close(self):
+        if self._handle:
+            self._handle.close()
+    
+    def remove(self):
+        """Delete the checkpoint once a run has been through every entry"""
+        self.close()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+class EnrichContext:
+    """Shared clients, rate limiters and pools for one enrichment run"""
+    
+    def __init__(self, args, api_key, table, s3_client=None, s3_bucket=None):
+        self.args = args
+        self.api_key = api_key
+        self.table = table
+        self.s3_client = s3_client
+        self.s3_bucket = s3_bucket
+        self.places_bucket = TokenBucket(args.places_qps)
+        self.photos_bucket = TokenBucket(args.photo_qps)
+        self.resize_pool = ProcessPoolExecutor(max_workers=args.resize_workers) if args.download_to_s3 else None
+        self.variant_widths = tuple(int(w) for w in args.variant_widths.split(',') if w.strip())
+        self.variant_formats = tuple(available_formats(tuple(f.strip() for f in args.formats.split(',') if f.strip())))
+        self.cache = None
+        if not args.no_cache:
+            self.cache = PlacesCache(
+                args.cache_dir,
+                places_ttl_days=args.places_ttl_days,
+                photo_ttl_days=args.photo_ttl_days,
+                refresh=args.refresh_cache
+            )
+    
+    def close(self):
+        if self.resize_pool:
+            self.resize_pool.shutdown()
+        if self.cache:
+            self.cache.close()
+
+def process_entry(ctx, entry):
+    """Run one entry through search -> download -> resize -> upload -> update.
+    
+    Returns (status, log lines, image_url). Status is 'success', 'no_match'
+    (nothing to retry) or 'error' (retried on the next run).
+    """
+    lines = []
+    args = ctx.args
+    variants = None
+    entry_id = entry['sk']
+    name = entry.get('name', entry_id)
+    category = entry.get('category', '')
+    
+    # Search Google Places
+    place_data = search_google_places(
+        ctx.api_key, name, category, log=lines.append, cache=ctx.cache, limiter=ctx.places_bucket
+    )
+    
+    if not place_data:
+        status = 'error' if any('Error' in line for line in lines) else 'no_match'
+        return status, lines, ''
+    
+    # Get image URL
+    if args.download_to_s3:
+        # Download and upload to S3
+        try:
+            lines.append(f"  📥 Downloading image...")
+            raw_image = fetch_photo(ctx.api_key, place_data['photo_name'], cache=ctx.cache, limiter=ctx.photos_bucket)
+            image_data, encoded = ctx.resize_pool.submit(
+                encode_entry_images, raw_image, ctx.variant_widths, ctx.variant_formats
+            ).result()
+            
+            if not args.dry_run:
+                lines.append(f"  ☁️  Uploading to S3...")
+                image_url = upload_to_s3(ctx.s3_client, ctx.s3_bucket, entry_id, image_data)
+            else:
+                image_url = s3_url(ctx.s3_bucket, f"entries/{entry_id}.jpg")
+            variants, uploaded = upload_variants(
+                ctx.s3_client, ctx.s3_bucket, entry_id, encoded, dry_run=args.dry_run
+            )
+            
+            lines.append(f"  ✅ S3 URL: {image_url}")
+            lines.append(f"  🖼️  {len(variants)} variants ({uploaded} uploaded, {len(variants) - uploaded} unchanged)")
+        except Exception as e:
+            lines.append(f"  ❌ S3 upload failed: {e}")
+            return 'error', lines, ''
+    else:
+        # Use Google Places photo URL directly
+        image_url = get_google_photo_url(ctx.api_key, place_data['photo_name'])
+        lines.append(f"  ✅ Google URL: {image_url}")
+    
+    # Update DynamoDB
+    if args.dry_run:
+        lines.append(f"  [DRY RUN] Would update with: {image_url}")
+    else:
+        update_entry(ctx.table, entry_id, image_url, place_data, variants=variants)
+    return 'success', lines, image_url
+
 def main():
     parser = argparse.ArgumentParser(description='Enrich Scrumble entries with images')
     parser.add_argument('--dry-run', action='store_true', help='Preview without making changes')
     parser.add_argument('--force', action='store_true', help='Re-fetch images even if they exist')
     parser.add_argument('--download-to-s3', action='store_true', help='Download and store in S3')
     parser.add_argument('--limit', type=int, help='Limit number of entries to process')
+    parser.add_argument('--workers', type=int, default=8, help='Entries processed concurrently')
+    parser.add_argument('--resize-workers', type=int, default=os.cpu_count(), help='Processes for image resizing')
+    parser.add_argument('--places-qps', type=float, default=5, help='Max Places searches per second')
+    parser.add_argument('--photo-qps', type=float, default=10, help='Max photo downloads per second')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='Checkpoint file for resuming')
+    parser.add_argument('--no-resume', action='store_true', help='Ignore and overwrite the checkpoint file')
+    parser.add_argument('--variant-widths', default=','.join(str(w) for w in VARIANT_WIDTHS),
+                        help='Comma-separated variant widths for --download-to-s3')
+    parser.add_argument('--formats', default=','.join(VARIANT_FORMATS),
+                        help='Variant formats (unsupported ones are skipped)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Places/photo cache directory')
+    parser.add_argument('--places-ttl-days', type=float, default=30, help='Reuse cached Places results this long')
+    parser.add_argument('--photo-ttl-days', type=float, default=90, help='Reuse cached photos this long')
+    parser.add_argument('--refresh-cache', action='store_true', help='Ignore cached data but store fresh results')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the on-disk cache')
     args = parser.parse_args()
     
     # Check for API key
@@ -211,68 +534,75 @@ def main():
     # Initialize clients
     table = get_dynamodb_table()
     
+    # Dry runs never write the checkpoint, so they don't hide entries from a real run; --force
+    # re-fetches everything, so it ignores the checkpoint too
+    mode = {'download_to_s3': args.download_to_s3}
+    if args.download_to_s3:
+        mode.update(variant_widths=args.variant_widths, formats=args.formats)
+    checkpoint = Checkpoint(None if args.dry_run or args.force else args.checkpoint, mode,
+                            resume=not args.no_resume)
+    if checkpoint.discarded:
+        print(f"🗑️  Ignoring {args.checkpoint}: it was written by a run with different options")
+    
     # Fetch entries
     print(f"🔍 Fetching entries from DynamoDB...")
     entries = fetch_entries(table, force=args.force)
+    resumed = [e for e in entries if e['sk'] in checkpoint.done]
+    entries = [e for e in entries if e['sk'] not in checkpoint.done]
     
     if args.limit:
         entries = entries[:args.limit]
     
     print(f"📋 Found {len(entries)} entries to process")
+    if resumed:
+        print(f"⏩ Skipping {len(resumed)} entries already in {args.checkpoint}")
     
     if args.dry_run:
         print("🔍 DRY RUN MODE - No changes will be made\n")
     
-    # Process each entry
+    # Process entries concurrently
     success_count = 0
     skip_count = 0
     error_count = 0
     
-    for i, entry in enumerate(entries, 1):
-        entry_id = entry['sk']
-        name = entry.get('name', entry_id)
-        category = entry.get('category', '')
-        
-        print(f"\n[{i}/{len(entries)}] {name}")
-        
-        # Search Google Places
-        place_data = search_google_places(api_key, name, category)
-        
-        if not place_data:
-            error_count += 1
-            continue
-        
-        # Get image URL
-        if args.download_to_s3:
-            # Download and upload to S3
-            try:
-                google_url = get_google_photo_url(api_key, place_data['photo_name'])
-                print(f"  📥 Downloading image...")
-                image_data = download_and_resize_image(google_url)
+    ctx = EnrichContext(args, api_key, table, s3_client, s3_bucket)
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            futures = {pool.submit(process_entry, ctx, entry): entry for entry in entries}
+            for i, future in enumerate(as_completed(futures), 1):
+                entry = futures[future]
+                try:
+                    status, lines, image_url = future.result()
+                except Exception as e:
+                    status, lines, image_url = 'error', [f"  ❌ Error: {e}"], ''
                 
-                if not args.dry_run:
-                    print(f"  ☁️  Uploading to S3...")
-                    image_url = upload_to_s3(s3_client, s3_bucket, entry_id, image_data)
-                else:
-                    image_url = f"https://{s3_bucket}.s3.amazonaws.com/entries/{entry_id}.jpg"
+                print(f"\n[{i}/{len(entries)}] {entry.get('name', entry['sk'])}")
+                for line in lines:
+                    print(line)
                 
-                print(f"  ✅ S3 URL: {image_url}")
-            except Exception as e:
-                print(f"  ❌ S3 upload failed: {e}")
-                error_count += 1
-                continue
-        else:
-            # Use Google Places photo URL directly
-            image_url = get_google_photo_url(api_key, place_data['photo_name'])
-            print(f"  ✅ Google URL: {image_url}")
-        
-        # Update DynamoDB
-        update_entry(table, entry_id, image_url, place_data, dry_run=args.dry_run)
-        success_count += 1
-        
-        # Rate limiting (Google Places has limits)
-        if not args.dry_run and i < len(entries):
-            time.sleep(0.1)  # Small delay between requests
+                if status == 'success':
+                    success_count += 1
+                elif status == 'no_match':
+                    skip_count += 1
+                else:
+                    error_count += 1
+                if status != 'error':
+                    checkpoint.record(entry['sk'], status, image_url)
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted - rerun to resume from the checkpoint")
+        raise
+    finally:
+        ctx.close()
+        checkpoint.close()
+    # Every entry got its turn: start the next run afresh so no_match entries are looked up again
+    checkpoint.remove()
+    
+    if ctx.cache:
+        print(f"\n📦 Cache: {ctx.cache.stats.summary()}")
+        stats = ctx.cache.stats
+        paid_searches = stats.get('places', 'miss') + stats.get('places', 'expired')
+    else:
+        paid_searches = success_count
     
     # Summary
     print(f"\n{'='*60}")
@@ -285,9 +615,9 @@ def main():
         print("\n💡 Run without --dry-run to apply changes")
     
     # Cost estimate
-    if success_count > 0 and not args.dry_run:
-        places_cost = success_count * 0.032  # Places search
-        details_cost = success_count * 0.017  # Place details
+    if paid_searches > 0:
+        places_cost = paid_searches * 0.032  # Places search
+        details_cost = paid_searches * 0.017  # Place details
         total_cost = places_cost + details_cost
         print(f"\n💰 Estimated Google API cost: ${total_cost:.2f}")
 
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Export newsletter subscribers as CSV or JSONL.
+
+Pages through the NEWSLETTER partition and writes each page as soon as it
+arrives (see backend/newsletter.py), so memory use does not grow with the
+list. Output goes to stdout, a local file (gzipped when the name ends in .gz
+or with --gzip), or an S3 / S3-compatible bucket via a multipart upload that
+buffers at most one part at a time.
+
+Usage:
+    python scripts/export_newsletter.py > subscribers.csv
+    python scripts/export_newsletter.py --status subscribed --since 2026-01-01 --out subscribers.csv.gz
+    python scripts/export_newsletter.py --format jsonl --out s3://scrumble-exports/newsletter.jsonl.gz
+    python scripts/export_newsletter.py --out s3://exports/list.csv.gz --endpoint-url http://localhost:9000
+    python scripts/export_newsletter.py --sqlite scrumble.db
+"""
+
+import argparse
+import gzip
+import io
+import sys
+
+from local_handler import BACKEND_DIR
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+import newsletter  # noqa: E402
+import storage  # noqa: E402
+
+# S3 multipart parts must be at least 5 MiB (except the last)
+PART_SIZE = 8 * 1024 * 1024
+
+
+class S3Upload(io.RawIOBase):
+    """Write-only stream that uploads to S3 in PART_SIZE multipart chunks."""
+
+    def __init__(self, client, bucket, key, content_type):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.buffer = bytearray()
+        self.parts = []
+        self.upload_id = client.create_multipart_upload(Bucket=bucket, Key=key,
+                                                        ContentType=content_type)["UploadId"]
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer.extend(data)
+        while len(self.buffer) >= PART_SIZE:
+            self._upload(bytes(self.buffer[:PART_SIZE]))
+            del self.buffer[:PART_SIZE]
+        return len(data)
+
+    def _upload(self, body):
+        number = len(self.parts) + 1
+        resp = self.client.upload_part(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+                                       PartNumber=number, Body=body)
+        self.parts.append({"PartNumber": number, "ETag": resp["ETag"]})
+
+    def close(self):
+        if self.closed:
+            return
+        if self.buffer or not self.parts:
+            self._upload(bytes(self.buffer))
+            self.buffer.clear()
+        self.client.complete_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+                                              MultipartUpload={"Parts": self.parts})
+        super().close()
+
+    def abort(self):
+        self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+        super().close()
+
+
+def open_store(args):
+    tables = {**storage.table_names(), storage.DATA: args.table}
+    if args.sqlite:
+        return storage.SqliteStorage(args.sqlite, tables)
+    import boto3
+
+    return storage.DynamoStorage(boto3.resource("dynamodb"), tables)
+
+
+def open_output(args):
+    """(text stream, underlying binary target) for --out"""
+    compress = args.gzip or (args.out or "").endswith(".gz")
+    if not args.out or args.out == "-":
+        raw = sys.stdout.buffer
+    elif args.out.startswith("s3://"):
+        import boto3
+
+        bucket, _, key = args.out[len("s3://"):].partition("/")
+        if not bucket or not key:
+            raise SystemExit(f"Invalid S3 target: {args.out!r} (expected s3://bucket/key)")
+        client = boto3.client("s3", endpoint_url=args.endpoint_url)
+        content_type = "application/gzip" if compress else newsletter.CONTENT_TYPES[args.format]
+        raw = S3Upload(client, bucket, key, content_type)
+    else:
+        raw = open(args.out, "wb")
+    binary = gzip.GzipFile(fileobj=raw, mode="wb") if compress else raw
+    return io.TextIOWrapper(binary, encoding="utf-8", newline="", write_through=True), raw
+
+
+def export(args, since, until):
+    store = open_store(args)
+    out, raw = open_output(args)
+    rows = 0
+    try:
+        out.write(newsletter.encode([], args.format, header=True))
+        for subscribers, _ in newsletter.pages(store, args.status, args.source, since, until,
+                                               page_size=args.page_size):
+            out.write(newsletter.encode(subscribers, args.format))
+            rows += len(subscribers)
+            print(f"  {rows} subscribers", end="\r", file=sys.stderr)
+        print(file=sys.stderr)
+    except BaseException:
+        if isinstance(raw, S3Upload):
+            raw.abort()
+        raise
+    binary = out.detach()
+    if binary is not raw:
+        binary.close()  # writes the gzip trailer; leaves raw open
+    if raw is sys.stdout.buffer:
+        raw.flush()
+    else:
+        raw.close()  # completes the S3 upload
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export newsletter subscribers as CSV or JSONL.")
+    parser.add_argument("--table", default="scrumble-data", help="Data table name.")
+    parser.add_argument("--sqlite", metavar="PATH", help="Export from a local SQLite store instead of DynamoDB.")
+    parser.add_argument("--format", choices=sorted(newsletter.CONTENT_TYPES), default="csv")
+    parser.add_argument("--status", help="Only this status (e.g. subscribed).")
+    parser.add_argument("--source", help="Only this signup source.")
+    parser.add_argument("--since", help="Created at or after this ISO date/time (UTC).")
+    parser.add_argument("--until", help="Created before this ISO date/time (UTC).")
+    parser.add_argument("--out", help="Local path or s3://bucket/key (default: stdout). A .gz suffix gzips.")
+    parser.add_argument("--gzip", action="store_true", help="Gzip the output regardless of its name.")
+    parser.add_argument("--endpoint-url", help="S3-compatible endpoint (MinIO, R2, ...).")
+    parser.add_argument("--page-size", type=int, default=newsletter.PAGE_SIZE, help="Items per Query page.")
+    args = parser.parse_args()
+    try:
+        since, until = newsletter.parse_bound(args.since), newsletter.parse_bound(args.until)
+    except ValueError as e:
+        raise SystemExit(f"Invalid --since/--until: {e}")
+
+    try:
+        rows = export(args, since, until)
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted", file=sys.stderr)
+        sys.exit(130)
+    print(f"✓ Exported {rows} subscribers to {args.out or 'stdout'}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Helpers for invoking backend/app.py in-process with Lambda Function URL events."""
+
+import json
+import os
+import sys
+import time
+import uuid
+from urllib.parse import parse_qsl
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+
+def load_app(table_name=None):
+    """Import backend/app.py (once) with the environment it expects at import time."""
+    os.environ.setdefault("TABLE_NAME", table_name or "scrumble-data")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    import app
+
+    return app
+
+
+def build_event(method, path, query="", headers=None, body=None, source_ip="127.0.0.1"):
+    """Lambda Function URL (payload v2.0) event, shaped like the real thing."""
+    event = {
+        "version": "2.0",
+        "rawPath": path,
+        "rawQueryString": query or "",
+        "headers": {key.lower(): value for key, value in (headers or {}).items()},
+        "requestContext": {
+            "http": {
+                "method": method,
+                "path": path,
+                "protocol": "HTTP/1.1",
+                "sourceIp": source_ip,
+                "userAgent": (headers or {}).get("User-Agent", "scrumble-local"),
+            },
+            "requestId": str(uuid.uuid4()),
+            "timeEpoch": int(time.time() * 1000),
+        },
+        "isBase64Encoded": False,
+    }
+    if query:
+        # Function URLs omit the key entirely when there is no query string.
+        event["queryStringParameters"] = dict(parse_qsl(query, keep_blank_values=True))
+    if body is not None:
+        event["body"] = body if isinstance(body, str) else json.dumps(body)
+    return event
@@ -0,0 +1,887 @@
+#!/usr/bin/env python3
+"""In-memory stand-in for the boto3 DynamoDB resource, with per-call accounting.
+
+Covers the surface backend/app.py uses: ``Table(name)`` with get/put/update/
+delete/query/scan, key-condition, filter, condition and update expressions,
+projections, ``Limit`` and the 1 MB page cap, global secondary indexes that
+share the table's partition key (``add_index``), plus resource-level
+``batch_get_item`` and ``meta.client.transact_write_items``. Items are stored with ``Decimal`` numbers exactly as boto3
+returns them. Every call is counted along with items read, bytes read/written
+and the capacity units DynamoDB would charge, so benchmarks can report what a
+route costs rather than just how long it took.
+
+Errors are raised as ``botocore.exceptions.ClientError`` with the same codes
+DynamoDB uses (``ConditionalCheckFailedException``, ``ValidationException``).
+"""
+
+import bisect
+import math
+import re
+import threading
+from decimal import Decimal
+from functools import lru_cache
+
+from botocore.exceptions import ClientError
+
+PAGE_BYTES = 1024 * 1024
+MISSING = object()
+
+
+class ConditionalCheckFailedException(ClientError):
+    pass
+
+
+def client_error(code, message, operation):
+    error_class = ConditionalCheckFailedException if code == "ConditionalCheckFailedException" else ClientError
+    return error_class({"Error": {"Code": code, "Message": message}}, operation)
+
+
+def attribute_size(value):
+    """Approximate stored size of one attribute value, per DynamoDB's sizing rules."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, (int, Decimal)):
+        digits = len(str(abs(value)).replace(".", "").lstrip("0")) or 1
+        return (digits + 1) // 2 + 1
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return 3 + sum(len(k.encode("utf-8")) + attribute_size(v) + 1 for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return 3 + sum(attribute_size(v) + 1 for v in value)
+    if isinstance(value, (set, frozenset)):
+        return sum(attribute_size(v) for v in value)
+    raise TypeError(f"Unsupported type {type(value).__name__}")
+
+
+def item_size(item):
+    return sum(len(name.encode("utf-8")) + attribute_size(value) for name, value in item.items())
+
+
+def read_units(size_bytes, consistent=False):
+    units = max(1, math.ceil(size_bytes / 4096))
+    return float(units) if consistent else units / 2
+
+
+def write_units(size_bytes):
+    return float(max(1, math.ceil(size_bytes / 1024)))
+
+
+def to_stored(value):
+    """Copy a value into the stored representation (ints become Decimal, like boto3)."""
+    if isinstance(value, bool) or value is None or isinstance(value, (str, Decimal, bytes)):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, float):
+        raise TypeError("Float types are not supported. Use Decimal types instead.")
+    if isinstance(value, dict):
+        return {k: to_stored(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_stored(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return {to_stored(v) for v in value}
+    raise TypeError(f"Unsupported type {type(value).__name__}")
+
+
+def copy_value(value):
+    if isinstance(value, dict):
+        return {k: copy_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [copy_value(v) for v in value]
+    if isinstance(value, set):
+        return set(value)
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Expressions
+# ---------------------------------------------------------------------------
+
+TOKEN_RE = re.compile(r"\s*(?:(<>|<=|>=|[=<>(),+\-])|([#:]?[A-Za-z_][A-Za-z0-9_]*))")
+KEYWORDS = {"AND", "OR", "NOT", "BETWEEN", "IN", "SET", "REMOVE", "ADD", "DELETE"}
+
+
+def tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = TOKEN_RE.match(text, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Unsupported expression syntax near: {text[pos:pos + 20]!r}")
+        op, word = match.groups()
+        if word and word.upper() in KEYWORDS:
+            tokens.append(word.upper())
+        else:
+            tokens.append(op or word)
+        pos = match.end()
+    return tokens
+
+
+class ExpressionParser:
+    """Recursive-descent parser for condition and update expressions."""
+
+    def __init__(self, text, names, values):
+        self.tokens = tokenize(text)
+        self.pos = 0
+        self.names = names or {}
+        self.values = values or {}
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self, expected=None):
+        token = self.peek()
+        if token is None or (expected is not None and token != expected):
+            raise ValueError(f"Expected {expected or 'token'}, got {token!r}")
+        self.pos += 1
+        return token
+
+    def done(self):
+        if self.peek() is not None:
+            raise ValueError(f"Unexpected token {self.peek()!r}")
+
+    def name(self, token):
+        if token.startswith("#"):
+            if token not in self.names:
+                raise ValueError(f"Undefined attribute name {token}")
+            return self.names[token]
+        if token.startswith(":") or token in KEYWORDS:
+            raise ValueError(f"Expected attribute name, got {token}")
+        return token
+
+    def value(self, token):
+        if token not in self.values:
+            raise ValueError(f"Undefined attribute value {token}")
+        return to_stored(self.values[token])
+
+    # Conditions -----------------------------------------------------------
+
+    def condition(self):
+        node = self.conjunction()
+        while self.peek() == "OR":
+            self.take()
+            node = ("or", node, self.conjunction())
+        return node
+
+    def conjunction(self):
+        node = self.negation()
+        while self.peek() == "AND":
+            self.take()
+            node = ("and", node, self.negation())
+        return node
+
+    def negation(self):
+        if self.peek() == "NOT":
+            self.take()
+            return ("not", self.negation())
+        return self.predicate()
+
+    def predicate(self):
+        if self.peek() == "(":
+            self.take()
+            node = self.condition()
+            self.take(")")
+            return node
+        token = self.peek()
+        if token in ("begins_with", "contains", "attribute_exists", "attribute_not_exists"):
+            self.take()
+            return ("func", token, self.arguments())
+        left = self.operand()
+        op = self.peek()
+        if op in ("=", "<>", "<", "<=", ">", ">="):
+            self.take()
+            return ("cmp", op, left, self.operand())
+        if op == "BETWEEN":
+            self.take()
+            low = self.operand()
+            self.take("AND")
+            return ("between", left, low, self.operand())
+        if op == "IN":
+            self.take()
+            return ("in", left, self.arguments())
+        raise ValueError(f"Expected comparison after operand, got {op!r}")
+
+    def arguments(self):
+        self.take("(")
+        args = [self.operand()]
+        while self.peek() == ",":
+            self.take()
+            args.append(self.operand())
+        self.take(")")
+        return args
+
+    def operand(self):
+        token = self.take()
+        if token.startswith(":"):
+            return ("value", self.value(token))
+        if token == "size":
+            return ("size", self.arguments()[0])
+        if token in ("if_not_exists", "list_append"):
+            return ("func", token, self.arguments())
+        return ("path", self.name(token))
+
+    # Updates --------------------------------------------------------------
+
+    def update(self):
+        actions = []
+        while self.peek() is not None:
+            clause = self.take()
+            if clause not in ("SET", "REMOVE", "ADD", "DELETE"):
+                raise ValueError(f"Unexpected update clause {clause!r}")
+            while True:
+                target = self.name(self.take())
+                if clause == "SET":
+                    self.take("=")
+                    value = self.operand()
+                    if self.peek() in ("+", "-"):
+                        op = self.take()
+                        value = ("arith", op, value, self.operand())
+                    actions.append(("SET", target, value))
+                elif clause == "REMOVE":
+                    actions.append(("REMOVE", target, None))
+                else:
+                    actions.append((clause, target, ("value", self.value(self.take()))))
+                if self.peek() != ",":
+                    break
+                self.take()
+        return actions
+
+    def projection(self):
+        attrs = [self.name(self.take())]
+        while self.peek() == ",":
+            self.take()
+            attrs.append(self.name(self.take()))
+        self.done()
+        return attrs
+
+
+def comparable(a, b):
+    if a is MISSING or b is MISSING:
+        return False
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool)
+    numeric = (int, Decimal)
+    if isinstance(a, numeric) and isinstance(b, numeric):
+        return True
+    return type(a) is type(b)
+
+
+def resolve(node, item):
+    kind = node[0]
+    if kind == "value":
+        return node[1]
+    if kind == "path":
+        return item.get(node[1], MISSING)
+    if kind == "size":
+        value = resolve(node[1], item)
+        if value is MISSING:
+            return MISSING
+        if isinstance(value, str):
+            return Decimal(len(value.encode("utf-8")))
+        return Decimal(len(value))
+    if kind == "func" and node[1] == "if_not_exists":
+        current = resolve(node[2][0], item)
+        return resolve(node[2][1], item) if current is MISSING else current
+    if kind == "func" and node[1] == "list_append":
+        first, second = (resolve(arg, item) for arg in node[2])
+        if not isinstance(first, list) or not isinstance(second, list):
+            raise ValueError("list_append operands must be lists")
+        return first + second
+    if kind == "arith":
+        left, right = resolve(node[2], item), resolve(node[3], item)
+        if not isinstance(left, Decimal) or not isinstance(right, Decimal):
+            raise ValueError("Arithmetic operands must be numbers")
+        return left + right if node[1] == "+" else left - right
+    raise ValueError(f"Cannot use {kind} as an operand")
+
+
+def evaluate(node, item):
+    kind = node[0]
+    if kind == "and":
+        return evaluate(node[1], item) and evaluate(node[2], item)
+    if kind == "or":
+        return evaluate(node[1], item) or evaluate(node[2], item)
+    if kind == "not":
+        return not evaluate(node[1], item)
+    if kind == "cmp":
+        op = node[1]
+        left, right = resolve(node[2], item), resolve(node[3], item)
+        if op == "<>":
+            return left is not MISSING and (not comparable(left, right) or left != right)
+        if not comparable(left, right):
+            return False
+        if op == "=":
+            return left == right
+        return {"<": left < right, "<=": left <= right, ">": left > right, ">=": left >= right}[op]
+    if kind == "between":
+        value, low, high = (resolve(n, item) for n in node[1:])
+        return comparable(value, low) and comparable(value, high) and low <= value <= high
+    if kind == "in":
+        value = resolve(node[1], item)
+        return any(comparable(value, resolve(arg, item)) and value == resolve(arg, item) for arg in node[2])
+    if kind == "func":
+        name, args = node[1], node[2]
+        if name == "attribute_exists":
+            return resolve(args[0], item) is not MISSING
+        if name == "attribute_not_exists":
+            return resolve(args[0], item) is MISSING
+        if name == "begins_with":
+            value, prefix = resolve(args[0], item), resolve(args[1], item)
+            return isinstance(value, str) and isinstance(prefix, str) and value.startswith(prefix)
+        if name == "contains":
+            value, member = resolve(args[0], item), resolve(args[1], item)
+            if isinstance(value, str):
+                return isinstance(member, str) and member in value
+            return value is not MISSING and isinstance(value, (list, set)) and member in value
+    raise ValueError(f"Unsupported condition node {kind}")
+
+
+def parse_condition(text, names, values):
+    parser = ExpressionParser(text, names, values)
+    node = parser.condition()
+    parser.done()
+    return node
+
+
+def apply_update(item, actions):
+    """Apply parsed update actions in place; returns the set of touched attribute names."""
+    touched = set()
+    snapshot = dict(item)
+    for action, target, operand in actions:
+        touched.add(target)
+        if action == "SET":
+            item[target] = resolve(operand, snapshot)
+        elif action == "REMOVE":
+            item.pop(target, None)
+        elif action == "ADD":
+            value = operand[1]
+            current = item.get(target, MISSING)
+            if isinstance(value, Decimal):
+                if current is not MISSING and not isinstance(current, Decimal):
+                    raise ValueError(f"ADD on non-numeric attribute {target}")
+                item[target] = (Decimal(0) if current is MISSING else current) + value
+            elif isinstance(value, set):
+                item[target] = (set() if current is MISSING else set(current)) | value
+            else:
+                raise ValueError("ADD only supports numbers and sets")
+        elif action == "DELETE":
+            current = item.get(target, MISSING)
+            if isinstance(current, set):
+                remaining = current - operand[1]
+                if remaining:
+                    item[target] = remaining
+                else:
+                    item.pop(target)
+    return touched
+
+
+# ---------------------------------------------------------------------------
+# Accounting
+# ---------------------------------------------------------------------------
+
+class CallStats:
+    """Thread-safe per-operation counters."""
+
+    FIELDS = ("calls", "items_read", "read_bytes", "read_units", "items_written", "write_bytes", "write_units")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_op = {}
+
+    def record(self, op, **counts):
+        with self._lock:
+            bucket = self.by_op.setdefault(op, dict.fromkeys(self.FIELDS, 0))
+            bucket["calls"] += 1
+            for field, value in counts.items():
+                bucket[field] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {op: dict(bucket) for op, bucket in self.by_op.items()}
+
+    def totals(self, snapshot=None):
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        total = dict.fromkeys(self.FIELDS, 0)
+        for bucket in snapshot.values():
+            for field in self.FIELDS:
+                total[field] += bucket[field]
+        return total
+
+    @staticmethod
+    def diff(after, before):
+        """Per-operation difference between two snapshots."""
+        result = {}
+        for op, bucket in after.items():
+            prior = before.get(op, {})
+            delta = {field: bucket[field] - prior.get(field, 0) for field in CallStats.FIELDS}
+            if delta["calls"]:
+                result[op] = delta
+        return result
+
+    def reset(self):
+        with self._lock:
+            self.by_op.clear()
+
+
+# ---------------------------------------------------------------------------
+# Tables
+# ---------------------------------------------------------------------------
+
+class Partition:
+    """Items for one partition key, with lazily sorted sort keys."""
+
+    __slots__ = ("items", "keys", "dirty")
+
+    def __init__(self):
+        self.items = {}
+        self.keys = []
+        self.dirty = False
+
+    def put(self, sort_key, item):
+        if sort_key not in self.items:
+            if self.keys and not self.dirty and sort_key < self.keys[-1]:
+                self.dirty = True
+            self.keys.append(sort_key)
+        self.items[sort_key] = item
+
+    def delete(self, sort_key):
+        if self.items.pop(sort_key, None) is not None:
+            self.keys.remove(sort_key)
+
+    def sorted_keys(self):
+        if self.dirty:
+            self.keys.sort()
+            self.dirty = False
+        return self.keys
+
+
+@lru_cache(maxsize=256)
+def projection_attrs(expression, names):
+    """Attribute names in a ProjectionExpression (parsed once per distinct expression)."""
+    return ExpressionParser(expression, dict(names), {}).projection()
+
+
+class MemoryTable:
+    """Subset of ``boto3.resource('dynamodb').Table`` backed by dicts."""
+
+    def __init__(self, resource, name, hash_key="pk", range_key="sk"):
+        self.resource = resource
+        self.name = name
+        self.table_name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.partitions = {}
+        self.indexes = {}
+        self._lock = threading.RLock()
+
+    def add_index(self, name, hash_key, range_key):
+        """Register a GSI (ALL projection); only indexes on the table's hash key are supported."""
+        if hash_key != self.hash_key:
+            raise ValueError("Indexes must share the table's partition key")
+        self.indexes[name] = range_key
+
+    @property
+    def meta(self):
+        return self.resource.meta
+
+    @property
+    def stats(self):
+        return self.resource.stats
+
+    def __len__(self):
+        return sum(len(p.items) for p in self.partitions.values())
+
+    def _key(self, key, operation):
+        try:
+            hash_value = key[self.hash_key]
+            range_value = key[self.range_key]
+        except KeyError:
+            raise client_error("ValidationException",
+                               "The provided key element does not match the schema", operation) from None
+        return hash_value, range_value
+
+    def _get(self, hash_value, range_value):
+        partition = self.partitions.get(hash_value)
+        return partition.items.get(range_value) if partition else None
+
+    def _check(self, current, kwargs, operation):
+        condition = kwargs.get("ConditionExpression")
+        if not condition:
+            return
+        try:
+            node = parse_condition(condition, kwargs.get("ExpressionAttributeNames"),
+                                   kwargs.get("ExpressionAttributeValues"))
+        except ValueError as exc:
+            raise client_error("ValidationException", str(exc), operation) from None
+        if not evaluate(node, current or {}):
+            raise client_error("ConditionalCheckFailedException", "The conditional request failed", operation)
+
+    def _project(self, item, kwargs):
+        expression = kwargs.get("ProjectionExpression")
+        if not expression:
+            return copy_value(item)
+        names = kwargs.get("ExpressionAttributeNames") or {}
+        attrs = projection_attrs(expression, tuple(sorted(names.items())))
+        return {name: copy_value(item[name]) for name in attrs if name in item}
+
+    def load(self, items):
+        """Bulk insert without accounting (for seeding)."""
+        with self._lock:
+            for item in items:
+                stored = to_stored(item)
+                hash_value, range_value = stored[self.hash_key], stored[self.range_key]
+                partition = self.partitions.get(hash_value)
+                if partition is None:
+                    partition = self.partitions[hash_value] = Partition()
+                partition.put(range_value, stored)
+
+    # Single-item operations ---------------------------------------------------
+
+    def get_item(self, Key, ConsistentRead=False, **kwargs):
+        with self._lock:
+            item = self._get(*self._key(Key, "GetItem"))
+            size = item_size(item) if item else 0
+            self.stats.record("GetItem", items_read=1 if item else 0, read_bytes=size,
+                              read_units=read_units(size, ConsistentRead))
+            return {"Item": self._project(item, kwargs)} if item else {}
+
+    def put_item(self, Item, ReturnValues="NONE", _record=True, **kwargs):
+        stored = to_stored(Item)
+        with self._lock:
+            hash_value, range_value = self._key(stored, "PutItem")
+            current = self._get(hash_value, range_value)
+            self._check(current, kwargs, "PutItem")
+            size = max(item_size(stored), item_size(current) if current else 0)
+            partition = self.partitions.get(hash_value)
+            if partition is None:
+                partition = self.partitions[hash_value] = Partition()
+            partition.put(range_value, stored)
+            if _record:
+                self.stats.record("PutItem", items_written=1, write_bytes=item_size(stored),
+                                  write_units=write_units(size))
+            if ReturnValues == "ALL_OLD" and current:
+                return {"Attributes": copy_value(current)}
+            return {}
+
+    def update_item(self, Key, UpdateExpression, ReturnValues="NONE", _record=True, **kwargs):
+        with self._lock:
+            hash_value, range_value = self._key(Key, "UpdateItem")
+            current = self._get(hash_value, range_value)
+            self._check(current, kwargs, "UpdateItem")
+            try:
+                actions = ExpressionParser(UpdateExpression, kwargs.get("ExpressionAttributeNames"),
+                                           kwargs.get("ExpressionAttributeValues")).update()
+                if any(target in (self.hash_key, self.range_key) for _, target, _ in actions):
+                    raise ValueError("Cannot update attribute that is part of the key")
+                updated = copy_value(current) if current else {self.hash_key: hash_value, self.range_key: range_value}
+                touched = apply_update(updated, actions)
+            except ValueError as exc:
+                raise client_error("ValidationException", str(exc), "UpdateItem") from None
+            partition = self.partitions.get(hash_value)
+            if partition is None:
+                partition = self.partitions[hash_value] = Partition()
+            partition.put(range_value, updated)
+            size = max(item_size(updated), item_size(current) if current else 0)
+            if _record:
+                self.stats.record("UpdateItem", items_written=1, write_bytes=item_size(updated),
+                                  write_units=write_units(size))
+            if ReturnValues == "ALL_NEW":
+                return {"Attributes": copy_value(updated)}
+            if ReturnValues == "ALL_OLD":
+                return {"Attributes": copy_value(current)} if current else {}
+            if ReturnValues == "UPDATED_NEW":
+                return {"Attributes": {k: copy_value(updated[k]) for k in touched if k in updated}}
+            if ReturnValues == "UPDATED_OLD":
+                return {"Attributes": {k: copy_value(current[k]) for k in touched if current and k in current}}
+            return {}
+
+    def delete_item(self, Key, ReturnValues="NONE", _record=True, **kwargs):
+        with self._lock:
+            hash_value, range_value = self._key(Key, "DeleteItem")
+            current = self._get(hash_value, range_value)
+            self._check(current, kwargs, "DeleteItem")
+            if current:
+                self.partitions[hash_value].delete(range_value)
+            size = item_size(current) if current else 0
+            if _record:
+                self.stats.record("DeleteItem", items_written=1 if current else 0, write_bytes=size,
+                                  write_units=write_units(size))
+            if ReturnValues == "ALL_OLD" and current:
+                return {"Attributes": current}
+            return {}
+
+    # Multi-item operations ----------------------------------------------------
+
+    def _key_range(self, node, range_key=None):
+        """Partition value and sort-key bounds from a parsed key condition."""
+        range_key = range_key or self.range_key
+        hash_value = MISSING
+        low, high, prefix = None, None, None
+        clauses = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current[0] == "and":
+                stack.extend(current[1:])
+            else:
+                clauses.append(current)
+        for clause in clauses:
+            if clause[0] == "cmp" and clause[2] == ("path", self.hash_key) and clause[1] == "=":
+                hash_value = clause[3][1]
+            elif clause[0] == "cmp" and clause[2] == ("path", range_key):
+                op, value = clause[1], clause[3][1]
+                if op in ("=", ">=", ">"):
+                    low = value
+                if op in ("=", "<=", "<"):
+                    high = value
+            elif clause[0] == "between" and clause[1] == ("path", range_key):
+                low, high = clause[2][1], clause[3][1]
+            elif clause[0] == "func" and clause[1] == "begins_with" and clause[2][0] == ("path", range_key):
+                prefix = clause[2][1][1]
+            else:
+                raise ValueError("Unsupported key condition")
+        if hash_value is MISSING:
+            raise ValueError("Query condition missed key schema element: " + self.hash_key)
+        return hash_value, low, high, prefix
+
+    def _index_candidates(self, partition, range_key, low, high, prefix, forward, start_key):
+        """Sort keys of items carrying ``range_key``, in index order (range value, then table sort key)."""
+        entries = sorted((item[range_key], sort_key) for sort_key, item in partition.items.items()
+                         if range_key in item) if partition else []
+        entries = [entry for entry in entries
+                   if (low is None or entry[0] >= low) and (high is None or entry[0] <= high)
+                   and (prefix is None or str(entry[0]).startswith(prefix))]
+        if not forward:
+            entries.reverse()
+        if start_key:
+            marker = (start_key[range_key], start_key[self.range_key])
+            entries = [entry for entry in entries if (entry > marker if forward else entry < marker)]
+        return [sort_key for _, sort_key in entries]
+
+    def query(self, KeyConditionExpression, ScanIndexForward=True, Limit=None, ExclusiveStartKey=None,
+              ConsistentRead=False, Select=None, IndexName=None, **kwargs):
+        names = kwargs.get("ExpressionAttributeNames")
+        values = kwargs.get("ExpressionAttributeValues")
+        if IndexName is not None and IndexName not in self.indexes:
+            raise client_error("ValidationException",
+                               "The table does not have the specified index: " + IndexName, "Query")
+        index_key = self.indexes.get(IndexName)
+        try:
+            key_node = parse_condition(KeyConditionExpression, names, values)
+            hash_value, low, high, prefix = self._key_range(key_node, index_key)
+            filter_node = (parse_condition(kwargs["FilterExpression"], names, values)
+                           if kwargs.get("FilterExpression") else None)
+        except ValueError as exc:
+            raise client_error("ValidationException", str(exc), "Query") from None
+
+        with self._lock:
+            partition = self.partitions.get(hash_value)
+            if index_key is not None:
+                candidates = self._index_candidates(partition, index_key, low, high, prefix, ScanIndexForward,
+                                                    ExclusiveStartKey)
+                return self._query_page(partition, hash_value, candidates, key_node, filter_node, Limit,
+                                        ConsistentRead, Select, kwargs, index_key)
+            keys = partition.sorted_keys() if partition else []
+            start = 0 if low is None and prefix is None else bisect.bisect_left(keys, low if prefix is None else prefix)
+            stop = len(keys) if high is None else bisect.bisect_right(keys, high)
+            candidates = keys[start:stop]
+            if prefix is not None:
+                end = bisect.bisect_left(candidates, prefix + "\uffff")
+                candidates = candidates[:end]
+            if not ScanIndexForward:
+                candidates = candidates[::-1]
+            if ExclusiveStartKey:
+                marker = ExclusiveStartKey[self.range_key]
+                if ScanIndexForward:
+                    candidates = candidates[bisect.bisect_right(candidates, marker):]
+                else:
+                    candidates = [k for k in candidates if k < marker]
+            return self._query_page(partition, hash_value, candidates, key_node, filter_node, Limit,
+                                    ConsistentRead, Select, kwargs)
+
+    def _query_page(self, partition, hash_value, candidates, key_node, filter_node, Limit, ConsistentRead,
+                    Select, kwargs, index_key=None):
+        """One Query page over ``candidates`` (sort keys in read order)."""
+        items, scanned_bytes, scanned = [], 0, 0
+        last_key = None
+        for sort_key in candidates:
+            if Limit is not None and scanned >= Limit:
+                break
+            if scanned_bytes >= PAGE_BYTES:
+                break
+            item = partition.items[sort_key]
+            key_match = evaluate(key_node, item)
+            scanned += 1
+            scanned_bytes += item_size(item)
+            last_key = sort_key
+            if key_match and (filter_node is None or evaluate(filter_node, item)):
+                items.append(item)
+        more = last_key is not None and last_key != (candidates[-1] if candidates else None)
+
+        self.stats.record("Query", items_read=scanned, read_bytes=scanned_bytes,
+                          read_units=read_units(scanned_bytes, ConsistentRead) if scanned else 0.5)
+        response = {"Count": len(items), "ScannedCount": scanned}
+        if Select != "COUNT":
+            response["Items"] = [self._project(item, kwargs) for item in items]
+        if more:
+            response["LastEvaluatedKey"] = {self.hash_key: hash_value, self.range_key: last_key}
+            if index_key is not None:
+                response["LastEvaluatedKey"][index_key] = partition.items[last_key][index_key]
+        return response
+
+    def scan(self, Limit=None, ExclusiveStartKey=None, ConsistentRead=False, **kwargs):
+        names = kwargs.get("ExpressionAttributeNames")
+        values = kwargs.get("ExpressionAttributeValues")
+        try:
+            filter_node = (parse_condition(kwargs["FilterExpression"], names, values)
+                           if kwargs.get("FilterExpression") else None)
+        except ValueError as exc:
+            raise client_error("ValidationException", str(exc), "Scan") from None
+        with self._lock:
+            ordered = [(h, s) for h in sorted(self.partitions, key=str)
+                       for s in self.partitions[h].sorted_keys()]
+            if ExclusiveStartKey:
+                marker = (ExclusiveStartKey[self.hash_key], ExclusiveStartKey[self.range_key])
+                ordered = ordered[ordered.index(marker) + 1:] if marker in ordered else []
+            items, scanned, scanned_bytes, last = [], 0, 0, None
+            for hash_value, sort_key in ordered:
+                if (Limit is not None and scanned >= Limit) or scanned_bytes >= PAGE_BYTES:
+                    break
+                item = self.partitions[hash_value].items[sort_key]
+                scanned += 1
+                scanned_bytes += item_size(item)
+                last = (hash_value, sort_key)
+                if filter_node is None or evaluate(filter_node, item):
+                    items.append(self._project(item, kwargs))
+            self.stats.record("Scan", items_read=scanned, read_bytes=scanned_bytes,
+                              read_units=read_units(scanned_bytes, ConsistentRead) if scanned else 0.5)
+            response = {"Items": items, "Count": len(items), "ScannedCount": scanned}
+            if last is not None and ordered and last != ordered[-1]:
+                response["LastEvaluatedKey"] = {self.hash_key: last[0], self.range_key: last[1]}
+            return response
+
+
+class _Exceptions:
+    ConditionalCheckFailedException = ConditionalCheckFailedException
+    ClientError = ClientError
+
+
+class _Client:
+    exceptions = _Exceptions()
+
+    def __init__(self, resource):
+        self.resource = resource
+
+    def transact_write_items(self, TransactItems, **kwargs):
+        return self.resource.transact_write_items(TransactItems, **kwargs)
+
+
+class _Meta:
+    def __init__(self, resource):
+        self.client = _Client(resource)
+
+
+class MemoryDynamo:
+    """Stand-in for ``boto3.resource('dynamodb')``; tables are created on first use."""
+
+    def __init__(self):
+        self.tables = {}
+        self.stats = CallStats()
+        self.meta = _Meta(self)
+        self._lock = threading.Lock()
+
+    def Table(self, name):
+        with self._lock:
+            table = self.tables.get(name)
+            if table is None:
+                table = self.tables[name] = MemoryTable(self, name)
+            return table
+
+    def batch_get_item(self, RequestItems, **kwargs):
+        if sum(len(spec["Keys"]) for spec in RequestItems.values()) > 100:
+            raise client_error("ValidationException", "Too many items requested for the BatchGetItem call",
+                               "BatchGetItem")
+        responses = {}
+        total_bytes = 0
+        units = 0
+        found = 0
+        for name, spec in RequestItems.items():
+            table = self.Table(name)
+            with table._lock:
+                results = responses.setdefault(name, [])
+                for key in spec["Keys"]:
+                    item = table._get(*table._key(key, "BatchGetItem"))
+                    if item:
+                        # Capacity is charged on the whole item, not the projection.
+                        size = item_size(item)
+                        found += 1
+                        total_bytes += size
+                        units += read_units(size)
+                        results.append(table._project(item, spec))
+        self.stats.record("BatchGetItem", items_read=found, read_bytes=total_bytes, read_units=units)
+        return {"Responses": responses, "UnprocessedKeys": {}}
+
+    def transact_write_items(self, TransactItems, **kwargs):
+        """All-or-nothing writes; capacity is charged at twice the single-item rate, as DynamoDB does."""
+        if len(TransactItems) > 100:
+            raise client_error("ValidationException", "Member must have length less than or equal to 100",
+                               "TransactWriteItems")
+        ops = []
+        seen = set()
+        for entry in TransactItems:
+            (action, spec), = entry.items()
+            table = self.Table(spec["TableName"])
+            key = table._key(spec["Item"] if action == "Put" else spec["Key"], "TransactWriteItems")
+            if (table.name, key) in seen:
+                raise client_error("ValidationException",
+                                   "Transaction request cannot include multiple operations on one item",
+                                   "TransactWriteItems")
+            seen.add((table.name, key))
+            ops.append((action, spec, table, key))
+
+        tables = sorted({table.name: table for _, _, table, _ in ops}.values(), key=lambda t: t.name)
+        for table in tables:
+            table._lock.acquire()
+        try:
+            reasons, before = [], []
+            for action, spec, table, key in ops:
+                current = table._get(*key)
+                before.append(item_size(current) if current else 0)
+                try:
+                    table._check(current, spec, "TransactWriteItems")
+                    reasons.append({"Code": "None"})
+                except ConditionalCheckFailedException:
+                    reasons.append({"Code": "ConditionalCheckFailed", "Message": "The conditional request failed"})
+            if any(reason["Code"] != "None" for reason in reasons):
+                codes = ", ".join(reason["Code"] for reason in reasons)
+                raise ClientError({"Error": {"Code": "TransactionCanceledException",
+                                             "Message": f"Transaction cancelled [{codes}]"},
+                                   "CancellationReasons": reasons}, "TransactWriteItems")
+
+            units, check_units, written, written_bytes = 0, 0, 0, 0
+            for (action, spec, table, key), size_before in zip(ops, before):
+                params = {k: v for k, v in spec.items() if k not in ("TableName", "ConditionExpression")}
+                if action == "Put":
+                    table.put_item(_record=False, **params)
+                elif action == "Update":
+                    table.update_item(_record=False, **params)
+                elif action == "Delete":
+                    table.delete_item(_record=False, **params)
+                else:
+                    check_units += 2 * read_units(size_before, consistent=True)
+                    continue
+                current = table._get(*key)
+                size_after = item_size(current) if current else 0
+                written += 1
+                written_bytes += size_after
+                units += 2 * write_units(max(size_before, size_after))
+            self.stats.record("TransactWriteItems", items_written=written, write_bytes=written_bytes,
+                              write_units=units, read_units=check_units)
+            return {}
+        finally:
+            for table in reversed(tables):
+                table._lock.release()
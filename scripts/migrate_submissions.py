@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Move SUBMISSION rows into the status-partitioned submission queue.
+
+Submissions used to share one SUBMISSION partition keyed by timestamp. They now
+live under SUBMISSION#<status>, with a SUBMISSION_FINGERPRINT item per distinct
+(left, right, category) suggestion (see backend/submissions.py). This moves
+every legacy row to its status partition. The oldest row of each suggestion
+owns the fingerprint. Later pending repeats are folded into its
+``duplicate_count`` and removed. Reviewed repeats keep their own rows so their
+decisions are not lost. Rows are removed from SUBMISSION as they move, so an
+interrupted run can simply be run again.
+
+Usage:
+    python scripts/migrate_submissions.py                        # scrumble-data
+    python scripts/migrate_submissions.py --dry-run
+    python scripts/migrate_submissions.py --sqlite scrumble.db
+"""
+
+import argparse
+import sys
+from collections import defaultdict
+
+from local_handler import BACKEND_DIR
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+import storage  # noqa: E402
+import submissions  # noqa: E402
+
+LEGACY_PK = "SUBMISSION"
+
+
+def open_store(args):
+    tables = {**storage.table_names(), storage.DATA: args.table}
+    if args.sqlite:
+        return storage.SqliteStorage(args.sqlite, tables)
+    import boto3
+
+    return storage.DynamoStorage(boto3.resource("dynamodb"), tables)
+
+
+def migrate(args):
+    store = open_store(args)
+    legacy, _ = store.query(storage.DATA, LEGACY_PK)
+    groups = defaultdict(list)
+    for item in legacy:
+        groups[submissions.fingerprint(item.get("left_name"), item.get("right_name"), item.get("category"))].append(item)
+    owners = store.batch_get(storage.DATA, [(submissions.FINGERPRINT_PK, fp) for fp in groups])
+
+    moved = folded = 0
+    for fp, group in groups.items():
+        group.sort(key=lambda item: item["sk"])
+        owner = owners.get((submissions.FINGERPRINT_PK, fp))
+        canonical, rest = (None, group) if owner else (group[0], group[1:])
+        repeats = [item for item in rest if item.get("status", "pending") == "pending"]
+        extra = sum(1 + int(item.get("duplicate_count", 0)) for item in repeats)
+        folded += len(repeats)
+        moved += len(group) - len(repeats)
+        if args.dry_run:
+            continue
+
+        if canonical:
+            status = canonical.get("status", "pending")
+            row = {**canonical, "pk": submissions.status_pk(status), "status": status, "fingerprint": fp,
+                   "created_at": canonical.get("created_at") or canonical["sk"],
+                   "duplicate_count": int(canonical.get("duplicate_count", 0)) + extra}
+            if repeats:
+                row["last_submitted_at"] = repeats[-1]["sk"]
+            store.transact([
+                storage.put_op(storage.DATA, {"pk": submissions.FINGERPRINT_PK, "sk": fp, "status": status,
+                                              "created_at": canonical["sk"]}, if_absent=True),
+                storage.put_op(storage.DATA, row),
+                storage.delete_op(storage.DATA, LEGACY_PK, canonical["sk"]),
+            ])
+        elif extra:
+            store.update(storage.DATA, submissions.status_pk(owner["status"]), owner["created_at"],
+                         add={"duplicate_count": extra}, set={"last_submitted_at": repeats[-1]["sk"]})
+        for item in rest:
+            if item in repeats:
+                store.delete(storage.DATA, LEGACY_PK, item["sk"])
+                continue
+            status = item.get("status", "pending")
+            store.transact([
+                storage.put_op(storage.DATA, {**item, "pk": submissions.status_pk(status), "status": status}),
+                storage.delete_op(storage.DATA, LEGACY_PK, item["sk"]),
+            ])
+    return len(legacy), len(groups), moved, folded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move legacy submissions into per-status partitions.")
+    parser.add_argument("--table", default="scrumble-data", help="Data table name.")
+    parser.add_argument("--sqlite", metavar="PATH", help="Migrate a local SQLite store instead of DynamoDB.")
+    parser.add_argument("--dry-run", action="store_true", help="Count what would move; write nothing.")
+    args = parser.parse_args()
+
+    try:
+        total, distinct, moved, folded = migrate(args)
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted", file=sys.stderr)
+        sys.exit(130)
+    verb = "would move" if args.dry_run else "moved"
+    print(f"✓ {total} legacy submissions ({distinct} distinct): {verb} {moved}, folded {folded} duplicates")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+On-disk cache for Google Places lookups and photo downloads.
+
+Place search results live in a SQLite index keyed by the normalized query;
+photo bytes are stored content-addressed under ``blobs/<sha[:2]>/<sha>`` and
+indexed by photo resource name and requested width. Entries expire after a
+per-kind TTL. Negative lookups ("no results", "no photos") are cached too so
+re-runs do not pay for them again; request errors are never cached.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+DEFAULT_CACHE_DIR = '.enrich-cache'
+DAY_SECONDS = 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    query_key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    response TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS photos (
+    photo_key TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+def normalize_query(query):
+    """Case, accent, punctuation and whitespace-insensitive form of a search query"""
+    text = unicodedata.normalize('NFKD', query)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"[^\w\s&]", ' ', text.lower())
+    return ' '.join(text.split())
+
+class CacheStats:
+    """Thread-safe hit/miss/expired counters per cache kind"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def record(self, kind, outcome):
+        with self._lock:
+            bucket = self.counts.setdefault(kind, {'hit': 0, 'miss': 0, 'expired': 0})
+            bucket[outcome] += 1
+
+    def get(self, kind, outcome):
+        return self.counts.get(kind, {}).get(outcome, 0)
+
+    def summary(self):
+        parts = []
+        for kind in sorted(self.counts):
+            bucket = self.counts[kind]
+            lookups = bucket['hit'] + bucket['miss'] + bucket['expired']
+            rate = (bucket['hit'] / lookups * 100) if lookups else 0
+            parts.append(f"{kind} {bucket['hit']}/{lookups} hits ({rate:.0f}%), {bucket['expired']} expired")
+        return '; '.join(parts) or 'no lookups'
+
+class PlacesCache:
+    """SQLite index plus blob directory, safe to share between threads"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, places_ttl_days=30, photo_ttl_days=90, refresh=False):
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, 'blobs')
+        self.places_ttl = places_ttl_days * DAY_SECONDS
+        self.photo_ttl = photo_ttl_days * DAY_SECONDS
+        self.refresh = refresh
+        self.stats = CacheStats()
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, 'cache.sqlite'), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _fresh(self, kind, fetched_at, ttl):
+        if self.refresh:
+            self.stats.record(kind, 'miss')
+            return False
+        if ttl > 0 and time.time() - fetched_at > ttl:
+            self.stats.record(kind, 'expired')
+            return False
+        self.stats.record(kind, 'hit')
+        return True
+
+    def get_place(self, query):
+        """Return (hit, place_data); place_data is None for a cached negative result"""
+        key = normalize_query(query)
+        with self._lock:
+            row = self._db.execute(
+                'SELECT response, fetched_at FROM places WHERE query_key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            self.stats.record('places', 'miss')
+            return False, None
+        if not self._fresh('places', row[1], self.places_ttl):
+            return False, None
+        return True, json.loads(row[0]) if row[0] is not None else None
+
+    def put_place(self, query, place_data):
+        response = json.dumps(place_data) if place_data is not None else None
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO places (query_key, query, response, fetched_at) VALUES (?, ?, ?, ?)',
+                (normalize_query(query), query, response, time.time())
+            )
+
+    def _blob_path(self, sha):
+        return os.path.join(self.blob_dir, sha[:2], sha)
+
+    def get_photo(self, photo_name, max_width):
+        """Return cached photo bytes or None"""
+        key = f"{photo_name}@{max_width}"
+        with self._lock:
+            row = self._db.execute(
+                'SELECT sha256, fetched_at FROM photos WHERE photo_key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            self.stats.record('photos', 'miss')
+            return None
+        path = self._blob_path(row[0])
+        if not os.path.exists(path):
+            self.stats.record('photos', 'miss')
+            return None
+        if not self._fresh('photos', row[1], self.photo_ttl):
+            return None
+        with open(path, 'rb') as handle:
+            return handle.read()
+
+    def put_photo(self, photo_name, max_width, data):
+        sha = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as handle:
+                handle.write(data)
+            os.replace(tmp_path, path)
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO photos (photo_key, sha256, size, fetched_at) VALUES (?, ?, ?, ?)',
+                (f"{photo_name}@{max_width}", sha, len(data), time.time())
+            )
+        return sha
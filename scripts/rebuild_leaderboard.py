@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Recompute the entry leaderboard from matchup history.
+
+backend/app.py folds each matchup into the LEADERBOARD#<scope> standings as it
+is archived. This replays every ended matchup with votes, in end order, and
+rewrites the standings and LEADERBOARD_APPLIED markers to match: use it to seed
+the leaderboard, after changing the rating rules, or after editing results.
+Archiving that runs at the same time can be lost, so run it between scheduled
+archive runs.
+
+Usage:
+    python scripts/rebuild_leaderboard.py                        # scrumble-data
+    python scripts/rebuild_leaderboard.py --dry-run
+    python scripts/rebuild_leaderboard.py --sqlite scrumble.db
+"""
+
+import argparse
+import sys
+from datetime import datetime, timezone
+
+from local_handler import BACKEND_DIR
+from seed_common import seed_items
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+import leaderboard  # noqa: E402
+import storage  # noqa: E402
+
+
+def parse_time(value):
+    try:
+        parsed = datetime.fromisoformat((value or "").replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def open_store(args):
+    tables = {**storage.table_names(), storage.DATA: args.table}
+    if args.sqlite:
+        return storage.SqliteStorage(args.sqlite, tables)
+    import boto3
+
+    return storage.DynamoStorage(boto3.resource("dynamodb"), tables)
+
+
+def rebuild(args):
+    store = open_store(args)
+    now = datetime.now(timezone.utc)
+    matchups, _ = store.query(storage.DATA, "MATCHUP")
+    ended = [m for m in matchups if m["sk"] != "ACTIVE" and (parse_time(m.get("ends_at")) or now) < now]
+    totals = store.batch_get(storage.DATA, [(f"VOTES#{m['id']}", "TOTAL") for m in ended], attributes=["left", "right"])
+    entry_ids = {entry_id for m in ended for entry_id in (m["left_entry_id"], m["right_entry_id"])}
+    entries = store.batch_get(storage.DATA, [("ENTRY", entry_id) for entry_id in entry_ids], attributes=["name"])
+
+    standings, applied = leaderboard.rebuild(
+        ended,
+        {m["id"]: totals.get((f"VOTES#{m['id']}", "TOTAL")) for m in ended},
+        {sk: item.get("name", "") for (_, sk), item in entries.items()},
+    )
+    print(f"  {len(ended)} ended matchups, {len(applied)} with results, {len(standings)} standings")
+
+    # Anything on the boards (or marked applied) that the replay did not produce is stale.
+    keep = {(item["pk"], item["sk"]) for item in standings + applied}
+    scopes = {leaderboard.ALL} | {m.get("category") for m in ended if m.get("category")}
+    stale = []
+    for pk in [leaderboard.board_pk(scope) for scope in scopes] + [leaderboard.APPLIED_PK]:
+        existing, _ = store.query(storage.DATA, pk, attributes=["pk"])
+        stale.extend((item["pk"], item["sk"]) for item in existing if (item["pk"], item["sk"]) not in keep)
+
+    if args.dry_run:
+        top = sorted((s for s in standings if s["pk"] == leaderboard.board_pk(leaderboard.ALL)),
+                     key=lambda s: -s["elo"])[:10]
+        for n, standing in enumerate(top, 1):
+            payload = leaderboard.standing_payload(standing)
+            print(f"  {n:>2}. {payload['name'] or payload['entry_id']}  {payload['rating']}  "
+                  f"{payload['wins']}-{payload['losses']}-{payload['ties']}")
+        return len(standings) + len(applied), len(stale)
+
+    written, _ = seed_items(args.table, standings + applied, workers=args.workers, full=True,
+                            max_rate=args.max_rate, sqlite_path=args.sqlite)
+    for pk, sk in stale:
+        store.delete(storage.DATA, pk, sk)
+    return written, len(stale)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute entry standings and ratings from matchup history.")
+    parser.add_argument("--table", default="scrumble-data", help="Data table name.")
+    parser.add_argument("--sqlite", metavar="PATH", help="Rebuild a local SQLite store instead of DynamoDB.")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent batch writers.")
+    parser.add_argument("--max-rate", type=float, help="WCU/s limit for the writes.")
+    parser.add_argument("--dry-run", action="store_true", help="Compute and print the top 10; write nothing.")
+    args = parser.parse_args()
+
+    try:
+        written, removed = rebuild(args)
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted", file=sys.stderr)
+        sys.exit(130)
+    verb = "would write" if args.dry_run else "wrote"
+    print(f"✓ {verb} {written} leaderboard items, {'would remove' if args.dry_run else 'removed'} {removed} stale")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Replay production traffic reconstructed from the backend's structured logs.
+
+The handler logs a "Request received" line (path, method, query, timestamp)
+and a "Request completed" line (latency_ms) per request, joined by
+correlation_id. This tool pairs them up, replays the requests with the
+original inter-arrival times scaled by --speed, and compares the replayed
+latency with the recorded latency_ms.
+
+Input can be raw Lambda log lines, CloudWatch exports with a timestamp /
+request-id prefix, or `aws logs filter-log-events` JSON events.
+
+Usage:
+    aws logs tail /aws/lambda/<function> --since 1h --format short > traffic.log
+    python scripts/replay_traffic.py traffic.log --base https://<function-url> --speed 2
+    python scripts/replay_traffic.py traffic.log --in-process --speed 10
+
+Request bodies are not logged. Votes and visits are replayed with generated
+bodies and the synthetic header (counted separately by the backend); other
+writes are skipped unless --include-writes is given, and admin routes need
+--admin-key.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime
+
+from local_handler import build_event, load_app
+from synthetic_load import DEFAULT_HEADER, ConnectionPool, LatencyHistogram, fetch_matchups, normalize_base
+
+SYNTHETIC_WRITES = {"/vote", "/visit"}
+
+
+class RecordedRequest:
+    __slots__ = ("correlation_id", "timestamp", "method", "path", "query", "latency_ms")
+
+    def __init__(self, correlation_id, timestamp, method, path, query):
+        self.correlation_id = correlation_id
+        self.timestamp = timestamp
+        self.method = method
+        self.path = path
+        self.query = query
+        self.latency_ms = None
+
+
+def parse_log_line(line):
+    """Structured log dict from one line, or None."""
+    start = line.find("{")
+    if start < 0:
+        return None
+    try:
+        record = json.loads(line[start:])
+    except json.JSONDecodeError:
+        return None
+    # filter-log-events output wraps the original line in "message".
+    if isinstance(record, dict) and "correlation_id" not in record and isinstance(record.get("message"), str):
+        inner = parse_log_line(record["message"])
+        if inner is not None:
+            return inner
+    return record if isinstance(record, dict) else None
+
+
+def load_requests(paths):
+    """Recorded requests sorted by arrival time; completions are joined by correlation_id."""
+    by_id = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                record = parse_log_line(line)
+                if not record or not record.get("correlation_id"):
+                    continue
+                message = record.get("message")
+                correlation_id = record["correlation_id"]
+                if message == "Request received" and record.get("timestamp"):
+                    try:
+                        timestamp = datetime.fromisoformat(record["timestamp"].replace("Z", "+00:00")).timestamp()
+                    except ValueError:
+                        continue
+                    existing = by_id.get(correlation_id)
+                    request = RecordedRequest(
+                        correlation_id, timestamp, record.get("method", "GET"),
+                        record.get("path", "/"), record.get("query", "")
+                    )
+                    if existing is not None:
+                        request.latency_ms = existing.latency_ms
+                    by_id[correlation_id] = request
+                elif message == "Request completed" and "latency_ms" in record:
+                    request = by_id.get(correlation_id)
+                    if request is None:
+                        # Completion seen first (unordered streams); keep the latency for later.
+                        request = by_id[correlation_id] = RecordedRequest(correlation_id, None, "", "", "")
+                    request.latency_ms = float(record["latency_ms"])
+    requests = [request for request in by_id.values() if request.timestamp is not None]
+    requests.sort(key=lambda request: request.timestamp)
+    return requests
+
+
+def replay_plan(requests, args):
+    """Filter recorded requests down to the ones this run may send."""
+    planned = []
+    skipped = {}
+    for request in requests:
+        reason = None
+        if request.method == "OPTIONS":
+            reason = "options"
+        elif request.path.startswith("/admin") or (request.path.startswith("/comment/") and request.method == "DELETE"):
+            if not args.admin_key:
+                reason = "admin"
+            elif request.method != "GET" and not args.include_writes:
+                reason = "write"
+        elif request.method != "GET" and request.path not in SYNTHETIC_WRITES and not args.include_writes:
+            reason = "write"
+        if reason:
+            skipped[reason] = skipped.get(reason, 0) + 1
+        else:
+            planned.append(request)
+    if args.limit:
+        planned = planned[:args.limit]
+    return planned, skipped
+
+
+def request_body(request, idx, matchup_ids):
+    """Generated body for replayed writes (the originals are never logged)."""
+    matchup_id = random.Random(idx).choice(matchup_ids) if matchup_ids else "unknown"
+    fingerprint = f"replay-{idx}"
+    if request.path == "/vote":
+        return {"matchup_id": matchup_id, "side": "left" if idx % 2 == 0 else "right", "fingerprint": fingerprint}
+    if request.path == "/visit":
+        return {"real": False}
+    if request.path == "/comment":
+        return {"matchup_id": matchup_id, "author_name": "Replay", "comment_text": f"replay {idx}",
+                "fingerprint": fingerprint}
+    if request.path == "/matchup/rate":
+        return {"matchup_id": matchup_id, "rating": "good", "fingerprint": fingerprint}
+    if request.path == "/submit":
+        return {"left_name": "Replay Left", "right_name": "Replay Right", "category": "replay"}
+    if request.path == "/newsletter":
+        return {"email": f"{fingerprint}@example.invalid", "source": "replay"}
+    return {}
+
+
+class InProcessTarget:
+    """Calls backend/app.py's handler directly."""
+
+    def __init__(self):
+        self.app = load_app()
+
+    def send(self, method, path, query, headers, payload):
+        event = build_event(method, path, query, headers, payload)
+        response = self.app.handler(event, None)
+        return response["statusCode"]
+
+    def matchup_ids(self, headers):
+        response = self.app.handler(build_event("GET", "/matchup", headers=headers), None)
+        body = json.loads(response.get("body") or "{}")
+        return [m["matchup"]["id"] for m in (body.get("data") or {}).get("matchups", [])]
+
+
+class HttpTarget:
+    """Sends requests to a deployed base URL over keep-alive connections."""
+
+    def __init__(self, base):
+        self.pool = ConnectionPool(base)
+
+    def send(self, method, path, query, headers, payload):
+        status, _ = self.pool.request(method, f"{path}?{query}" if query else path, headers, payload)
+        return status
+
+    def matchup_ids(self, headers):
+        return [m["matchup"]["id"] for m in fetch_matchups(self.pool, headers)]
+
+
+def replay(target, planned, args, headers):
+    matchup_ids = target.matchup_ids(headers) if any(r.method == "POST" for r in planned) else []
+    lock = threading.Lock()
+    replayed = {}
+    recorded = {}
+    deltas = {}
+    errors = {}
+
+    def send(idx, request, scheduled):
+        payload = request_body(request, idx, matchup_ids) if request.method in ("POST", "PATCH") else None
+        try:
+            status = target.send(request.method, request.path, request.query, headers, payload)
+        except Exception as exc:
+            status = f"ERR:{type(exc).__name__}"
+        latency = (time.perf_counter() - scheduled) * 1000
+        route = f"{request.method} {route_key(request.path)}"
+        with lock:
+            replayed.setdefault(route, LatencyHistogram()).record(latency)
+            if not str(status).isdigit() or int(status) >= 500:
+                errors[f"{route} {status}"] = errors.get(f"{route} {status}", 0) + 1
+            if request.latency_ms is not None:
+                recorded.setdefault(route, LatencyHistogram()).record(request.latency_ms)
+                deltas.setdefault(route, array("d")).append(latency - request.latency_ms)
+
+    origin = planned[0].timestamp
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for idx, request in enumerate(planned):
+            scheduled = start + (request.timestamp - origin) / args.speed
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(send, idx, request, scheduled)
+    return replayed, recorded, deltas, errors, time.perf_counter() - start
+
+
+def route_key(path):
+    """Collapse ids out of parameterized admin/comment paths."""
+    parts = path.split("/")
+    if path.startswith("/admin/matchup/") and len(parts) > 3:
+        return "/admin/matchup/:id" + ("/" + parts[4] if len(parts) > 4 else "")
+    if path.startswith("/admin/submission/"):
+        return "/admin/submission/:ts"
+    if path.startswith("/comment/") and len(parts) > 3:
+        return "/comment/:id/:ts"
+    return path
+
+
+def median(values):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def report(replayed, recorded, deltas, errors, planned, skipped, elapsed, args):
+    span = planned[-1].timestamp - planned[0].timestamp if planned else 0
+    print(f"\nReplayed {len(planned)} requests in {elapsed:.1f}s "
+          f"(recorded span {span:.1f}s, speed {args.speed:g}x)")
+    if skipped:
+        print("  skipped: " + ", ".join(f"{reason} {count}" for reason, count in sorted(skipped.items())))
+    header = f"  {'route':<34} {'count':>6} {'rec p50':>8} {'new p50':>8} {'rec p99':>8} {'new p99':>8} {'median Δ':>9}"
+    print(header)
+    rows = {}
+    for route in sorted(replayed):
+        new = replayed[route].summary()
+        old = recorded.get(route, LatencyHistogram()).summary()
+        delta = median(deltas.get(route, []))
+        rows[route] = {"recorded": old, "replayed": new, "median_delta_ms": round(delta, 2)}
+        print(f"  {route:<34} {new['count']:>6} {old['p50_ms']:>8.1f} {new['p50_ms']:>8.1f} "
+              f"{old['p99_ms']:>8.1f} {new['p99_ms']:>8.1f} {delta:>+9.1f}")
+    if errors:
+        print("  errors: " + ", ".join(f"{key} x{count}" for key, count in sorted(errors.items())))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay Scrumble traffic from structured handler logs.")
+    parser.add_argument("logs", nargs="+", help="Log files containing handler JSON lines.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--base", help="Deployed API base URL.")
+    target.add_argument("--in-process", action="store_true", help="Invoke backend/app.py's handler directly.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Time scale (2 = twice as fast).")
+    parser.add_argument("--concurrency", type=int, default=32, help="Max in-flight requests.")
+    parser.add_argument("--limit", type=int, help="Replay at most N requests.")
+    parser.add_argument("--include-writes", action="store_true",
+                        help="Also replay comment/rating/submit/newsletter writes with generated bodies.")
+    parser.add_argument("--admin-key", help="Admin key for replaying /admin routes.")
+    parser.add_argument("--json-out", help="Write the per-route comparison as JSON.")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        raise SystemExit("--speed must be positive")
+
+    requests = load_requests(args.logs)
+    planned, skipped = replay_plan(requests, args)
+    if not planned:
+        raise SystemExit(f"No replayable requests found ({len(requests)} recorded).")
+    print(f"Loaded {len(requests)} recorded requests, replaying {len(planned)}")
+
+    headers = {DEFAULT_HEADER: "1", "Content-Type": "application/json", "User-Agent": "ScrumbleReplay/1.0"}
+    if args.admin_key:
+        headers["X-Admin-Key"] = args.admin_key
+
+    if args.in_process:
+        target_impl = InProcessTarget()
+        # The handler logs two JSON lines per request; keep them out of the report.
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            replayed, recorded, deltas, errors, elapsed = replay(target_impl, planned, args, headers)
+    else:
+        target_impl = HttpTarget(normalize_base(args.base))
+        replayed, recorded, deltas, errors, elapsed = replay(target_impl, planned, args, headers)
+
+    rows = report(replayed, recorded, deltas, errors, planned, skipped, elapsed, args)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as handle:
+            json.dump({"speed": args.speed, "requests": len(planned), "routes": rows}, handle, indent=2)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -1,60 +1,43 @@
 #!/usr/bin/env python3
-import json
-import boto3
-import sys
-
-
-def seed_table(table_name):
-    dynamodb = boto3.resource("dynamodb")
-    table = dynamodb.Table(table_name)
-
-    with open("docs/seed-data.json", "r", encoding="utf-8") as file_handle:
-        data = json.load(file_handle)
-
-    for entry in data["entries"]:
-        table.put_item(
-            Item={
-                "pk": "ENTRY",
-                "sk": entry["id"],
-                **entry,
-            }
-        )
-        print(f"Added entry: {entry['name']}")
-
-    for matchup in data["matchups"]:
-        if matchup["active"]:
-            table.put_item(
-                Item={
-                    "pk": "MATCHUP",
-                    "sk": "ACTIVE",
-                    **matchup,
-                }
-            )
-            print(f"Set active matchup: {matchup['title']}")
-
-            table.put_item(
-                Item={
-                    "pk": f"VOTES#{matchup['id']}",
-                    "sk": "TOTAL",
-                    "left": 0,
-                    "right": 0,
-                }
-            )
-            print(f"Initialized votes for {matchup['id']}")
-
-        table.put_item(
-            Item={
-                "pk": "MATCHUP",
-                "sk": matchup["id"],
-                **matchup,
-            }
-        )
-
-    print(
-        f"Seeded {len(data['entries'])} entries and {len(data['matchups'])} matchups"
+from seed_common import default_state_path, iter_top_level_arrays, seed_argument_parser, seed_items
+
+
+def iter_seed_items(path, counts):
+    for key, record in iter_top_level_arrays(path):
+        if key == "entries":
+            counts["entries"] += 1
+            yield {"pk": "ENTRY", "sk": record["id"], **record}
+        elif key == "matchups":
+            counts["matchups"] += 1
+            if record["active"]:
+                yield {"pk": "MATCHUP", "sk": "ACTIVE", **record}
+                yield {"pk": f"VOTES#{record['id']}", "sk": "TOTAL", "left": 0, "right": 0}
+            yield {"pk": "MATCHUP", "sk": record["id"], **record}
+
+
+def seed_table(table_name, path="docs/seed-data.json", workers=8, state_path=None, full=False, max_rate=None,
+               sqlite_path=None):
+    counts = {"entries": 0, "matchups": 0}
+    seed_items(
+        table_name,
+        iter_seed_items(path, counts),
+        workers=workers,
+        state_path=state_path,
+        full=full,
+        max_rate=max_rate,
+        sqlite_path=sqlite_path,
     )
+    print(f"Seeded {counts['entries']} entries and {counts['matchups']} matchups")
 
 
 if __name__ == "__main__":
-    table_name = sys.argv[1] if len(sys.argv) > 1 else "scrumble-data"
-    seed_table(table_name)
+    args = seed_argument_parser("Seed Scrumble entries and matchups.", "docs/seed-data.json").parse_args()
+    seed_table(
+        args.table_name,
+        path=args.file,
+        workers=args.workers,
+        state_path=args.state_file or default_state_path(args.table_name),
+        full=args.full,
+        max_rate=args.max_rate,
+        sqlite_path=args.sqlite,
+    )
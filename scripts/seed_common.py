@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Shared seeding pipeline: streaming JSON parsing, content-hash skipping, batched writes."""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from decimal import Decimal
+
+from boto3.dynamodb.types import TypeSerializer
+
+from dynamo_batch import BatchWriter, Progress, capacity_bucket, get_client
+
+READ_CHUNK = 1 << 16
+STATE_DIR = ".seed-state"
+DELIMITERS = " \t\r\n,:]}"
+
+
+class StreamingJSONError(ValueError):
+    pass
+
+
+def iter_top_level_arrays(path, chunk_size=READ_CHUNK):
+    """Stream ``(key, element)`` pairs from a ``{"key": [element, ...], ...}`` JSON file.
+
+    Only one element is held in memory at a time. Non-array values are
+    yielded once as ``(key, value)``. Floats are parsed as ``Decimal`` so they
+    can be written to DynamoDB unchanged.
+    """
+    decoder = json.JSONDecoder(parse_float=Decimal)
+    with open(path, "r", encoding="utf-8") as handle:
+        state = {"buf": "", "pos": 0, "eof": False}
+
+        def fill():
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                state["eof"] = True
+                return False
+            # Drop consumed text so the buffer never grows past one element plus one chunk.
+            state["buf"] = state["buf"][state["pos"]:] + chunk
+            state["pos"] = 0
+            return True
+
+        def peek():
+            while True:
+                buf, pos = state["buf"], state["pos"]
+                while pos < len(buf) and buf[pos] in " \t\r\n":
+                    pos += 1
+                state["pos"] = pos
+                if pos < len(buf):
+                    return buf[pos]
+                if not fill():
+                    return ""
+
+        def expect(chars):
+            char = peek()
+            if char not in chars:
+                raise StreamingJSONError(f"{path}: expected one of {chars!r}, got {char!r}")
+            state["pos"] += 1
+            return char
+
+        def decode():
+            peek()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(state["buf"], state["pos"])
+                except json.JSONDecodeError:
+                    if state["eof"] or not fill():
+                        raise
+                    continue
+                # A number cut at the chunk boundary ("12" of "12.5") still parses, so only
+                # accept a value once it is followed by a delimiter.
+                if (end == len(state["buf"]) or state["buf"][end] not in DELIMITERS) \
+                        and not state["eof"] and fill():
+                    continue
+                state["pos"] = end
+                return value
+
+        expect("{")
+        if peek() == "}":
+            return
+        while True:
+            key = decode()
+            expect(":")
+            if peek() == "[":
+                state["pos"] += 1
+                if peek() == "]":
+                    state["pos"] += 1
+                else:
+                    while True:
+                        yield key, decode()
+                        if expect(",]") == "]":
+                            break
+            else:
+                yield key, decode()
+            if expect(",}") == "}":
+                return
+
+
+def content_hash(item):
+    canonical = json.dumps(item, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+class SeedState:
+    """Content hashes of items already written, persisted per table between runs.
+
+    The hashes are only trusted for the table they were recorded against: the
+    same ``table`` identity (see ``table_identity``). Anything else, including
+    state files from before identities were recorded, starts from no hashes.
+    """
+
+    def __init__(self, path, table=None):
+        self.path = path
+        self.table = table
+        self.hashes = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as handle:
+                saved = json.load(handle)
+            if table and saved.get("table") == table:
+                self.hashes = saved.get("hashes", {})
+            elif saved:
+                print(f"  ignoring {path}: not recorded for this table")
+
+    def save(self, updates):
+        if not self.path:
+            return
+        self.hashes.update(updates)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump({"table": self.table, "hashes": self.hashes}, handle, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+
+def table_identity(client, table_name):
+    """Account, region, name (the ARN) and creation time, which changes if the table is recreated."""
+    desc = client.describe_table(TableName=table_name)["Table"]
+    return {"arn": desc["TableArn"], "created": desc["CreationDateTime"].isoformat()}
+
+
+def table_is_empty(client, table_name):
+    return not client.scan(TableName=table_name, Limit=1, Select="COUNT")["Count"]
+
+
+def item_key(item):
+    return f"{item['pk']}\x1f{item['sk']}"
+
+
+def seed_sqlite(table_name, items, sqlite_path):
+    """Upsert ``items`` into a local SQLite store (backend/storage.py) in one transaction."""
+    from local_handler import BACKEND_DIR
+
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    import storage
+
+    started = time.monotonic()
+    store = storage.SqliteStorage(sqlite_path, {**storage.table_names(), storage.DATA: table_name})
+    written = store.load(storage.DATA, items)
+    print(f"  wrote {written} items to {sqlite_path} ({time.monotonic() - started:.1f}s)")
+    return written, 0
+
+
+def seed_items(table_name, items, workers=8, state_path=None, full=False, max_rate=None, sqlite_path=None):
+    """Write ``items`` (an iterable of plain dicts) with batched, concurrent writes.
+
+    Items whose content hash matches the previous run are skipped unless
+    ``full`` is set. When a key repeats within one run the last item wins,
+    as it would with serial ``put_item`` calls. With ``sqlite_path`` the items
+    go to a local SQLite store instead of DynamoDB.
+    """
+    if sqlite_path:
+        return seed_sqlite(table_name, items, sqlite_path)
+    client = get_client(workers)
+    serializer = TypeSerializer()
+    state = SeedState(state_path, table_identity(client, table_name) if state_path else None)
+    if state.hashes and not full and table_is_empty(client, table_name):
+        # Emptied since the last run (e.g. items deleted by hand): the saved hashes describe nothing.
+        print("  table is empty, writing every item")
+        state.hashes = {}
+    known = {} if full else state.hashes
+    written_hashes = {}
+    repeated = {}
+    skipped = 0
+    started = time.monotonic()
+    progress = Progress(f"seed {table_name}")
+    bucket = capacity_bucket(None, 0, override=max_rate)
+
+    def to_low_level(item):
+        return {name: serializer.serialize(value) for name, value in item.items()}
+
+    with BatchWriter(client, table_name, workers=workers, write_bucket=bucket, progress=progress) as writer:
+        for item in items:
+            key = item_key(item)
+            digest = content_hash(item)
+            if key in written_hashes:
+                # Concurrent batches can land in any order, so repeats are written afterwards.
+                repeated[key] = item
+                written_hashes[key] = digest
+                continue
+            written_hashes[key] = digest
+            if known.get(key) == digest:
+                skipped += 1
+                continue
+            writer.put(to_low_level(item))
+
+    written = writer.written
+    if repeated:
+        with BatchWriter(client, table_name, workers=workers, write_bucket=bucket, progress=progress) as late:
+            for key, item in repeated.items():
+                if known.get(key) != written_hashes[key]:
+                    late.put(to_low_level(item))
+        written += late.written
+
+    state.save(written_hashes)
+
+    elapsed = time.monotonic() - started
+    print(f"  wrote {written} items, skipped {skipped} unchanged ({elapsed:.1f}s)")
+    return written, skipped
+
+
+def default_state_path(table_name):
+    return os.path.join(STATE_DIR, f"{table_name}.json")
+
+
+def seed_argument_parser(description, default_file):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("table_name", nargs="?", default="scrumble-data")
+    parser.add_argument("--file", default=default_file, help="Seed JSON file.")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent batch writers.")
+    parser.add_argument("--max-rate", type=float, help="WCU/s limit (default: adaptive backoff only).")
+    parser.add_argument("--full", action="store_true", help="Rewrite every item, ignoring saved hashes.")
+    parser.add_argument("--state-file", help=f"Hash state file (default: {STATE_DIR}/<table>.json).")
+    parser.add_argument("--sqlite", metavar="PATH", help="Seed a local SQLite store (STORAGE_BACKEND=sqlite) instead.")
+    return parser
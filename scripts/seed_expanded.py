@@ -1,28 +1,42 @@
 #!/usr/bin/env python3
-import json
-import boto3
-import sys
+from seed_common import default_state_path, iter_top_level_arrays, seed_argument_parser, seed_items
 
-def seed_expanded(table_name):
-    dynamodb = boto3.resource("dynamodb")
-    table = dynamodb.Table(table_name)
 
-    with open("docs/seed-expanded.json", "r", encoding="utf-8") as f:
-        data = json.load(f)
+def iter_expanded_items(path, counts):
+    for key, record in iter_top_level_arrays(path):
+        if key == "entries":
+            counts["entries"] += 1
+            yield {"pk": "ENTRY", "sk": record["id"], **record}
+        elif key == "matchups":
+            counts["matchups"] += 1
+            yield {"pk": "MATCHUP", "sk": record["id"], **record}
+            yield {"pk": f"VOTES#{record['id']}", "sk": "TOTAL", "left": 0, "right": 0}
 
-    print(f"Seeding {len(data['entries'])} entries...")
-    for entry in data["entries"]:
-        table.put_item(Item={"pk": "ENTRY", "sk": entry["id"], **entry})
-        print(f"  ✓ {entry['name']}")
 
-    print(f"\nSeeding {len(data['matchups'])} matchups...")
-    for matchup in data["matchups"]:
-        table.put_item(Item={"pk": "MATCHUP", "sk": matchup["id"], **matchup})
-        table.put_item(Item={"pk": f"VOTES#{matchup['id']}", "sk": "TOTAL", "left": 0, "right": 0})
-        print(f"  ✓ {matchup['title']}")
+def seed_expanded(table_name, path="docs/seed-expanded.json", workers=8, state_path=None, full=False, max_rate=None,
+                  sqlite_path=None):
+    counts = {"entries": 0, "matchups": 0}
+    print(f"Seeding {path} into {table_name}...")
+    seed_items(
+        table_name,
+        iter_expanded_items(path, counts),
+        workers=workers,
+        state_path=state_path,
+        full=full,
+        max_rate=max_rate,
+        sqlite_path=sqlite_path,
+    )
+    print(f"\n✅ Seeded {counts['entries']} entries and {counts['matchups']} matchups")
 
-    print(f"\n✅ Seeded {len(data['entries'])} entries and {len(data['matchups'])} matchups")
 
 if __name__ == "__main__":
-    table_name = sys.argv[1] if len(sys.argv) > 1 else "scrumble-data"
-    seed_expanded(table_name)
+    args = seed_argument_parser("Seed the expanded Scrumble catalog.", "docs/seed-expanded.json").parse_args()
+    seed_expanded(
+        args.table_name,
+        path=args.file,
+        workers=args.workers,
+        state_path=args.state_file or default_state_path(args.table_name),
+        full=args.full,
+        max_rate=args.max_rate,
+        sqlite_path=args.sqlite,
+    )
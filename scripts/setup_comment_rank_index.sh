@@ -0,0 +1,40 @@
+#!/bin/bash
+set -euo pipefail
+
+# Add the pk-rank-index GSI that serves "top" comment pages, then wait until it is ACTIVE.
+# Run once before deploying the backend, then run scripts/backfill_comment_rank.py:
+#   ./scripts/setup_comment_rank_index.sh [table-name]
+
+TABLE="${1:-${COMMENTS_TABLE_NAME:-scrumble-comments}}"
+INDEX="pk-rank-index"
+
+if aws dynamodb describe-table --table-name "$TABLE" \
+    --query "Table.GlobalSecondaryIndexes[?IndexName=='$INDEX'].IndexName" --output text | grep -q "$INDEX"; then
+  echo "✓ $INDEX already exists on $TABLE"
+else
+  BILLING=$(aws dynamodb describe-table --table-name "$TABLE" \
+    --query 'Table.BillingModeSummary.BillingMode' --output text)
+  THROUGHPUT=""
+  if [[ "$BILLING" != "PAY_PER_REQUEST" ]]; then
+    THROUGHPUT=',"ProvisionedThroughput":{"ReadCapacityUnits":5,"WriteCapacityUnits":5}'
+  fi
+
+  echo "Creating $INDEX on $TABLE..."
+  aws dynamodb update-table --table-name "$TABLE" \
+    --attribute-definitions AttributeName=pk,AttributeType=S AttributeName=rank,AttributeType=N \
+    --global-secondary-index-updates "[{\"Create\":{\"IndexName\":\"$INDEX\",
+      \"KeySchema\":[{\"AttributeName\":\"pk\",\"KeyType\":\"HASH\"},{\"AttributeName\":\"rank\",\"KeyType\":\"RANGE\"}],
+      \"Projection\":{\"ProjectionType\":\"ALL\"}$THROUGHPUT}}]" > /dev/null
+fi
+
+echo "Waiting for $INDEX to become ACTIVE..."
+while true; do
+  STATUS=$(aws dynamodb describe-table --table-name "$TABLE" \
+    --query "Table.GlobalSecondaryIndexes[?IndexName=='$INDEX'].IndexStatus" --output text)
+  [[ "$STATUS" == "ACTIVE" ]] && break
+  echo "  status: ${STATUS:-pending}"
+  sleep 15
+done
+
+echo "✓ $INDEX is ACTIVE"
+echo "Next: python3 scripts/backfill_comment_rank.py --table $TABLE"
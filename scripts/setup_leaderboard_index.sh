@@ -0,0 +1,40 @@
+#!/bin/bash
+set -euo pipefail
+
+# Add the pk-elo-index GSI that serves leaderboards in rating order, then wait until it is ACTIVE.
+# Run once before deploying the backend, then run scripts/rebuild_leaderboard.py:
+#   ./scripts/setup_leaderboard_index.sh [table-name]
+
+TABLE="${1:-${TABLE_NAME:-scrumble-data}}"
+INDEX="pk-elo-index"
+
+if aws dynamodb describe-table --table-name "$TABLE" \
+    --query "Table.GlobalSecondaryIndexes[?IndexName=='$INDEX'].IndexName" --output text | grep -q "$INDEX"; then
+  echo "✓ $INDEX already exists on $TABLE"
+else
+  BILLING=$(aws dynamodb describe-table --table-name "$TABLE" \
+    --query 'Table.BillingModeSummary.BillingMode' --output text)
+  THROUGHPUT=""
+  if [[ "$BILLING" != "PAY_PER_REQUEST" ]]; then
+    THROUGHPUT=',"ProvisionedThroughput":{"ReadCapacityUnits":5,"WriteCapacityUnits":5}'
+  fi
+
+  echo "Creating $INDEX on $TABLE..."
+  aws dynamodb update-table --table-name "$TABLE" \
+    --attribute-definitions AttributeName=pk,AttributeType=S AttributeName=elo,AttributeType=N \
+    --global-secondary-index-updates "[{\"Create\":{\"IndexName\":\"$INDEX\",
+      \"KeySchema\":[{\"AttributeName\":\"pk\",\"KeyType\":\"HASH\"},{\"AttributeName\":\"elo\",\"KeyType\":\"RANGE\"}],
+      \"Projection\":{\"ProjectionType\":\"ALL\"}$THROUGHPUT}}]" > /dev/null
+fi
+
+echo "Waiting for $INDEX to become ACTIVE..."
+while true; do
+  STATUS=$(aws dynamodb describe-table --table-name "$TABLE" \
+    --query "Table.GlobalSecondaryIndexes[?IndexName=='$INDEX'].IndexStatus" --output text)
+  [[ "$STATUS" == "ACTIVE" ]] && break
+  echo "  status: ${STATUS:-pending}"
+  sleep 15
+done
+
+echo "✓ $INDEX is ACTIVE"
+echo "Next: python3 scripts/rebuild_leaderboard.py --table $TABLE"
@@ -1,16 +1,45 @@
 #!/usr/bin/env python3
+"""
+Scrumble synthetic load generator.
+
+Requests are issued open-loop: arrivals follow a fixed schedule (constant or
+Poisson) independent of how fast the server answers, and run on a pool of
+worker threads with keep-alive connections. Latency is measured from each
+request's scheduled start, so queueing behind a saturated server is counted
+instead of hidden (no coordinated omission).
+
+Usage:
+    python scripts/synthetic_load.py --mode matchup --rps 20 --duration 30
+    python scripts/synthetic_load.py --mode mixed --mix matchup=70,vote=20,visit=10 --rps 50
+    python scripts/synthetic_load.py --mode mixed --rps 25,50,100,200 --duration 20   # step to saturation
+"""
 import argparse
+import http.client
 import json
+import math
 import os
 import random
 import re
 import sys
+import threading
 import time
-import urllib.error
-import urllib.request
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 
 
 DEFAULT_HEADER = "X-Scrumble-Synthetic"
+DEFAULT_MIX = "matchup=80,vote=15,visit=5"
+
+# name -> (method, path). "comment" writes real comment rows; keep it out of mixes against prod.
+ROUTES = {
+    "matchup": ("GET", "/matchup"),
+    "history": ("GET", "/history"),
+    "vote": ("POST", "/vote"),
+    "visit": ("POST", "/visit"),
+    "comments": ("GET", "/comments"),
+    "comment": ("POST", "/comment"),
+}
+MATCHUP_ROUTES = {"vote", "comments", "comment"}
 
 
 def load_api_base(args):
@@ -41,21 +70,141 @@ def normalize_base(value):
     return value[:-1] if value.endswith("/") else value
 
 
-def request_json(method, url, headers, payload=None):
-    data = None
-    if payload is not None:
-        data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(url, data=data, headers=headers, method=method)
-    with urllib.request.urlopen(req, timeout=10) as resp:
-        body = resp.read().decode("utf-8")
-        return resp.getcode(), body
+class LatencyHistogram:
+    """Log-bucketed latency histogram (about 1% relative precision, bounded memory)."""
+
+    GROWTH = math.log(1.01)
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, ms):
+        ms = max(ms, 0.001)
+        index = int(math.log(ms) / self.GROWTH)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def merge(self, other):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct):
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * pct / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # Upper edge of the bucket, never above the observed max.
+                return min(math.exp((index + 1) * self.GROWTH), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 2) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50), 2),
+            "p90_ms": round(self.percentile(90), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "max_ms": round(self.max, 2),
+        }
+
+
+class LatencyStats:
+    """Thread-safe histograms keyed by (route, status)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+
+    def record(self, route, status, ms):
+        with self._lock:
+            key = (route, str(status))
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.record(ms)
+
+    def by_route(self):
+        routes = {}
+        for (route, _status), histogram in self.histograms.items():
+            routes.setdefault(route, LatencyHistogram()).merge(histogram)
+        return routes
+
+    def overall(self):
+        combined = LatencyHistogram()
+        for histogram in self.histograms.values():
+            combined.merge(histogram)
+        return combined
+
+
+class ConnectionPool:
+    """One keep-alive HTTP(S) connection per worker thread."""
+
+    def __init__(self, base, timeout=10):
+        parsed = urllib.parse.urlsplit(base)
+        self.scheme = parsed.scheme or "https"
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.prefix = parsed.path.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            conn = cls(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _reset(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+    def request(self, method, path, headers, payload=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, self.prefix + path, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+                if resp.getheader("Connection", "").lower() == "close":
+                    self._reset()
+                return resp.status, data
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # Server closed an idle keep-alive connection; retry once on a fresh one.
+                self._reset()
+                if attempt:
+                    raise
+            except Exception:
+                self._reset()
+                raise
+
+
+def request_json(pool, method, path, headers, payload=None):
+    code, body = pool.request(method, path, headers, payload)
+    return code, body.decode("utf-8")
 
 
-def fetch_matchups(base, headers):
-    code, body = request_json("GET", f"{base}/matchup", headers)
+def fetch_matchups(pool, headers):
+    code, body = request_json(pool, "GET", "/matchup", headers)
     if code != 200:
         raise RuntimeError(f"GET /matchup failed with {code}: {body}")
     data = json.loads(body or "{}")
+    data = data.get("data") or data
     return data.get("matchups") or []
 
 
@@ -70,10 +219,126 @@ def pick_matchup(matchups, matchup_id=None):
     return matchups[0]
 
 
-def send_vote(base, headers, matchup_id, side, fingerprint):
-    payload = {"matchup_id": matchup_id, "side": side, "fingerprint": fingerprint}
-    code, body = request_json("POST", f"{base}/vote", headers, payload)
-    return code, body
+def parse_mix(value):
+    weights = {}
+    for part in value.split(","):
+        name, sep, weight = part.strip().partition("=")
+        if not sep or name not in ROUTES:
+            raise SystemExit(f"Invalid mix entry {part!r}; routes: {', '.join(ROUTES)}")
+        weights[name] = float(weight)
+    if not weights or sum(weights.values()) <= 0:
+        raise SystemExit("Mix weights must add up to more than zero.")
+    return weights
+
+
+def build_request(route, idx, args, matchup_id, rng):
+    method, path = ROUTES[route]
+    payload = None
+    if route == "vote":
+        side = "left" if idx % 2 == 0 else "right"
+        if args.random_side:
+            side = rng.choice(["left", "right"])
+        fingerprint = f"{args.fingerprint_prefix}-{int(time.time() * 1000)}-{idx}"
+        payload = {"matchup_id": matchup_id, "side": side, "fingerprint": fingerprint}
+    elif route == "visit":
+        payload = {"real": False}
+    elif route == "comments":
+        path = f"{path}?matchup_id={urllib.parse.quote(matchup_id)}"
+    elif route == "comment":
+        payload = {
+            "matchup_id": matchup_id,
+            "author_name": "Synthetic",
+            "comment_text": f"synthetic load {idx}",
+            "fingerprint": f"{args.fingerprint_prefix}-{idx}",
+        }
+    return method, path, payload
+
+
+def arrival_offsets(rps, duration, arrival, rng):
+    """Scheduled send times (seconds from stage start)."""
+    if arrival == "poisson":
+        offset = rng.expovariate(rps)
+        while offset < duration:
+            yield offset
+            offset += rng.expovariate(rps)
+    else:
+        for idx in range(int(duration * rps)):
+            yield idx / rps
+
+
+def run_stage(pool, executor, args, headers, rps, weights, matchup_id, rng, first_idx):
+    stats = LatencyStats()
+    service = LatencyStats()
+    routes = list(weights)
+    route_weights = [weights[name] for name in routes]
+    sent = 0
+    lag_warned = False
+
+    def send(idx, route, scheduled):
+        method, path, payload = build_request(route, idx, args, matchup_id, random.Random(idx))
+        started = time.perf_counter()
+        try:
+            status, _ = pool.request(method, path, headers, payload)
+        except Exception as exc:
+            status = f"ERR:{type(exc).__name__}"
+        finished = time.perf_counter()
+        stats.record(route, status, (finished - scheduled) * 1000)
+        service.record(route, status, (finished - started) * 1000)
+
+    stage_start = time.perf_counter()
+    futures = []
+    for offset in arrival_offsets(rps, args.duration, args.arrival, rng):
+        scheduled = stage_start + offset
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -0.5 and not lag_warned:
+            print("  ⚠️  Scheduler is falling behind; raise --concurrency or lower --rps", file=sys.stderr)
+            lag_warned = True
+        route = rng.choices(routes, route_weights)[0]
+        futures.append(executor.submit(send, first_idx + sent, route, scheduled))
+        sent += 1
+    for future in futures:
+        future.result()
+    elapsed = time.perf_counter() - stage_start
+    return stats, service, sent, elapsed
+
+
+def format_row(label, summary):
+    return (
+        f"  {label:<28} {summary['count']:>7} {summary['p50_ms']:>9.1f} {summary['p90_ms']:>9.1f} "
+        f"{summary['p99_ms']:>9.1f} {summary['max_ms']:>9.1f}"
+    )
+
+
+def report_stage(base, rps, stats, service, sent, elapsed):
+    overall = stats.overall()
+    ok = sum(
+        histogram.count
+        for (route, status), histogram in stats.histograms.items()
+        if status.isdigit() and 200 <= int(status) < 300
+    )
+    print(f"\nStage {rps:g} rps -> {base}")
+    print(f"  sent {sent} in {elapsed:.1f}s ({sent / elapsed:.1f} rps), 2xx {ok}, other {overall.count - ok}")
+    print(f"  {'route / status':<28} {'count':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for (route, status) in sorted(stats.histograms):
+        print(format_row(f"{route} {status}", stats.histograms[(route, status)].summary()))
+    for route, histogram in sorted(stats.by_route().items()):
+        print(format_row(f"{route} (all)", histogram.summary()))
+    print(format_row("all", overall.summary()))
+    print(format_row("all (service time)", service.overall().summary()))
+
+    return {
+        "target_rps": rps,
+        "sent": sent,
+        "elapsed_s": round(elapsed, 3),
+        "achieved_rps": round(sent / elapsed, 2) if elapsed else 0.0,
+        "ok": ok,
+        "latency": {f"{route} {status}": h.summary() for (route, status), h in stats.histograms.items()},
+        "latency_by_route": {route: h.summary() for route, h in stats.by_route().items()},
+        "overall": overall.summary(),
+        "service_time": service.overall().summary(),
+    }
 
 
 def run_load(args):
@@ -84,75 +349,70 @@ def run_load(args):
     headers = {
         DEFAULT_HEADER: "1",
         "Content-Type": "application/json",
-        "User-Agent": "ScrumbleSyntheticLoad/1.0",
+        "User-Agent": "ScrumbleSyntheticLoad/2.0",
     }
 
-    if args.mode == "vote":
-        matchups = fetch_matchups(base, headers)
-        matchup = pick_matchup(matchups, args.matchup_id)
+    weights = parse_mix(args.mix) if args.mode == "mixed" else {args.mode: 1.0}
+    rates = [float(value) for value in str(args.rps).split(",") if value.strip()]
+    if args.duration <= 0 or not rates or any(rate <= 0 for rate in rates):
+        raise RuntimeError("Duration and rps must yield at least one request.")
+
+    pool = ConnectionPool(base)
+    matchup_id = None
+    if MATCHUP_ROUTES & set(weights):
+        matchup = pick_matchup(fetch_matchups(pool, headers), args.matchup_id)
         if not matchup:
-            raise RuntimeError("Matchup not found for vote mode.")
+            raise RuntimeError("Matchup not found for vote/comment routes.")
         matchup_id = matchup.get("matchup", {}).get("id")
         if not matchup_id:
             raise RuntimeError("Matchup id missing from /matchup response.")
 
-    interval = 0 if args.rps <= 0 else 1.0 / args.rps
-    total = int(args.duration * args.rps) if args.duration > 0 else 0
-    if total <= 0:
-        raise RuntimeError("Duration and rps must yield at least one request.")
+    rng = random.Random(args.seed)
+    results = []
+    sent_total = 0
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for rps in rates:
+            stats, service, sent, elapsed = run_stage(
+                pool, executor, args, headers, rps, weights, matchup_id, rng, sent_total
+            )
+            sent_total += sent
+            results.append(report_stage(base, rps, stats, service, sent, elapsed))
 
-    successes = 0
-    failures = 0
-    start = time.time()
-    for idx in range(total):
-        tick_start = time.time()
-        try:
-            if args.mode == "matchup":
-                code, _ = request_json("GET", f"{base}/matchup", headers)
-            else:
-                side = "left" if idx % 2 == 0 else "right"
-                if args.random_side:
-                    side = random.choice(["left", "right"])
-                fingerprint = f"{args.fingerprint_prefix}-{int(time.time() * 1000)}-{idx}"
-                code, _ = send_vote(base, headers, matchup_id, side, fingerprint)
-
-            if 200 <= code < 300:
-                successes += 1
-            else:
-                failures += 1
-        except (urllib.error.HTTPError, urllib.error.URLError, RuntimeError):
-            failures += 1
-
-        elapsed = time.time() - tick_start
-        sleep_for = interval - elapsed
-        if sleep_for > 0:
-            time.sleep(sleep_for)
-
-    duration = time.time() - start
-    print("Synthetic load complete")
+    print("\nSynthetic load complete")
     print(f"  base: {base}")
     print(f"  mode: {args.mode}")
-    print(f"  total: {total}")
-    print(f"  successes: {successes}")
-    print(f"  failures: {failures}")
-    print(f"  elapsed: {duration:.2f}s")
+    print(f"  total: {sent_total}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as handle:
+            json.dump({"base": base, "mode": args.mode, "mix": weights, "stages": results}, handle, indent=2)
+        print(f"  results: {args.json_out}")
 
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Scrumble synthetic load generator (matchup or vote)."
+        description="Scrumble synthetic load generator (open-loop, concurrent)."
     )
     parser.add_argument("--base", help="API base URL (overrides env/config).")
-    parser.add_argument("--mode", choices=["matchup", "vote"], default="matchup")
-    parser.add_argument("--duration", type=int, default=10, help="Seconds to run.")
-    parser.add_argument("--rps", type=float, default=1, help="Requests per second.")
-    parser.add_argument("--matchup-id", help="Matchup id for vote mode.")
+    parser.add_argument("--mode", choices=sorted(ROUTES) + ["mixed"], default="matchup")
+    parser.add_argument("--mix", default=DEFAULT_MIX,
+                        help=f"Route weights for --mode mixed (default: {DEFAULT_MIX}).")
+    parser.add_argument("--duration", type=int, default=10, help="Seconds to run each stage.")
+    parser.add_argument("--rps", default="1",
+                        help="Requests per second; a comma list runs one stage per rate.")
+    parser.add_argument("--arrival", choices=["constant", "poisson"], default="constant",
+                        help="Arrival schedule.")
+    parser.add_argument("--concurrency", type=int, default=32,
+                        help="Worker threads (max in-flight requests).")
+    parser.add_argument("--matchup-id", help="Matchup id for vote/comment routes.")
     parser.add_argument(
         "--fingerprint-prefix", default="synthetic", help="Fingerprint prefix."
     )
     parser.add_argument(
         "--random-side", action="store_true", help="Randomize vote side."
     )
+    parser.add_argument("--seed", type=int, help="Random seed for route selection and arrivals.")
+    parser.add_argument("--json-out", help="Write stage results as JSON.")
 
     args = parser.parse_args()
     run_load(args)
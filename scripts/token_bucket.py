@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Thread-safe token bucket shared by the batch scripts."""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens per second up to ``capacity``.
+
+    A rate of 0 (or less) disables limiting. ``consume`` may push the balance
+    negative so callers can charge capacity that is only known after a call
+    returns (e.g. DynamoDB ConsumedCapacity); later ``acquire`` calls wait for
+    the debt to be paid back.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate or 0)
+        self.capacity = float(capacity if capacity is not None else max(self.rate, 1.0))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Block until ``tokens`` are available, then take them."""
+        if self.rate <= 0:
+            return
+        needed = min(float(tokens), self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return
+                wait = (needed - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def consume(self, tokens):
+        """Charge ``tokens`` without waiting."""
+        if self.rate <= 0 or tokens <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
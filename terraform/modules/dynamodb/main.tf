@@ -16,6 +16,11 @@ resource "aws_dynamodb_table" "scrumble" {
     type = "S"
   }
 
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
   tags = {
     Name        = var.table_name
     Environment = var.environment
@@ -38,12 +38,14 @@ resource "aws_iam_role_policy" "lambda_dynamodb" {
           "dynamodb:PutItem",
           "dynamodb:UpdateItem",
           "dynamodb:DeleteItem",
+          "dynamodb:BatchGetItem",
           "dynamodb:Query",
           "dynamodb:Scan"
         ]
         Resource = [
           var.table_arn,
-          "arn:aws:dynamodb:*:*:table/scrumble-comments"
+          "arn:aws:dynamodb:*:*:table/scrumble-comments",
+          "arn:aws:dynamodb:*:*:table/scrumble-comments/index/*"
         ]
       },
       {
@@ -92,6 +94,25 @@ resource "aws_lambda_function_url" "scrumble" {
   authorization_type = "NONE"
 }
 
+resource "aws_cloudwatch_event_rule" "archive_ended" {
+  name                = "${var.function_name}-archive-ended"
+  description         = "Archive ended matchups and update the leaderboard"
+  schedule_expression = "rate(1 hour)"
+}
+
+resource "aws_cloudwatch_event_target" "archive_ended" {
+  rule = aws_cloudwatch_event_rule.archive_ended.name
+  arn  = aws_lambda_function.scrumble.arn
+}
+
+resource "aws_lambda_permission" "archive_ended" {
+  statement_id  = "AllowArchiveSchedule"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.scrumble.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.archive_ended.arn
+}
+
 variable "function_name" {
   description = "Lambda function name"
   type        = string